@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+# The backend is a flat module layout run from its own directory (uvicorn server:app)
+sys.path.insert(0, str(Path(__file__).parent.parent / "yeti-backend"))
+
+import server  # noqa: E402
+
+# Tests that need a real mongod (query plans, GridFS) use this one. They are skipped when it is
+# unreachable, unless TEST_REQUIRE_MONGO=1 (as in CI) turns that into a failure
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL", "mongodb://localhost:27017")
+TEST_REQUIRE_MONGO = os.environ.get("TEST_REQUIRE_MONGO", "").lower() in ("1", "true")
+
+
+class RecordingWebSocket:
+    """
+    Stands in for a Starlette WebSocket, recording every frame and the close code.
+    A gated socket holds each send until gate is set (a stalled client), and
+    fail_with makes every send raise (a dropped connection).
+    """
+
+    def __init__(self, gated: bool = False, fail_with: Optional[Exception] = None):
+        self.frames = []
+        self.closed_with = None
+        self.gate = asyncio.Event()
+        if not gated:
+            self.gate.set()
+        self.fail_with = fail_with
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        await self._send(data)
+
+    async def send_bytes(self, data):
+        await self._send(data)
+
+    async def _send(self, data):
+        await self.gate.wait()
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.frames.append(data)
+
+    async def close(self, code=None):
+        self.closed_with = code
+
+    @property
+    def messages(self):
+        """Text frames decoded from JSON"""
+        return [json.loads(frame) for frame in self.frames if isinstance(frame, str)]
+
+
+@pytest.fixture
+def make_websocket():
+    """Builds RecordingWebSockets, one per simulated client"""
+    return RecordingWebSocket
+
+
+@pytest.fixture
+def mongod():
+    """Synchronous client for the real mongod at TEST_MONGO_URL"""
+    client = MongoClient(TEST_MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        client.close()
+        if TEST_REQUIRE_MONGO:
+            pytest.fail(f"TEST_REQUIRE_MONGO is set but no mongod is reachable at {TEST_MONGO_URL}: {e}")
+        pytest.skip(f"No mongod reachable at {TEST_MONGO_URL}")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def mongo_url(mongod) -> str:
+    """TEST_MONGO_URL, once mongod is known to be reachable (for motor clients)"""
+    return TEST_MONGO_URL
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """An in-memory mongomock database patched in as server.db"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()["yeti_test"]
+    monkeypatch.setattr(server, "db", db)
+    return db
+
+
+@pytest.fixture
+def api_client() -> TestClient:
+    """
+    TestClient for server.app, used without lifespan: the startup hooks would
+    need a real database, so tests patch in what the endpoints touch instead.
+    """
+    return TestClient(server.app)
+
+
+@pytest.fixture
+def auth_headers():
+    """Builds bearer headers for a token holder, wallet 0xabc"""
+    def headers(token_id: int) -> dict:
+        return {"Authorization": f"Bearer {server.create_access_token('0xabc', token_id)}"}
+    return headers
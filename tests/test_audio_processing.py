@@ -0,0 +1,51 @@
+import io
+import math
+import shutil
+import wave
+
+import pytest
+
+from audio_processing import OPUS_CONTENT_TYPE, AudioProcessingError, NoSpeechError, transcode_clip
+from vad import PAD_MS
+
+SAMPLE_RATE = 16000
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def wav_clip(silence_before, tone, silence_after):
+    """16-bit mono WAV: silence, a 220 Hz tone, silence (lengths in seconds)"""
+    samples = [0] * int(silence_before * SAMPLE_RATE)
+    samples += [int(3000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)) for i in range(int(tone * SAMPLE_RATE))]
+    samples += [0] * int(silence_after * SAMPLE_RATE)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(b"".join(s.to_bytes(2, "little", signed=True) for s in samples))
+    return buffer.getvalue()
+
+
+@needs_ffmpeg
+def test_transcode_trims_silence_and_shrinks_clip():
+    clip = wav_clip(1.0, 2.0, 1.5)
+    processed = transcode_clip(clip, "24k", -16, -45)
+
+    assert processed.content_type == OPUS_CONTENT_TYPE
+    assert processed.data.startswith(b"OggS")
+    # Duration is measured from the trimmed audio: the tone plus VAD padding on both sides
+    assert processed.duration == pytest.approx(2.0 + 2 * PAD_MS / 1000, abs=0.05)
+    assert processed.bytes_saved > 0
+
+
+@needs_ffmpeg
+def test_transcode_rejects_undecodable_input():
+    with pytest.raises(AudioProcessingError):
+        transcode_clip(b"not audio", "24k", -16, -45)
+
+
+@needs_ffmpeg
+def test_transcode_rejects_silent_clip():
+    with pytest.raises(NoSpeechError):
+        transcode_clip(wav_clip(1.0, 0, 0), "24k", -16, -45)
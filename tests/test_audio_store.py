@@ -0,0 +1,138 @@
+import asyncio
+import base64
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import server
+from audio_store import BlobNotFound, FileSystemAudioStore, GridFSAudioStore, parse_range_header
+from messages import RelayMessage
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-3", (0, 3)),
+    ("bytes=5-", (5, 9)),
+    ("bytes=3-100", (3, 9)),
+    ("bytes=-4", (6, 9)),
+    ("bytes=-20", (0, 9)),
+    (" bytes = 2-2", (2, 2)),
+])
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, 10) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=5-2", "bytes=-0", "bytes=a-"])
+def test_parse_range_header_rejects_unsatisfiable_ranges(header):
+    with pytest.raises(ValueError):
+        parse_range_header(header, 10)
+
+
+@pytest.mark.parametrize("header", ["bytes=0-1,3-4", "items=0-1"])
+def test_parse_range_header_ignores_unsupported_ranges(header):
+    assert parse_range_header(header, 10) is None
+
+
+@pytest.fixture(params=["file", "gridfs"])
+def make_store(request, tmp_path):
+    """Builds the store inside the test's event loop (motor binds to the loop it first runs on)"""
+    if request.param == "file":
+        yield lambda: FileSystemAudioStore(str(tmp_path))
+        return
+    mongod, mongo_url = request.getfixturevalue("mongod"), request.getfixturevalue("mongo_url")
+    database = f"yeti_audio_store_{os.getpid()}"
+    yield lambda: GridFSAudioStore(AsyncIOMotorClient(mongo_url)[database])
+    mongod.drop_database(database)
+
+
+def test_blobs_round_trip_in_ranges(make_store):
+    data = bytes(range(256)) * 1000
+
+    async def scenario():
+        store = make_store()
+        await store.put("clip-1", data, "audio/webm")
+        assert await store.size("clip-1") == len(data)
+        assert await store.read("clip-1") == data
+        assert b"".join([chunk async for chunk in store.stream("clip-1", 100, 70000)]) == data[100:70001]
+
+        await store.delete("clip-1")
+        await store.delete("clip-1")
+        with pytest.raises(BlobNotFound):
+            await store.size("clip-1")
+
+    asyncio.run(scenario())
+
+
+def test_failed_stream_uploads_store_nothing(make_store):
+    async def chunks():
+        yield b"first chunk"
+        raise ConnectionResetError("client went away")
+
+    async def scenario():
+        store = make_store()
+        with pytest.raises(ConnectionResetError):
+            await store.put_stream("clip-2", chunks(), "audio/webm")
+        with pytest.raises(BlobNotFound):
+            await store.size("clip-2")
+
+        async def whole():
+            yield b"ab"
+            yield b"cd"
+        assert await store.put_stream("clip-2", whole()) == 4
+        assert await store.read("clip-2") == b"abcd"
+
+    asyncio.run(scenario())
+
+
+def test_file_store_rejects_ids_outside_its_root(tmp_path):
+    store = FileSystemAudioStore(str(tmp_path / "blobs"))
+    with pytest.raises(BlobNotFound):
+        asyncio.run(store.size("../../etc/passwd"))
+
+
+def test_server_imports_without_an_event_loop():
+    # Stores bound to a loop are opened at startup, not when server is imported
+    code = "import asyncio; asyncio.run(asyncio.sleep(0)); import server; assert server.audio_store is None"
+    backend = Path(__file__).parent.parent / "yeti-backend"
+    subprocess.run([sys.executable, "-c", code], cwd=backend, check=True, timeout=60)
+
+
+def test_download_honours_range_requests(monkeypatch, tmp_path, mock_db, api_client, auth_headers):
+    monkeypatch.setattr(server, "audio_store", FileSystemAudioStore(str(tmp_path)))
+    headers, client = auth_headers(2), api_client
+
+    stored = RelayMessage(nft_token_id=1, wallet_address="0xabc", duration=1.0, content_type="audio/webm")
+    asyncio.run(server.audio_store.put(stored.id, b"0123456789", stored.content_type))
+    asyncio.run(mock_db.audio_messages.insert_one(stored.to_dict(include_audio=False)))
+    url = f"/api/audio/{stored.id}/data"
+
+    response = client.get(url, headers=headers)
+    assert (response.status_code, response.content) == (200, b"0123456789")
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-type"] == "audio/webm"
+
+    response = client.get(url, headers={**headers, "Range": "bytes=2-5"})
+    assert (response.status_code, response.content) == (206, b"2345")
+    assert response.headers["content-range"] == "bytes 2-5/10"
+    assert response.headers["content-length"] == "4"
+
+    response = client.get(url, headers={**headers, "Range": "bytes=-3"})
+    assert (response.status_code, response.content) == (206, b"789")
+
+    response = client.get(url, headers={**headers, "Range": "bytes=10-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */10"
+
+    # Multipart ranges are not supported, the Range header is ignored
+    response = client.get(url, headers={**headers, "Range": "bytes=0-1,4-5"})
+    assert (response.status_code, response.content) == (200, b"0123456789")
+    assert "content-range" not in response.headers
+
+    # Documents written before the blob store still serve their inline audio
+    legacy = RelayMessage(nft_token_id=1, wallet_address="0xabc", duration=1.0)
+    legacy_doc = {**legacy.to_dict(include_audio=False), "audio_data": base64.b64encode(b"inline").decode()}
+    asyncio.run(mock_db.audio_messages.insert_one(legacy_doc))
+    response = client.get(f"/api/audio/{legacy.id}/data", headers={**headers, "Range": "bytes=2-"})
+    assert (response.status_code, response.content) == (206, b"line")
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+from auth import TicketError, TokenCache, WebSocketTickets
+
+
+def test_token_cache_expires_with_token():
+    cache = TokenCache(max_entries=2)
+    cache.put("live", {"token_id": 1, "exp": time.time() + 60})
+    cache.put("expired", {"token_id": 2, "exp": time.time() - 1})
+    cache.put("no-exp", {"token_id": 3})
+
+    assert cache.get("live")["token_id"] == 1
+    assert cache.get("expired") is None
+    assert cache.get("no-exp") is None
+
+
+def test_token_cache_is_bounded_lru():
+    cache = TokenCache(max_entries=2)
+    exp = time.time() + 60
+    cache.put("a", {"exp": exp})
+    cache.put("b", {"exp": exp})
+    cache.get("a")
+    cache.put("c", {"exp": exp})
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+
+def test_ticket_is_single_use():
+    tickets = WebSocketTickets("secret", ttl=30)
+    ticket = tickets.issue(7, "0xabc")
+
+    payload = tickets.redeem(ticket)
+    assert (payload["token_id"], payload["wallet_address"]) == (7, "0xabc")
+    with pytest.raises(TicketError):
+        tickets.redeem(ticket)
+
+
+def test_ticket_rejects_forgery_and_expiry():
+    tickets = WebSocketTickets("secret", ttl=30)
+    with pytest.raises(TicketError):
+        WebSocketTickets("other secret", ttl=30).redeem(tickets.issue(7, "0xabc"))
+    with pytest.raises(TicketError):
+        tickets.redeem(tickets.issue(7, "0xabc", not_after=time.time() - 1))
+    with pytest.raises(TicketError):
+        tickets.redeem("not-a-ticket")
+
+
+def test_ticket_used_on_another_worker_is_rejected():
+    worker_a = WebSocketTickets("secret", ttl=30)
+    worker_b = WebSocketTickets("secret", ttl=30)
+    ticket = worker_a.issue(7, "0xabc")
+
+    payload = worker_a.redeem(ticket)
+    worker_b.mark_used(payload["nonce"], payload["exp"])
+    with pytest.raises(TicketError):
+        worker_b.redeem(ticket)
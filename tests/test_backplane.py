@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from backplane import InMemoryBackplane, InMemoryHub, RedisBackplane  # noqa: E402
+from messages import RelayMessage  # noqa: E402
+from server import ConnectionManager  # noqa: E402
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        await asyncio.sleep(0.01)
+
+
+async def run_two_workers(make_backplane, make_websocket):
+    worker_a = ConnectionManager(make_backplane())
+    worker_b = ConnectionManager(make_backplane())
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        listener = make_websocket()
+        session_id = await worker_b.connect(listener, "2", 2)
+        await wait_for(lambda: "2" in worker_a.online_user_ids())
+
+        message = RelayMessage(nft_token_id=1, wallet_address="0xabc", audio_data="aGk=", duration=1.0)
+        await worker_a.broadcast_audio(message, "1")
+        await wait_for(lambda: listener.frames)
+        assert listener.messages[0]["data"]["id"] == message.id
+
+        worker_b.disconnect(session_id)
+        await wait_for(lambda: "2" not in worker_a.online_user_ids())
+    finally:
+        await worker_a.stop()
+        await worker_b.stop()
+
+
+def test_in_memory_backplane_reaches_other_worker(make_websocket):
+    hub = InMemoryHub()
+    asyncio.run(run_two_workers(lambda: InMemoryBackplane(hub), make_websocket))
+
+
+def test_redis_backplane_reaches_other_worker(make_websocket):
+    server = fakeredis.FakeServer()
+    asyncio.run(run_two_workers(lambda: RedisBackplane(fakeredis.aioredis.FakeRedis(server=server)), make_websocket))
+
+
+def test_private_in_memory_backplane_stays_local(make_websocket):
+    async def scenario():
+        worker_a = ConnectionManager()
+        worker_b = ConnectionManager()
+        await worker_a.start()
+        await worker_b.start()
+        await worker_b.connect(make_websocket(), "2", 2)
+        await asyncio.sleep(0.05)
+        assert worker_a.online_user_ids() == set()
+        await worker_a.stop()
+        await worker_b.stop()
+
+    asyncio.run(scenario())
+
+
+def test_lone_in_memory_backplane_skips_encoding(monkeypatch):
+    import backplane
+
+    encoded = []
+    monkeypatch.setattr(backplane, "encode_frame", lambda event: encoded.append(event) or "{}")
+
+    async def scenario():
+        hub = InMemoryHub()
+        alone = InMemoryBackplane(hub)
+        await alone.start(lambda event: asyncio.sleep(0))
+        await alone.publish({"type": "audio_message"})
+        assert encoded == []
+
+        other = InMemoryBackplane(hub)
+        await other.start(lambda event: asyncio.sleep(0))
+        await alone.publish({"type": "audio_message"})
+        assert len(encoded) == 1
+
+    asyncio.run(scenario())
+
+
+def test_in_memory_deliveries_are_kept_until_done_and_failures_logged(caplog):
+    hub = InMemoryHub()
+    sender, receiver = InMemoryBackplane(hub), InMemoryBackplane(hub)
+
+    async def ignore(event):
+        pass
+
+    async def fail(event):
+        raise RuntimeError("handler blew up")
+
+    async def scenario():
+        await sender.start(ignore)
+        await receiver.start(fail)
+        await sender.publish({"type": "presence", "online": []})
+        in_flight = len(sender._deliveries)
+        await asyncio.sleep(0.01)
+        return in_flight, len(sender._deliveries)
+
+    assert asyncio.run(scenario()) == (1, 0)
+    assert "handler blew up" in caplog.text
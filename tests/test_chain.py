@@ -0,0 +1,182 @@
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from chain import ChainClient, OwnershipCache, TransferWatcher
+
+WALLET = "0x" + "ab" * 20
+
+
+def make_client(**kwargs) -> ChainClient:
+    options = {"timeout": 0.2, "retries": 2, "backoff": 0, "max_concurrency": 2, **kwargs}
+    return ChainClient("http://127.0.0.1:9", "0x" + "00" * 20, **options)
+
+
+def counting_loader(results):
+    """Loader returning results in order (raising exceptions), recording each wallet it was called for"""
+    calls = []
+    results = iter(results)
+
+    async def loader(wallet_address):
+        calls.append(wallet_address)
+        await asyncio.sleep(0)
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return loader, calls
+
+
+def test_ownership_cache_serves_hits_and_expires_negatives():
+    cache = OwnershipCache(ttl=60, negative_ttl=0)
+
+    async def scenario():
+        loader, calls = counting_loader([7, None, None])
+        assert await cache.get(WALLET, loader) == 7
+        assert await cache.get("0x" + "AB" * 20, loader) == 7  # checksummed and lowercase share an entry
+        # Negative results expire on their own (shorter) ttl
+        assert await cache.get("0xother", loader) is None
+        assert await cache.get("0xother", loader) is None
+        return calls
+
+    assert asyncio.run(scenario()) == [WALLET, "0xother", "0xother"]
+    assert cache.stats() == {"entries": 2, "hits": 1, "negative_hits": 0, "misses": 3, "coalesced": 0, "invalidations": 0}
+
+
+def test_ownership_cache_coalesces_concurrent_misses_and_never_caches_errors():
+    cache = OwnershipCache(ttl=60, negative_ttl=60)
+
+    async def scenario():
+        loader, calls = counting_loader([asyncio.TimeoutError(), 3])
+        results = await asyncio.gather(*(cache.get(WALLET, loader) for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+        assert await cache.get(WALLET, loader) == 3
+        return calls
+
+    assert len(asyncio.run(scenario())) == 2
+    assert cache.coalesced == 4
+
+
+def test_ownership_cache_invalidates_and_evicts_least_recently_used():
+    cache = OwnershipCache(ttl=60, negative_ttl=60, max_entries=2)
+
+    async def scenario():
+        loader, calls = counting_loader([1, 2, 3, 1, 20])
+        await cache.get("0xa", loader)
+        await cache.get("0xb", loader)
+        await cache.get("0xa", loader)
+        await cache.get("0xc", loader)  # evicts 0xb, the least recently used
+        cache.invalidate("0xA")
+        cache.invalidate("0xa")
+        assert await cache.get("0xa", loader) == 1
+        assert await cache.get("0xb", loader) == 20
+        return calls
+
+    assert asyncio.run(scenario()) == ["0xa", "0xb", "0xc", "0xa", "0xb"]
+    assert cache.invalidations == 1
+
+
+def test_chain_client_retries_transient_errors_only():
+    async def scenario():
+        client = make_client()
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise aiohttp.ClientConnectionError("reset")
+            return 42
+        assert await client.call(flaky) == 42
+        assert len(attempts) == 3
+
+        async def hangs():
+            attempts.append(1)
+            await asyncio.sleep(10)
+        attempts.clear()
+        with pytest.raises(asyncio.TimeoutError):
+            await client.call(hangs)
+        assert len(attempts) == 3
+
+        async def reverts():
+            attempts.append(1)
+            raise ValueError("execution reverted")
+        attempts.clear()
+        with pytest.raises(ValueError):
+            await client.call(reverts)
+        assert len(attempts) == 1
+        await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_chain_client_caps_concurrent_calls():
+    async def scenario():
+        client = make_client(max_concurrency=2)
+        running = []
+        peak = []
+
+        async def slow_call():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+            return True
+        assert all(await asyncio.gather(*(client.call(slow_call) for _ in range(6))))
+        await client.close()
+        return max(peak)
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_owned_token_reads_the_first_token_of_the_wallet():
+    def fake_contract(balance):
+        async def result(value):
+            return value
+        return SimpleNamespace(functions=SimpleNamespace(
+            balanceOf=lambda owner: SimpleNamespace(call=lambda: result(balance)),
+            tokenOfOwnerByIndex=lambda owner, index: SimpleNamespace(call=lambda: result(100 + index)),
+        ))
+
+    async def scenario():
+        client = make_client()
+        client.contract = fake_contract(2)
+        owned = await client.owned_token(WALLET)
+        client.contract = fake_contract(0)
+        empty = await client.owned_token(WALLET)
+        await client.close()
+        return owned, empty
+
+    assert asyncio.run(scenario()) == (100, None)
+
+
+def test_transfer_watcher_evicts_both_parties():
+    def topic(address):
+        return bytes(12) + bytes.fromhex(address[2:])
+
+    sender, receiver = "0x" + "11" * 20, "0x" + "22" * 20
+    heads = iter([100, 102])
+
+    class FakeChain:
+        async def block_number(self):
+            return next(heads, 102)
+
+        async def transfer_logs(self, from_block, to_block):
+            assert (from_block, to_block) == (101, 102)
+            return [{"topics": [b"", topic(sender), topic(receiver)]}]
+
+    cache = OwnershipCache(ttl=60, negative_ttl=60)
+
+    async def scenario():
+        loader, _ = counting_loader([1, None])
+        await cache.get(sender, loader)
+        await cache.get(receiver, loader)
+        watcher = TransferWatcher(FakeChain(), cache, poll_interval=0.01)
+        watcher.start()
+        await asyncio.sleep(0.05)
+        await watcher.stop()
+
+    asyncio.run(scenario())
+    assert cache.stats()["entries"] == 0
+    assert cache.invalidations == 2
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+import server
+from channels import GLOBAL_CHANNEL, SubscriptionIndex, TooManySubscriptions, message_type_for, parse_channel
+from messages import RelayMessage
+from server import ConnectionManager, can_read_message
+
+
+def test_parse_channel():
+    assert parse_channel(GLOBAL_CHANNEL) == ("global", "")
+    assert parse_channel("trait:fur:blue") == ("trait", "fur:blue")
+    assert message_type_for("nft:42") == "direct"
+    for bad in ("", "nft:abc", "trait:fur", "lobby:1", "group:"):
+        with pytest.raises(ValueError):
+            parse_channel(bad)
+
+
+def test_subscription_index_is_two_way():
+    index = SubscriptionIndex()
+    index.subscribe("1", "global")
+    index.subscribe("1", "trait:fur:blue")
+    index.subscribe("2", "global")
+
+    assert index.subscribers("global") == {"1", "2"}
+    index.remove_session("1")
+    assert index.subscribers("trait:fur:blue") == set()
+    assert index.subscriptions("1") == set()
+    assert index.subscribers("global") == {"2"}
+
+
+def test_subscriptions_per_session_are_capped():
+    index = SubscriptionIndex(max_per_session=2)
+    index.subscribe("1", "global")
+    index.subscribe("1", "nft:1")
+    # Joining a channel again is not a new subscription
+    index.subscribe("1", "global")
+    with pytest.raises(TooManySubscriptions):
+        index.subscribe("1", "trait:fur:blue")
+    index.subscribe("2", "trait:fur:blue")
+    assert index.subscriptions("1") == {"global", "nft:1"}
+
+
+def test_direct_messages_are_readable_by_sender_and_recipient():
+    doc = {"id": "m", "nft_token_id": 7, "channel": "nft:9"}
+    allowed = [asyncio.run(can_read_message(token_id, doc)) for token_id in (7, 9, 8)]
+    assert allowed == [True, True, False]
+
+
+def test_broadcast_only_reaches_channel_subscribers(make_websocket):
+    async def scenario():
+        manager = ConnectionManager()
+        sockets = {user_id: make_websocket() for user_id in ("1", "2", "3")}
+        sessions = {user_id: await manager.connect(websocket, user_id, int(user_id)) for user_id, websocket in sockets.items()}
+        manager.subscriptions.subscribe(sessions["2"], "trait:fur:blue")
+
+        for channel in ("trait:fur:blue", "nft:3", GLOBAL_CHANNEL):
+            await manager.broadcast_audio(
+                RelayMessage(nft_token_id=1, wallet_address="0xabc", audio_data="eA==", duration=1.0, channel=channel),
+                "1"
+            )
+        await asyncio.sleep(0.05)
+        return {user_id: [frame["data"]["channel"] for frame in ws.messages] for user_id, ws in sockets.items()}
+
+    received = asyncio.run(scenario())
+    assert received["1"] == []
+    assert received["2"] == ["trait:fur:blue", GLOBAL_CHANNEL]
+    assert received["3"] == ["nft:3", GLOBAL_CHANNEL]
+
+
+def test_sessions_past_the_cap_evict_the_oldest(monkeypatch, make_websocket):
+    monkeypatch.setattr(server, "WS_MAX_SESSIONS_PER_NFT", 2)
+
+    async def scenario():
+        manager = ConnectionManager()
+        tabs = [make_websocket() for _ in range(3)]
+        sessions = [await manager.connect(websocket, "2", 2) for websocket in tabs]
+        await manager.connect(make_websocket(), "1", 1)
+        manager.subscriptions.subscribe(sessions[2], "trait:fur:blue")
+
+        for channel in (GLOBAL_CHANNEL, "trait:fur:blue"):
+            await manager.broadcast_audio(
+                RelayMessage(nft_token_id=1, wallet_address="0xabc", audio_data="eA==", duration=1.0, channel=channel),
+                "1"
+            )
+        await asyncio.sleep(0.05)
+        assert list(manager.user_sessions["2"]) == sessions[1:]
+        assert manager.online_user_ids() == {"1", "2"}
+
+        for session_id in sessions:
+            manager.disconnect(session_id)
+        assert manager.online_user_ids() == {"1"}
+        return tabs
+
+    oldest, middle, newest = asyncio.run(scenario())
+    assert oldest.closed_with == 4009 and oldest.frames == []
+    assert [frame["data"]["channel"] for frame in middle.messages] == [GLOBAL_CHANNEL]
+    assert [frame["data"]["channel"] for frame in newest.messages] == [GLOBAL_CHANNEL, "trait:fur:blue"]
+
+
+def test_group_listing_cap_and_owner_cannot_leave(monkeypatch, mock_db, api_client, auth_headers):
+    monkeypatch.setattr(server, "manager", ConnectionManager())
+    monkeypatch.setattr(server, "MAX_GROUPS_LISTED", 2)
+    client, headers = api_client, auth_headers
+
+    groups = [
+        client.post("/api/groups", json={"name": f"group {i}", "members": [2, 3]}, headers=headers(1)).json()["group"]
+        for i in range(3)
+    ]
+    # Listing has its own cap, independent of MAX_GROUP_MEMBERS
+    assert len(client.get("/api/groups", headers=headers(1)).json()["groups"]) == 2
+
+    members_url = f"/api/groups/{groups[0]['id']}/members"
+    assert client.delete(f"{members_url}/1", headers=headers(1)).status_code == 400
+    assert client.delete(f"{members_url}/1", headers=headers(2)).status_code == 404
+    assert client.delete(f"{members_url}/2", headers=headers(2)).status_code == 200
+    assert client.delete(f"{members_url}/3", headers=headers(1)).status_code == 200
+    remaining = asyncio.run(mock_db.channel_groups.find_one({"id": groups[0]["id"]}))
+    assert remaining["members"] == [1] and remaining["owner_token_id"] == 1
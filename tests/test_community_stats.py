@@ -0,0 +1,37 @@
+import asyncio
+
+from stats import CommunityCounters
+
+
+class CountedCollection:
+    def __init__(self, count):
+        self.count = count
+
+    async def estimated_document_count(self):
+        return self.count
+
+
+def test_reconcile_resets_counters_from_collection_metadata():
+    db = {"user_profiles": CountedCollection(12), "audio_messages": CountedCollection(340)}
+    counters = CommunityCounters(reconcile_interval=60, cache_ttl=0)
+    counters.increment("messages_sent", 5)
+
+    asyncio.run(counters.reconcile(db))
+    assert counters.counts == {"registered_nfts": 12, "messages_sent": 340}
+
+    counters.increment("messages_sent")
+    assert counters.render(dict)["messages_sent"] == 341
+
+
+def test_render_is_cached_for_ttl():
+    counters = CommunityCounters(reconcile_interval=60, cache_ttl=60)
+    builds = []
+
+    def build(counts):
+        builds.append(counts)
+        return {"total": counts["messages_sent"]}
+
+    assert counters.render(build) == {"total": 0}
+    counters.increment("messages_sent")
+    assert counters.render(build) == {"total": 0}
+    assert len(builds) == 1
@@ -0,0 +1,110 @@
+import asyncio
+
+import server
+from fanout import (
+    CLOSE_CODE_HEARTBEAT_TIMEOUT,
+    CLOSE_CODE_SEND_FAILED,
+    CLOSE_CODE_TOO_SLOW,
+    SLOW_CLIENT_DROP,
+    SLOW_CLIENT_LAG,
+    ClientChannel,
+)
+
+
+def make_channel(websocket, policy, dead):
+    return ClientChannel(websocket, "user", max_queue=2, policy=policy, send_timeout=5, on_dead=lambda *args: dead.append(args))
+
+
+def test_full_queue_applies_the_slow_client_policy(make_websocket):
+    async def run():
+        dead = []
+        lagging = make_channel(make_websocket(gated=True), SLOW_CLIENT_LAG, dead)
+        dropping = make_channel(make_websocket(gated=True), SLOW_CLIENT_DROP, dead)
+        await asyncio.sleep(0)
+        for channel in (lagging, dropping):
+            # The writer holds frame 0 while it waits on the socket, frames 1 and 2 fill the queue
+            assert channel.offer("frame 0")
+            await asyncio.sleep(0)
+            assert channel.offer("frame 1") and channel.offer("frame 2")
+            assert channel.offer("frame 3") == (channel is lagging)
+        assert lagging.lagging and lagging.frames_dropped == 1 and lagging.queue_depth == 2
+
+        lagging.websocket.gate.set()
+        while lagging.queue_depth or lagging.lagging:
+            await asyncio.sleep(0)
+        for channel in (lagging, dropping):
+            channel.close()
+        return lagging.websocket.frames
+
+    assert asyncio.run(run()) == ["frame 0", "frame 2", "frame 3"]
+
+
+def test_send_waits_for_room_and_close_releases_it(make_websocket):
+    async def fill(channel):
+        # Frame 0 is held by the writer, 1 and 2 fill the queue, frame 3 has to wait
+        for i in range(3):
+            await channel.send(f"frame {i}")
+        waiting = asyncio.create_task(channel.send("frame 3"))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        return waiting
+
+    async def run():
+        websocket = make_websocket(gated=True)
+        channel = make_channel(websocket, SLOW_CLIENT_DROP, [])
+        waiting = await fill(channel)
+        websocket.gate.set()
+        await asyncio.wait_for(waiting, 1)
+        while channel.queue_depth:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        channel.close()
+
+        closing = make_channel(make_websocket(gated=True), SLOW_CLIENT_DROP, [])
+        blocked = await fill(closing)
+        closing.close()
+        await asyncio.wait_for(blocked, 1)
+        return websocket.frames, closing.queue_depth
+
+    assert asyncio.run(run()) == (["frame 0", "frame 1", "frame 2", "frame 3"], 2)
+
+
+def test_failed_sends_close_the_socket(monkeypatch, make_websocket):
+    monkeypatch.setattr(server, "WS_SEND_TIMEOUT_SECONDS", 0.05)
+
+    async def run():
+        manager = server.ConnectionManager()
+        broken, stalled = make_websocket(fail_with=RuntimeError("connection reset")), make_websocket(gated=True)
+        await manager.connect(broken, "1", 1)
+        await manager.connect(stalled, "2", 2)
+        await manager.broadcast_event({"type": "hello"}, "3")
+        await asyncio.sleep(0.1)
+        assert manager.channels == {}
+        return broken.closed_with, stalled.closed_with
+
+    assert asyncio.run(run()) == (CLOSE_CODE_SEND_FAILED, CLOSE_CODE_TOO_SLOW)
+
+
+def test_heartbeat_only_reaps_clients_that_speak_it(monkeypatch, make_websocket):
+    monkeypatch.setattr(server, "WS_HEARTBEAT_TIMEOUT_SECONDS", 0)
+
+    async def run():
+        manager = server.ConnectionManager()
+        legacy, current = make_websocket(), make_websocket()
+        await manager.connect(legacy, "1", 1)
+        session_id = await manager.connect(current, "2", 2)
+        manager.touch(session_id, heartbeat=True)
+        await asyncio.sleep(0.01)
+        reaped = manager.check_heartbeats()
+        await asyncio.sleep(0.01)
+        return reaped, legacy, current
+
+    reaped, legacy, current = asyncio.run(run())
+    assert reaped == 1
+    assert current.closed_with == CLOSE_CODE_HEARTBEAT_TIMEOUT
+    # Clients that never answered a ping are left to protocol-level pings
+    assert legacy.closed_with is None and legacy.messages[-1]["type"] == "ping"
+
+
+def test_client_channel_has_no_instance_dict():
+    assert "__dict__" not in dir(ClientChannel)
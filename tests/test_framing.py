@@ -0,0 +1,73 @@
+import asyncio
+import base64
+import uuid
+from datetime import datetime
+
+import pytest
+
+from framing import (
+    AUDIO_HEADER,
+    CHUNK_HEADER,
+    decode_audio_frame,
+    decode_chunk_frame,
+    encode_audio_frame,
+    encode_chunk_frame,
+)
+from messages import RelayMessage
+from server import ConnectionManager
+
+
+def test_audio_frame_round_trip():
+    message_id = str(uuid.uuid4())
+    timestamp = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    frame = encode_audio_frame(message_id, 4321, 2.5, timestamp, base64.b64encode(b"opus bytes").decode())
+
+    assert len(frame) == AUDIO_HEADER.size + len(b"opus bytes")
+    decoded = decode_audio_frame(frame)
+    assert decoded.message_id == message_id
+    assert decoded.nft_token_id == 4321
+    assert decoded.duration == 2.5
+    assert decoded.timestamp == timestamp
+    assert decoded.audio == b"opus bytes"
+
+
+def test_chunk_frame_round_trip():
+    message_id = str(uuid.uuid4())
+    frame = encode_chunk_frame(message_id, 7, 3, b"\x00\x01")
+    assert len(frame) == CHUNK_HEADER.size + 2
+    assert decode_chunk_frame(frame) == (message_id, 7, 3, b"\x00\x01")
+
+
+def test_frames_are_not_mistaken_for_each_other():
+    message_id = str(uuid.uuid4())
+    audio = encode_audio_frame(message_id, 1, 1.0, datetime.utcnow(), "")
+    chunk = encode_chunk_frame(message_id, 1, 0, b"")
+    with pytest.raises(ValueError):
+        decode_chunk_frame(audio)
+    with pytest.raises(ValueError):
+        decode_audio_frame(chunk + b"\x00" * AUDIO_HEADER.size)
+    with pytest.raises(ValueError):
+        decode_audio_frame(audio[:AUDIO_HEADER.size - 1])
+
+
+def test_message_without_audio_is_refused():
+    with pytest.raises(ValueError):
+        encode_audio_frame(str(uuid.uuid4()), 1, 1.0, datetime.utcnow(), None)
+
+
+def test_binary_session_survives_a_message_without_audio(make_websocket):
+    async def scenario():
+        manager = ConnectionManager()
+        websocket = make_websocket()
+        session_id = await manager.connect(websocket, "1", 1, "binary")
+        # As loaded for replay when the blob is missing
+        missing = RelayMessage(nft_token_id=2, wallet_address="0xabc", duration=1.0)
+        await manager.send_audio_personal(session_id, missing)
+        manager.deliver_audio(missing, "2")
+        manager.send_personal(session_id, {"type": "replay_complete", "count": 0})
+        await asyncio.sleep(0.05)
+        return session_id in manager.channels, websocket
+
+    alive, websocket = asyncio.run(scenario())
+    assert alive and websocket.closed_with is None
+    assert len(websocket.frames) == 1 and websocket.messages[0]["type"] == "replay_complete"
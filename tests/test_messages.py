@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from fanout import encode_frame
+from messages import RelayMessage
+from server import AudioMessage
+
+
+def test_relay_message_matches_the_api_model():
+    message = RelayMessage(nft_token_id=7, wallet_address="0xabc", audio_data="eA==", duration=2.5, channel="nft:3")
+    model = AudioMessage(**message.to_dict())
+    assert message.to_dict() == model.dict()
+    assert message.to_dict(include_audio=False) == model.dict(exclude={"audio_data"})
+
+
+def test_relay_message_survives_a_backplane_round_trip():
+    message = RelayMessage(nft_token_id=7, wallet_address="0xabc", audio_data="eA==", duration=2, content_type="audio/webm")
+    decoded = RelayMessage.from_dict(json.loads(encode_frame(message.to_dict())))
+    assert decoded == message
+    assert isinstance(decoded.duration, float)
+
+    # Stored documents carry Mongo's _id and may predate newer fields
+    doc = {"_id": "x", **message.to_dict(include_audio=False)}
+    del doc["audio_size"], doc["channel"]
+    assert RelayMessage.from_dict(doc).channel == "global"
+
+
+def test_relay_message_has_no_instance_dict():
+    message = RelayMessage(nft_token_id=1, wallet_address="0xabc", duration=1.0)
+    assert not hasattr(message, "__dict__")
+    with pytest.raises(AttributeError):
+        message.extra = True
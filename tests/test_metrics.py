@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from prometheus_client import REGISTRY
+
+from fanout import SLOW_CLIENT_DROP, ClientChannel
+from metrics import LoopLagMonitor
+
+
+def sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_client_channel_observes_each_send(make_websocket):
+    async def run():
+        websocket = make_websocket()
+        channel = ClientChannel(websocket, "user", max_queue=10, policy=SLOW_CLIENT_DROP, send_timeout=1, on_dead=lambda *args: None)
+        for i in range(3):
+            assert channel.offer(f"frame {i}")
+        while len(websocket.frames) < 3:
+            await asyncio.sleep(0)
+        channel.close()
+
+    before = sample("yeti_ws_send_seconds_count")
+    asyncio.run(run())
+    assert sample("yeti_ws_send_seconds_count") - before == 3
+
+
+def test_loop_lag_monitor_sees_blocking_work():
+    async def run():
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # Block the loop
+        await asyncio.sleep(0.001)  # Let the overdue probe wake up, but not probe again
+        lag = monitor.lag
+        await monitor.stop()
+        return lag
+
+    assert asyncio.run(run()) >= 0.05
+    assert sample("yeti_event_loop_lag_seconds") >= 0.05
@@ -0,0 +1,18 @@
+import asyncio
+
+from audio_store import FileSystemAudioStore
+from migrations.audio_blobs import store_blob
+
+
+def test_store_blob_skips_blobs_a_previous_run_already_wrote(tmp_path):
+    store = FileSystemAudioStore(str(tmp_path))
+
+    async def scenario():
+        assert await store_blob(store, "msg-1", b"audio", "audio/webm")
+        # Interrupted after the put, before audio_data was unset: the rerun must not fail or rewrite
+        assert not await store_blob(store, "msg-1", b"audio", "audio/webm")
+        # A truncated blob is replaced
+        assert await store_blob(store, "msg-1", b"longer audio", "audio/webm")
+        return await store.read("msg-1")
+
+    assert asyncio.run(scenario()) == b"longer audio"
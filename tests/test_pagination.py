@@ -0,0 +1,62 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+from pagination import after_filter, decode_cursor, encode_cursor, keyset_filter
+
+
+def test_cursor_round_trips_as_url_safe_text():
+    timestamp = datetime(2024, 5, 1, 12, 30, 15, 123000)
+    cursor = encode_cursor(timestamp, "4f9c-?/+")
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert decode_cursor(cursor) == (timestamp, "4f9c-?/+")
+
+
+def b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    b64(b"[1, 2]"),
+    b64(b'{"ts": "2024-05-01T12:00:00"}'),
+    b64(b'{"ts": "yesterday", "id": "m1"}'),
+])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        keyset_filter(cursor, ascending=False)
+
+
+def test_keyset_filter_breaks_timestamp_ties_on_id():
+    timestamp = datetime(2024, 5, 1)
+    assert keyset_filter(None, ascending=True) == {}
+    assert keyset_filter(encode_cursor(timestamp, "m5"), ascending=False) == after_filter(timestamp, "m5", ascending=False) == {
+        "$or": [{"timestamp": {"$lt": timestamp}}, {"timestamp": timestamp, "id": {"$lt": "m5"}}]
+    }
+
+
+def test_history_pages_through_tied_timestamps_without_gaps(mock_db, api_client, auth_headers):
+    started = datetime(2024, 1, 1)
+    # Three messages share one timestamp, so only the id orders them
+    seconds = [0, 1, 2, 2, 2, 3, 4]
+    asyncio.run(mock_db.audio_messages.insert_many([
+        {"id": f"m{i}", "nft_token_id": 5, "wallet_address": "0xabc", "duration": 1.0,
+         "timestamp": started + timedelta(seconds=second), "message_type": "broadcast", "channel": "global"}
+        for i, second in enumerate(seconds)
+    ]))
+    headers, client = auth_headers(5), api_client
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/audio/history", params=params, headers=headers).json()
+        seen += [message["id"] for message in page["messages"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == ["m6", "m5", "m4", "m3", "m2", "m1", "m0"]
+    response = client.get("/api/audio/history", params={"cursor": "garbage"}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import pytest
+
+import server
+from ptt import PTTStream, PTTStreamError, parse_duration
+
+
+def test_parse_duration_rejects_junk():
+    assert parse_duration(None) is None
+    assert parse_duration("4.5") == 4.5
+    for bad in ("abc", "nan", "inf", -1, 0, True, [1]):
+        with pytest.raises(PTTStreamError):
+            parse_duration(bad)
+
+
+def test_reported_duration_is_capped_by_elapsed_time():
+    stream = PTTStream(1, "0xabc", "audio/webm", max_bytes=100, max_duration=30)
+    assert stream.duration(0.5) == 0.5
+    assert stream.duration(20) < 1
+
+
+def test_bad_and_empty_ptt_end_never_persist(monkeypatch, make_websocket):
+    saved = []
+
+    async def save_audio_message(*args, **kwargs):
+        saved.append(args)
+
+    monkeypatch.setattr(server, "manager", server.ConnectionManager())
+    monkeypatch.setattr(server, "save_audio_message", save_audio_message)
+    payload = {"token_id": 1, "wallet_address": "0xabc"}
+
+    async def send(stream, data, session_id):
+        return await server.handle_client_message({"text": json.dumps(data)}, stream, "1", session_id, payload)
+
+    async def scenario():
+        sender, listener = make_websocket(), make_websocket()
+        session_id = await server.manager.connect(sender, "1", 1)
+        await server.manager.connect(listener, "2", 2)
+
+        stream = await send(None, {"type": "ptt_start"}, session_id)
+        assert await send(stream, {"type": "ptt_end", "duration": "abc"}, session_id) is stream
+        assert await send(stream, {"type": "ptt_end", "duration": 1}, session_id) is None
+        await asyncio.sleep(0.05)
+        return sender.messages, listener.messages
+
+    sent, heard = asyncio.run(scenario())
+    assert [frame["type"] for frame in sent] == ["ptt_started", "error", "error"]
+    assert sent[1]["message"] == "Invalid duration"
+    assert [frame["type"] for frame in heard] == ["audio_stream_start", "audio_stream_abort"]
+    assert saved == []
@@ -0,0 +1,146 @@
+"""
+Explain-plan checks: every query the API sends to audio_messages and
+user_profiles must be answered from an index, never a collection scan.
+
+Needs a real mongod (mongomock has no query planner). Point TEST_MONGO_URL
+at one, default mongodb://localhost:27017; the test is skipped otherwise,
+or fails when TEST_REQUIRE_MONGO=1 (CI runs it against a mongod service).
+"""
+import base64
+import time
+import uuid
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from fastapi.testclient import TestClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+import server
+from audio_store import FileSystemAudioStore
+from persistence import MessageWriter
+
+CHECKED_COLLECTIONS = ("audio_messages", "user_profiles", "channel_groups")
+
+# Command fields that belong to the session/transport, not the query shape
+TRANSPORT_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "ordered"}
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Collects the find/update/delete commands the app sends"""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        if event.command_name in ("find", "update", "delete"):
+            self.commands.append(dict(event.command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def plan_stages(plan):
+    """All stage names in an explain plan tree (classic and SBE layouts)"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for key in ("queryPlan", "inputStage", "inputStages", "winningPlan", "shards"):
+            if key in plan:
+                yield from plan_stages(plan[key])
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+
+def exercise_endpoints(client):
+    """Hit every endpoint that reads or writes the checked collections"""
+    account = Account.create()
+    message = f"Yeti Talki Authentication Request: {int(time.time())}"
+    signature = Account.sign_message(encode_defunct(text=message), account.key).signature.hex()
+    auth = client.post("/api/auth/verify-nft", json={
+        "wallet_address": account.address,
+        "signature": signature,
+        "message": message
+    }).json()
+    assert auth["success"], auth
+    headers = {"Authorization": f"Bearer {auth['access_token']}"}
+    token_id = auth["token_id"]
+
+    # Log in twice so both the insert and the update path of the profile run
+    client.post("/api/auth/verify-nft", json={
+        "wallet_address": account.address,
+        "signature": signature,
+        "message": message
+    })
+
+    audio = base64.b64encode(b"index test audio").decode()
+    message_id = None
+    for _ in range(3):
+        response = client.post("/api/audio/broadcast", params={"audio_data": audio, "duration": 1.5}, headers=headers)
+        assert response.status_code == 200, response.text
+        message_id = response.json()["message_id"]
+
+    # Broadcasts are persisted write-behind, wait for the batch to land
+    client.portal.call(server.message_writer.flush)
+
+    assert client.get("/api/audio/latest", headers=headers).status_code == 200
+    page = client.get("/api/audio/history", params={"limit": 2}, headers=headers).json()
+    assert client.get("/api/audio/history", params={"cursor": page["next_cursor"]}, headers=headers).status_code == 200
+    assert client.get("/api/audio/history", params={"nft_token_id": token_id}, headers=headers).status_code == 200
+    assert client.get("/api/user/profile", headers=headers).status_code == 200
+    assert client.get(f"/api/user/recordings/{token_id}", headers=headers).status_code == 200
+    assert client.get(f"/api/audio/{message_id}/data", headers=headers).status_code == 200
+
+    group = client.post("/api/groups", json={"name": "index test"}, headers=headers).json()
+    response = client.post(
+        "/api/audio/broadcast",
+        params={"audio_data": audio, "duration": 1.5, "channel": group["channel"]},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    client.portal.call(server.message_writer.flush)
+    assert client.get("/api/groups", headers=headers).status_code == 200
+    assert client.get("/api/audio/history", params={"channel": group["channel"]}, headers=headers).status_code == 200
+    assert client.get("/api/audio/latest", params={"channel": group["channel"]}, headers=headers).status_code == 200
+
+
+def explain(db, command):
+    body = {k: v for k, v in command.items() if k not in TRANSPORT_FIELDS}
+    return db.command({"explain": body, "verbosity": "queryPlanner"})
+
+
+def test_endpoint_queries_use_indexes(mongod, mongo_url, tmp_path, monkeypatch):
+    db_name = f"yeti_index_test_{uuid.uuid4().hex[:8]}"
+    recorder = CommandRecorder()
+    app_db = AsyncIOMotorClient(mongo_url, event_listeners=[recorder])[db_name]
+    monkeypatch.setattr(server, "db", app_db)
+    monkeypatch.setattr(server, "message_writer", MessageWriter(
+        app_db.audio_messages, app_db.user_profiles, batch_size=100, flush_interval=0.01, max_pending=100
+    ))
+    monkeypatch.setattr(server, "audio_store", FileSystemAudioStore(str(tmp_path)))
+
+    try:
+        # Entering the client runs startup, which ensures the indexes
+        with TestClient(server.app) as client:
+            exercise_endpoints(client)
+
+        db = mongod[db_name]
+        checked = 0
+        collection_scans = []
+        for command in recorder.commands:
+            collection = command.get("find") or command.get("update") or command.get("delete")
+            if collection not in CHECKED_COLLECTIONS:
+                continue
+            plan = explain(db, command)["queryPlanner"]["winningPlan"]
+            checked += 1
+            if "COLLSCAN" in set(plan_stages(plan)):
+                collection_scans.append(command)
+
+        assert checked, "No queries were recorded"
+        assert not collection_scans, f"Queries without index support: {collection_scans}"
+    finally:
+        mongod.drop_database(db_name)
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+import ratelimit
+import server
+from ratelimit import AdmissionControl, InMemoryRateLimiter, RateLimit, RedisRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_in_memory_bucket_allows_burst_then_refills(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    limiter = InMemoryRateLimiter()
+    limit = RateLimit(per_minute=60, burst=3)
+
+    async def hits(key, count):
+        return [await limiter.hit("broadcast", key, limit) for _ in range(count)]
+
+    assert asyncio.run(hits("1", 3)) == [0.0, 0.0, 0.0]
+    assert asyncio.run(hits("1", 1)) == [pytest.approx(1.0)]
+    # Other NFTs have their own bucket
+    assert asyncio.run(hits("2", 1)) == [0.0]
+
+    clock.now += 1.5
+    assert asyncio.run(hits("1", 2)) == [0.0, pytest.approx(0.5)]
+
+
+def test_redis_bucket_is_shared_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    limit = RateLimit(per_minute=6, burst=2)
+
+    async def scenario():
+        worker_a = RedisRateLimiter(fakeredis.aioredis.FakeRedis(server=server))
+        worker_b = RedisRateLimiter(fakeredis.aioredis.FakeRedis(server=server))
+        return [
+            await worker_a.hit("login", "42", limit),
+            await worker_b.hit("login", "42", limit),
+            await worker_a.hit("login", "42", limit),
+        ]
+
+    first, second, third = asyncio.run(scenario())
+    assert first == 0.0 and second == 0.0
+    assert 9 < third <= 10
+
+
+def test_admission_control_sheds_while_over_thresholds():
+    depth, lag = [0], [0.0]
+    admission = AdmissionControl(
+        queue_depth=lambda: depth[0],
+        loop_lag=lambda: lag[0],
+        max_queue_depth=100,
+        max_loop_lag=0.5,
+        interval=1
+    )
+    admission.sample()
+    assert admission.overload_reason is None
+
+    depth[0] = 101
+    admission.sample()
+    assert admission.overload_reason == "outbound_queue"
+
+    depth[0], lag[0] = 0, 0.75
+    admission.sample()
+    assert admission.overload_reason == "loop_lag"
+
+    lag[0] = 0.1
+    admission.sample()
+    assert admission.overload_reason is None
+
+
+def test_unsigned_logins_cannot_lock_out_a_wallet(monkeypatch):
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+    from fastapi.testclient import TestClient
+
+    async def no_nft(wallet_address):
+        return None
+
+    monkeypatch.setattr(server, "rate_limiter", InMemoryRateLimiter())
+    monkeypatch.setattr(server, "verify_nft_ownership", no_nft)
+    monkeypatch.setitem(server.RATE_LIMITS, "login", RateLimit(per_minute=1, burst=2))
+    monkeypatch.setitem(server.RATE_LIMITS, "login_ip", RateLimit(per_minute=1, burst=20))
+    victim = Account.create()
+    message = "Yeti Talki Authentication Request: 1"
+    signature = Account.sign_message(encode_defunct(text=message), victim.key).signature.hex()
+    client = TestClient(server.app)
+
+    def login(signature):
+        return client.post("/api/auth/verify-nft", json={
+            "wallet_address": victim.address, "signature": signature, "message": message
+        })
+
+    for _ in range(10):
+        assert login("0x" + "00" * 65).json()["message"] == "Invalid signature"
+    # The spam only counted against the sender's IP, the owner still gets through
+    assert login(signature).json()["message"].startswith("No Frosty Ape Yeti NFT")
+    assert [login(signature).status_code for _ in range(2)] == [200, 429]
+    # And the IP bucket eventually stops the spammer
+    assert [login("0x").status_code for _ in range(8)][-1] == 429
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime
+
+import server
+from messages import RelayMessage
+from recent import RecentBroadcasts
+
+
+def clip(channel="global", size=4):
+    return RelayMessage(nft_token_id=1, wallet_address="0xabc", duration=1.0, audio_data="a" * size, channel=channel)
+
+
+def test_ring_is_bounded_by_count_and_bytes():
+    ring = RecentBroadcasts(max_messages=3, max_bytes=10)
+    messages = [clip() for _ in range(4)]
+    for message in messages:
+        ring.add(message)
+    # 4 bytes each: the byte budget (10) keeps only the newest two
+    assert len(ring) == 2 and ring.size_bytes == 8
+    assert ring.get(messages[1].id) is None and ring.get(messages[3].id) is messages[3]
+
+
+def test_latest_and_since_follow_channels():
+    ring = RecentBroadcasts(max_messages=10, max_bytes=1000)
+    first, trait, second = clip(), clip("trait:fur:blue"), clip()
+    for message in (first, trait, second):
+        ring.add(message)
+    assert ring.latest("global") is second
+    assert ring.latest("nft:5") is None
+    assert ring.since(first.id, {"global"}) == [second]
+    assert ring.since(first.id, {"global", "trait:fur:blue"}) == [trait, second]
+    assert ring.since("unknown", {"global"}) is None
+
+
+def test_oversized_clip_never_leaves_a_stale_latest():
+    ring = RecentBroadcasts(max_messages=10, max_bytes=10)
+    older = clip()
+    ring.add(older)
+    ring.add(clip(size=11))
+    assert ring.latest("global") is None and ring.since(older.id, {"global"}) is None
+    assert ring.size_bytes == 0
+
+
+def test_replay_sends_missed_broadcasts_from_the_ring(monkeypatch, make_websocket):
+    monkeypatch.setattr(server, "manager", server.ConnectionManager())
+    monkeypatch.setattr(server, "recent_broadcasts", RecentBroadcasts(max_messages=10, max_bytes=1000))
+    heard, missed, elsewhere, latest = clip(), clip(), clip("trait:fur:blue"), clip()
+    for message in (heard, missed, elsewhere, latest):
+        server.recent_broadcasts.add(message)
+
+    async def scenario():
+        websocket = make_websocket()
+        session_id = await server.manager.connect(websocket, "2", 2)
+        await server.replay_recent(session_id, heard.id)
+        await asyncio.sleep(0.05)
+        return websocket.messages
+
+    frames = asyncio.run(scenario())
+    assert [frame["data"]["id"] for frame in frames[:-1]] == [missed.id, latest.id]
+    assert frames[-1] == {"type": "replay_complete", "count": 2}
+
+
+def test_replay_falls_back_to_the_database(monkeypatch, make_websocket, mock_db):
+    monkeypatch.setattr(server, "manager", server.ConnectionManager())
+    monkeypatch.setattr(server, "recent_broadcasts", RecentBroadcasts(max_messages=10, max_bytes=1000))
+    stored = [clip() for _ in range(3)]
+    for i, message in enumerate(stored):
+        # Mongo keeps milliseconds, clips created back to back would tie
+        message.timestamp = datetime(2024, 1, 1, 0, 0, i)
+
+    async def scenario():
+        await mock_db.audio_messages.insert_many([message.to_dict() for message in stored])
+        websocket = make_websocket()
+        session_id = await server.manager.connect(websocket, "2", 2)
+        await server.replay_recent(session_id, stored[0].id)
+        await server.replay_recent(session_id, "unknown")
+        await asyncio.sleep(0.05)
+        return websocket.messages
+
+    frames = asyncio.run(scenario())
+    assert [frame["data"]["id"] for frame in frames[:2]] == [stored[1].id, stored[2].id]
+    assert frames[2:] == [
+        {"type": "replay_complete", "count": 2},
+        {"type": "error", "message": "Unknown message id"},
+    ]
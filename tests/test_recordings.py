@@ -0,0 +1,25 @@
+import asyncio
+from datetime import datetime, timedelta
+
+
+def test_other_holders_only_count_public_recordings(mock_db, api_client, auth_headers):
+    started = datetime(2024, 1, 1)
+    docs = [
+        {"id": f"m{i}", "nft_token_id": 5, "wallet_address": "0xabc", "duration": 1.0,
+         "timestamp": started + timedelta(seconds=i), "message_type": message_type, "channel": channel}
+        for i, (message_type, channel) in enumerate([("broadcast", "global"), ("direct", "nft:9"), ("group", "group:g")])
+    ]
+
+    async def seed():
+        await mock_db.audio_messages.insert_many(docs)
+        await mock_db.user_profiles.insert_one({"nft_token_id": 5, "total_messages_sent": 3})
+
+    asyncio.run(seed())
+
+    def recordings(as_token_id):
+        return api_client.get("/api/user/recordings/5", headers=auth_headers(as_token_id)).json()
+
+    other = recordings(6)
+    assert other["total_recordings"] == 1 and [r["id"] for r in other["recordings"]] == ["m0"]
+    own = recordings(5)
+    assert own["total_recordings"] == 3 and len(own["recordings"]) == 3
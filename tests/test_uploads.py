@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+import pytest
+
+import server
+from audio_store import BlobNotFound, FileSystemAudioStore
+from ratelimit import InMemoryRateLimiter
+from uploads import AudioUpload, UploadError, UploadTooLarge
+
+
+def chunked(data, size=1000):
+    async def body():
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+    return body()
+
+
+def read(upload):
+    async def collect():
+        return b"".join([chunk async for chunk in upload.chunks()])
+    return asyncio.run(collect())
+
+
+def multipart(files, data):
+    request = httpx.Request("POST", "http://test/", files=files, data=data)
+    return request.headers, request.read()
+
+
+def test_raw_body_streams_through_with_its_content_type():
+    clip = bytes(range(256)) * 20
+    upload = AudioUpload({"content-type": "audio/webm"}, chunked(clip), max_bytes=len(clip))
+    assert read(upload) == clip
+    assert upload.content_type == "audio/webm"
+    assert upload.size == len(clip)
+
+
+def test_multipart_file_part_and_fields_in_any_order():
+    clip = b"\x00\xff" * 3000
+    headers, body = multipart({"audio": ("clip.ogg", clip, "audio/ogg")}, {"duration": "4.5", "channel": "global"})
+    upload = AudioUpload(headers, chunked(body, 7), max_bytes=len(clip))
+    assert read(upload) == clip
+    assert upload.content_type == "audio/ogg"
+    assert upload.fields == {"duration": "4.5", "channel": "global"}
+
+
+def test_missing_file_part_is_rejected():
+    headers, body = multipart({"other": ("clip.ogg", b"x", "audio/ogg")}, {"duration": "1"})
+    with pytest.raises(UploadError):
+        read(AudioUpload(headers, chunked(body), max_bytes=1000))
+
+
+def test_oversized_uploads_are_refused_early():
+    # Declared length: refused before reading anything
+    with pytest.raises(UploadTooLarge):
+        AudioUpload({"content-type": "audio/webm", "content-length": "5001"}, chunked(b""), max_bytes=5000)
+
+    # Chunked body: refused at the first chunk past the limit
+    consumed = []
+
+    async def body():
+        for _ in range(100):
+            consumed.append(1)
+            yield b"x" * 1000
+
+    with pytest.raises(UploadTooLarge):
+        read(AudioUpload({"content-type": "audio/webm"}, body(), max_bytes=5000))
+    assert len(consumed) == 6
+
+
+def test_file_store_discards_partial_blob_on_failure(tmp_path):
+    store = FileSystemAudioStore(str(tmp_path))
+    upload = AudioUpload({"content-type": "audio/webm"}, chunked(b"x" * 10000), max_bytes=5000)
+
+    async def scenario():
+        with pytest.raises(UploadTooLarge):
+            await store.put_stream("blob1", upload.chunks())
+        with pytest.raises(BlobNotFound):
+            await store.size("blob1")
+        assert await store.put_stream("blob2", chunked(b"abc" * 100)) == 300
+        assert await store.read("blob2") == b"abc" * 100
+
+    asyncio.run(scenario())
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == ["blob2"]
+
+
+@pytest.mark.parametrize("duration", ["nan", "-5", "inf", "0", "31"])
+def test_upload_rejects_implausible_durations(monkeypatch, tmp_path, duration, api_client, auth_headers):
+    monkeypatch.setattr(server, "audio_store", FileSystemAudioStore(str(tmp_path)))
+    monkeypatch.setattr(server, "rate_limiter", InMemoryRateLimiter())
+    headers, client = auth_headers(1), api_client
+
+    raw = client.post("/api/audio/upload", params={"duration": duration}, content=b"x" * 100,
+                      headers={**headers, "Content-Type": "audio/webm"})
+    form = client.post("/api/audio/upload", files={"audio": ("a.ogg", b"x" * 100, "audio/ogg")},
+                       data={"duration": duration}, headers=headers)
+    assert (raw.status_code, form.status_code) == (400, 400)
+    # Blobs streamed in before the check are cleaned up
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from vad import MIN_GAP_MS, PAD_MS, speech_segments, trim_silence
+
+SAMPLE_RATE = 16000
+
+
+def clip(*parts, noise=0.001, seed=0):
+    """Concatenate (seconds, amplitude) parts of a 200 Hz tone over low background noise"""
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for seconds, amplitude in parts:
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        chunks.append(amplitude * np.sin(2 * np.pi * 200 * t))
+    pcm = np.concatenate(chunks)
+    return (pcm + rng.normal(0, noise, pcm.size)).astype(np.float32)
+
+
+def test_finds_speech_between_silence():
+    pad = PAD_MS / 1000
+    segments = speech_segments(clip((1.0, 0), (2.0, 0.2), (1.5, 0)), SAMPLE_RATE)
+    assert len(segments) == 1
+    start, end = segments[0]
+    assert start == pytest.approx(1.0 - pad, abs=0.03)
+    assert end == pytest.approx(3.0 + pad, abs=0.03)
+
+
+def test_bridges_short_gaps_and_splits_long_ones():
+    short_gap = (MIN_GAP_MS / 2) / 1000
+    assert len(speech_segments(clip((0.5, 0), (0.5, 0.2), (short_gap, 0), (0.5, 0.2), (0.5, 0)), SAMPLE_RATE)) == 1
+    assert len(speech_segments(clip((0.5, 0), (0.5, 0.2), (1.0, 0), (0.5, 0.2), (0.5, 0)), SAMPLE_RATE)) == 2
+
+
+def test_ignores_clicks_and_silence():
+    click = clip((1.0, 0), (0.02, 0.8), (1.0, 0))
+    assert speech_segments(click, SAMPLE_RATE) == []
+    assert trim_silence(clip((2.0, 0)), SAMPLE_RATE).size == 0
+
+
+def test_trim_keeps_speech_and_padding():
+    trimmed = trim_silence(clip((1.0, 0), (2.0, 0.2), (1.0, 0)), SAMPLE_RATE)
+    assert trimmed.size / SAMPLE_RATE == pytest.approx(2.0 + 2 * PAD_MS / 1000, abs=0.05)
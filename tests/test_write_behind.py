@@ -0,0 +1,130 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta
+
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+import server
+from audio_store import FileSystemAudioStore
+from messages import RelayMessage
+from persistence import MessageWriter
+from recent import RecentBroadcasts
+
+
+class FakeCollection:
+    """Records insert_many/bulk_write calls, optionally failing the first few"""
+
+    def __init__(self, failures=0, duplicate_replays=False):
+        self.failures = failures
+        self.duplicate_replays = duplicate_replays
+        self.inserted = {}
+        self.calls = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls.append(list(documents))
+        if self.failures:
+            self.failures -= 1
+            # The write reached the server but the acknowledgement was lost
+            for document in documents:
+                self.inserted[document["id"]] = document
+            raise AutoReconnect("connection reset")
+        duplicates = [
+            {"index": i, "code": 11000} for i, document in enumerate(documents) if document["id"] in self.inserted
+        ]
+        for document in documents:
+            self.inserted.setdefault(document["id"], document)
+        if duplicates:
+            raise BulkWriteError({"writeErrors": duplicates, "writeConcernErrors": []})
+
+    async def bulk_write(self, requests, ordered=True):
+        self.calls.append(list(requests))
+
+
+def message(token_id, i, start=datetime(2024, 1, 1)):
+    return {"id": f"{token_id}-{i}", "nft_token_id": token_id, "timestamp": start + timedelta(seconds=i)}
+
+
+def test_batches_inserts_and_coalesces_counters():
+    async def scenario():
+        messages, profiles = FakeCollection(), FakeCollection()
+        writer = MessageWriter(messages, profiles, batch_size=100, flush_interval=0.05, max_pending=100)
+        writer.start()
+        for i in range(3):
+            await writer.enqueue(message(1, i))
+        await writer.enqueue(message(2, 0))
+        await writer.flush()
+        await writer.stop()
+        return messages, profiles, writer
+
+    messages, profiles, writer = asyncio.run(scenario())
+    assert len(messages.calls) == 1 and len(messages.calls[0]) == 4
+    updates = {op._filter["nft_token_id"]: op._doc for op in profiles.calls[0]}
+    assert updates[1]["$inc"] == {"total_messages_sent": 3}
+    assert updates[1]["$max"] == {"last_active": datetime(2024, 1, 1, 0, 0, 2)}
+    assert updates[2]["$inc"] == {"total_messages_sent": 1}
+    assert writer.stats()["flushed"] == 4 and writer.stats()["queue_depth"] == 0
+
+
+def test_failed_flush_is_retried_without_duplicates():
+    async def scenario():
+        messages, profiles = FakeCollection(failures=1), FakeCollection()
+        writer = MessageWriter(messages, profiles, batch_size=10, flush_interval=0.01, max_pending=10, retry_backoff=0.01)
+        writer.start()
+        await writer.enqueue(message(1, 0))
+        await writer.flush()
+        await writer.stop()
+        return messages, profiles, writer
+
+    messages, profiles, writer = asyncio.run(scenario())
+    assert len(messages.inserted) == 1
+    # Counters only go out once the inserts are known to have landed
+    assert len(profiles.calls) == 1
+    assert writer.failures == 1
+
+
+def test_stop_flushes_pending_messages_and_applies_backpressure():
+    async def scenario():
+        messages, profiles = FakeCollection(), FakeCollection()
+        writer = MessageWriter(messages, profiles, batch_size=2, flush_interval=10, max_pending=2)
+        writer.start()
+        enqueues = asyncio.gather(*(writer.enqueue(message(1, i)) for i in range(5)))
+        await asyncio.sleep(0)
+        assert writer.queue_depth <= 2
+        await enqueues
+        await writer.stop()
+        return messages
+
+    messages = asyncio.run(scenario())
+    assert len(messages.inserted) == 5
+
+
+def test_pending_documents_are_readable_until_flushed():
+    async def scenario():
+        writer = MessageWriter(FakeCollection(), FakeCollection(), batch_size=100, flush_interval=10, max_pending=100)
+        writer.start()
+        await writer.enqueue(message(1, 0))
+        assert writer.pending("1-0")["nft_token_id"] == 1
+        await writer.flush()
+        assert writer.pending("1-0") is None
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_just_broadcast_audio_downloads_before_the_flush(monkeypatch, tmp_path, mock_db, api_client, auth_headers):
+    monkeypatch.setattr(server, "audio_store", FileSystemAudioStore(str(tmp_path)))
+    monkeypatch.setattr(server, "recent_broadcasts", RecentBroadcasts(max_messages=10, max_bytes=1024))
+    headers, client = auth_headers(2), api_client
+
+    # Relayed, but neither the blob nor the document is written yet
+    relayed = RelayMessage(nft_token_id=1, wallet_address="0xabc", duration=1.0, audio_data=base64.b64encode(b"clip").decode())
+    server.recent_broadcasts.add(relayed)
+    response = client.get(f"/api/audio/{relayed.id}/data", headers=headers)
+    assert (response.status_code, response.content) == (200, b"clip")
+
+    # Gone from the ring, its blob stored and the document still waiting for the next flush
+    queued = RelayMessage(nft_token_id=1, wallet_address="0xabc", duration=1.0, content_type="audio/webm")
+    asyncio.run(server.audio_store.put(queued.id, b"stored", queued.content_type))
+    monkeypatch.setattr(server.message_writer, "pending", {queued.id: queued.to_dict(include_audio=False)}.get)
+    response = client.get(f"/api/audio/{queued.id}/data", headers={**headers, "Range": "bytes=1-"})
+    assert (response.status_code, response.content) == (206, b"tored")
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from vad import trim_silence
+
+logger = logging.getLogger(__name__)
+
+OPUS_CONTENT_TYPE = "audio/ogg; codecs=opus"
+
+# Opus always runs at 48 kHz, decode straight to that rate
+OPUS_SAMPLE_RATE = 48000
+
+# Upper bound on one ffmpeg run, a 30 second clip takes well under a second
+TRANSCODE_TIMEOUT_SECONDS = 20
+
+
+class AudioProcessingError(Exception):
+    """Raised when a clip cannot be decoded or transcoded"""
+
+
+class NoSpeechError(AudioProcessingError):
+    """Raised when voice activity detection finds nothing but silence"""
+
+
+class ProcessedAudio(NamedTuple):
+    data: bytes
+    content_type: str
+    duration: float
+    original_size: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_size - len(self.data)
+
+
+def _ffmpeg(arguments: List[str], data: bytes) -> bytes:
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error", *arguments]
+    try:
+        result = subprocess.run(command, input=data, capture_output=True, timeout=TRANSCODE_TIMEOUT_SECONDS)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise AudioProcessingError(f"ffmpeg failed: {e}")
+    if result.returncode != 0 or not result.stdout:
+        raise AudioProcessingError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def decode_pcm(data: bytes) -> np.ndarray:
+    """Decode any container/codec ffmpeg understands to mono float32 PCM at the Opus rate"""
+    raw = _ffmpeg(["-i", "pipe:0", "-ac", "1", "-ar", str(OPUS_SAMPLE_RATE), "-f", "f32le", "pipe:1"], data)
+    return np.frombuffer(raw, dtype="<f4")
+
+
+def transcode_clip(data: bytes, bitrate: str, loudness_lufs: float, silence_db: float) -> ProcessedAudio:
+    """
+    Decode, trim leading/trailing non-speech (see vad.py), normalize loudness
+    and encode as mono Opus.
+    Runs ffmpeg synchronously, so call it in a worker process (see AudioProcessor).
+    """
+    pcm = trim_silence(decode_pcm(data), OPUS_SAMPLE_RATE, silence_db)
+    if pcm.size == 0:
+        raise NoSpeechError("No speech detected in clip")
+    encoded = _ffmpeg([
+        "-f", "f32le", "-ac", "1", "-ar", str(OPUS_SAMPLE_RATE), "-i", "pipe:0",
+        "-af", f"loudnorm=I={loudness_lufs}:TP=-1.5:LRA=11",
+        "-ar", str(OPUS_SAMPLE_RATE),
+        "-c:a", "libopus", "-b:a", bitrate, "-application", "voip",
+        "-f", "ogg", "pipe:1",
+    ], pcm.tobytes())
+    return ProcessedAudio(
+        data=encoded,
+        content_type=OPUS_CONTENT_TYPE,
+        # Length of the audio actually kept, not what the client claimed
+        duration=pcm.size / OPUS_SAMPLE_RATE,
+        original_size=len(data),
+    )
+
+
+class AudioProcessor:
+    """
+    Optional processing stage in front of persistence and relay.
+    Clips are decoded, VAD-trimmed and transcoded in a process pool so ffmpeg
+    and the NumPy analysis never block the event loop.
+    """
+
+    def __init__(self, workers: int, bitrate: str, loudness_lufs: float, silence_db: float):
+        self.workers = workers
+        self.bitrate = bitrate
+        self.loudness_lufs = loudness_lufs
+        self.silence_db = silence_db
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.clips = 0
+        self.failures = 0
+        self.silent = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def start(self):
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError("AUDIO_TRANSCODE is enabled but ffmpeg is not installed")
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def stop(self):
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def process(self, data: bytes) -> ProcessedAudio:
+        loop = asyncio.get_running_loop()
+        try:
+            processed = await loop.run_in_executor(
+                self._executor, transcode_clip, data, self.bitrate, self.loudness_lufs, self.silence_db
+            )
+        except NoSpeechError:
+            self.silent += 1
+            raise
+        except AudioProcessingError:
+            self.failures += 1
+            raise
+        self.clips += 1
+        self.bytes_in += processed.original_size
+        self.bytes_out += len(processed.data)
+        return processed
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "clips": self.clips,
+            "failures": self.failures,
+            "silent": self.silent,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out
+        }
@@ -0,0 +1,223 @@
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+
+# Bytes read per iteration when streaming a blob back out
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_BLOB_ID_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class BlobNotFound(Exception):
+    """Raised when a blob id is not in the store"""
+
+
+class AudioBlobStore:
+    """
+    Storage for raw audio bytes. Message documents only keep metadata and
+    the blob id, so history queries never drag audio into the working set.
+    """
+
+    name = "base"
+
+    async def put(self, blob_id: str, data: bytes, content_type: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    async def put_stream(self, blob_id: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> int:
+        """
+        Store a blob written chunk by chunk and return its size.
+        If the iterator raises, nothing is stored and the error propagates.
+        """
+        data = b"".join([chunk async for chunk in chunks])
+        await self.put(blob_id, data, content_type)
+        return len(data)
+
+    async def size(self, blob_id: str) -> int:
+        raise NotImplementedError
+
+    def stream(self, blob_id: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive) of a blob"""
+        raise NotImplementedError
+
+    async def delete(self, blob_id: str) -> None:
+        raise NotImplementedError
+
+    async def read(self, blob_id: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(blob_id)])
+
+
+class GridFSAudioStore(AudioBlobStore):
+    """Chunked blobs in MongoDB via GridFS (default, no extra infrastructure)"""
+
+    name = "gridfs"
+
+    def __init__(self, db: AsyncIOMotorDatabase, bucket_name: str = "audio_blobs"):
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+
+    async def put(self, blob_id: str, data: bytes, content_type: Optional[str] = None) -> None:
+        await self.bucket.upload_from_stream_with_id(
+            blob_id,
+            blob_id,
+            data,
+            metadata={"content_type": content_type}
+        )
+
+    async def put_stream(self, blob_id: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> int:
+        grid_in = self.bucket.open_upload_stream_with_id(blob_id, blob_id, metadata={"content_type": content_type})
+        size = 0
+        try:
+            async for chunk in chunks:
+                await grid_in.write(chunk)
+                size += len(chunk)
+        except BaseException:
+            # Drops the chunks already written
+            await grid_in.abort()
+            raise
+        await grid_in.close()
+        return size
+
+    async def _open(self, blob_id: str):
+        try:
+            return await self.bucket.open_download_stream(blob_id)
+        except NoFile:
+            raise BlobNotFound(blob_id)
+
+    async def size(self, blob_id: str) -> int:
+        grid_out = await self._open(blob_id)
+        return grid_out.length
+
+    async def stream(self, blob_id: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        grid_out = await self._open(blob_id)
+        end = grid_out.length - 1 if end is None else end
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete(self, blob_id: str) -> None:
+        try:
+            await self.bucket.delete(blob_id)
+        except NoFile:
+            pass
+
+
+class FileSystemAudioStore(AudioBlobStore):
+    """Blobs as plain files, e.g. on a mounted volume or object-store fuse mount"""
+
+    name = "file"
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, blob_id: str) -> Path:
+        if not _BLOB_ID_RE.match(blob_id):
+            raise BlobNotFound(blob_id)
+        # Fan out into subdirectories so no single directory grows huge
+        return self.root / blob_id[:2] / blob_id
+
+    async def put(self, blob_id: str, data: bytes, content_type: Optional[str] = None) -> None:
+        path = self._path(blob_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{blob_id}.{uuid.uuid4().hex}.tmp")
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(data)
+        os.replace(tmp_path, path)
+
+    async def put_stream(self, blob_id: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> int:
+        path = self._path(blob_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{blob_id}.{uuid.uuid4().hex}.tmp")
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
+        return size
+
+    async def size(self, blob_id: str) -> int:
+        try:
+            stat = await aiofiles.os.stat(self._path(blob_id))
+        except FileNotFoundError:
+            raise BlobNotFound(blob_id)
+        return stat.st_size
+
+    async def stream(self, blob_id: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        path = self._path(blob_id)
+        if end is None:
+            end = await self.size(blob_id) - 1
+        try:
+            f = await aiofiles.open(path, "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(blob_id)
+        try:
+            await f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await f.read(min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await f.close()
+
+    async def delete(self, blob_id: str) -> None:
+        try:
+            await aiofiles.os.remove(self._path(blob_id))
+        except FileNotFoundError:
+            pass
+
+
+def create_audio_store(db: AsyncIOMotorDatabase, url: str) -> AudioBlobStore:
+    """
+    Build the configured store from AUDIO_STORE_URL:
+    "gridfs" (default) or "file:///var/lib/yeti/audio"
+    """
+    if url == "gridfs":
+        return GridFSAudioStore(db)
+    if url.startswith("file://"):
+        return FileSystemAudioStore(url[len("file://"):])
+    raise ValueError(f"Unsupported AUDIO_STORE_URL: {url}")
+
+
+def parse_range_header(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Resolve a single-range "bytes=" header against a blob size.
+    Returns an inclusive (start, end), or None for ranges the server does not
+    support (other units, several ranges), which RFC 9110 lets it ignore and
+    answer with the whole body. Raises ValueError when unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length <= 0:
+            raise ValueError("Empty suffix range")
+        start, end = max(size - length, 0), size - 1
+    else:
+        start = int(first)
+        end = int(last) if last else size - 1
+        end = min(end, size - 1)
+    if start < 0 or start > end or start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, end
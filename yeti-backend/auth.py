@@ -0,0 +1,119 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenCache:
+    """
+    Bounded LRU of already verified JWTs, keyed by a hash of the token.
+    Entries expire together with the token's own exp claim, so a cached
+    token is never accepted longer than jwt.decode would accept it.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            payload, expires_at = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        """Remember a payload that jwt.decode has just accepted"""
+        if "exp" not in payload:
+            # Without an expiry there is nothing safe to bound the entry by
+            return
+        key = self._key(token)
+        self._entries[key] = (payload, float(payload["exp"]))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class TicketError(Exception):
+    """Raised for malformed, forged, expired or already used websocket tickets"""
+
+
+class WebSocketTickets:
+    """
+    Short-lived, single-use websocket tickets so long-lived JWTs stay out of
+    URLs and access logs. A ticket is a compact HMAC-signed blob carrying the
+    user's claims, so any worker can verify it without shared storage; each
+    worker remembers redeemed nonces until they expire (other workers are told
+    about redemptions via mark_used).
+    """
+
+    def __init__(self, secret: str, ttl: float):
+        self._key = hashlib.sha256(b"ws-ticket:" + secret.encode()).digest()
+        self.ttl = ttl
+        self._used: Dict[str, float] = {}
+
+    def _sign(self, body: str) -> str:
+        return _b64encode(hmac.new(self._key, body.encode(), hashlib.sha256).digest()[:16])
+
+    def issue(self, token_id: int, wallet_address: str, not_after: Optional[float] = None) -> str:
+        """New ticket, valid for ttl seconds but never beyond not_after (the JWT's exp)"""
+        expires_at = time.time() + self.ttl
+        if not_after is not None:
+            expires_at = min(expires_at, not_after)
+        claims = {"t": token_id, "w": wallet_address, "e": int(expires_at), "n": secrets.token_urlsafe(9)}
+        body = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{body}.{self._sign(body)}"
+
+    def redeem(self, ticket: str) -> Dict[str, Any]:
+        """Verify and consume a ticket, returning the JWT-style payload it stands for"""
+        body, _, signature = ticket.partition(".")
+        if not hmac.compare_digest(signature.encode(), self._sign(body).encode()):
+            raise TicketError("Invalid ticket")
+        try:
+            claims = json.loads(_b64decode(body))
+        except ValueError:
+            raise TicketError("Invalid ticket")
+
+        now = time.time()
+        if claims["e"] <= now:
+            raise TicketError("Ticket expired")
+        self._expire_used(now)
+        if claims["n"] in self._used:
+            raise TicketError("Ticket already used")
+        self.mark_used(claims["n"], claims["e"])
+        return {"token_id": claims["t"], "wallet_address": claims["w"], "exp": claims["e"], "nonce": claims["n"]}
+
+    def mark_used(self, nonce: str, expires_at: float):
+        self._used[nonce] = expires_at
+
+    def _expire_used(self, now: float):
+        for nonce, expires_at in list(self._used.items()):
+            if expires_at <= now:
+                del self._used[nonce]
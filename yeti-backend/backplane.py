@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fanout import encode_frame
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Seconds to wait before resubscribing after the pub/sub connection drops
+RECONNECT_DELAY_SECONDS = 1.0
+SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+
+
+class Backplane:
+    """
+    Pub/sub bus between workers. Every event published by one worker is
+    delivered to the handler of every other worker, so broadcasts and presence
+    reach listeners no matter which process or pod they are connected to.
+    """
+
+    name = "base"
+
+    async def start(self, handler: EventHandler) -> None:
+        raise NotImplementedError
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        pass
+
+
+class InMemoryHub:
+    """Process-local message bus shared by InMemoryBackplane instances"""
+
+    def __init__(self):
+        self.subscribers: List["InMemoryBackplane"] = []
+
+
+class InMemoryBackplane(Backplane):
+    """
+    Single-process backplane. With its own private hub it simply keeps
+    everything local; several instances sharing a hub behave like workers.
+    """
+
+    name = "memory"
+
+    def __init__(self, hub: Optional[InMemoryHub] = None):
+        self.hub = hub or InMemoryHub()
+        self._handler: Optional[EventHandler] = None
+        # Deliveries in flight; the loop only keeps weak references to tasks
+        self._deliveries: Set[asyncio.Task] = set()
+
+    async def start(self, handler: EventHandler) -> None:
+        self._handler = handler
+        self.hub.subscribers.append(self)
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        receivers = [subscriber for subscriber in self.hub.subscribers if subscriber is not self and subscriber._handler]
+        if not receivers:
+            # Single worker (the default): nobody to deliver to, skip encoding the audio payload
+            return
+        # Round-trip through the wire encoding so behaviour matches Redis
+        data = json.loads(encode_frame(event))
+        for subscriber in receivers:
+            task = asyncio.create_task(subscriber._deliver(data))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, data: Dict[str, Any]):
+        try:
+            await self._handler(data)
+        except Exception as e:
+            logger.error(f"Error handling backplane event: {e}")
+
+    async def stop(self) -> None:
+        if self in self.hub.subscribers:
+            self.hub.subscribers.remove(self)
+        self._handler = None
+
+
+async def _aclose(resource):
+    # redis-py 5 renamed close() to aclose()
+    close = getattr(resource, "aclose", None) or resource.close
+    await close()
+
+
+class RedisBackplane(Backplane):
+    """
+    Redis pub/sub backplane. Accepts any redis.asyncio compatible client,
+    e.g. fakeredis.aioredis.FakeRedis in tests.
+    """
+
+    name = "redis"
+
+    def __init__(self, redis_client, channel: str = "yeti:backplane"):
+        self.redis = redis_client
+        self.channel = channel
+        self._handler: Optional[EventHandler] = None
+        self._task: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+        self._stopping = False
+
+    async def start(self, handler: EventHandler) -> None:
+        self._handler = handler
+        self._task = asyncio.create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout=SUBSCRIBE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # Keep serving local listeners, the listener task keeps retrying
+            logger.warning("Redis backplane not reachable yet, continuing in the background")
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        await self.redis.publish(self.channel, encode_frame(event))
+
+    async def _listen(self):
+        while not self._stopping:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self._subscribed.set()
+                while not self._stopping:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    try:
+                        await self._handler(json.loads(message["data"]))
+                    except Exception as e:
+                        logger.error(f"Error handling backplane event: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane connection lost ({e}), resubscribing")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                try:
+                    await _aclose(pubsub)
+                except Exception:
+                    pass
+
+    async def stop(self) -> None:
+        # get_message() can swallow task cancellation, so ask the listener to exit
+        # at its next poll and only cancel it as a fallback
+        self._stopping = True
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=SUBSCRIBE_TIMEOUT_SECONDS)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+        await _aclose(self.redis)
+
+
+def create_backplane(url: str) -> Backplane:
+    """
+    Build the configured backplane from BACKPLANE_URL:
+    "memory" (default, single worker) or "redis://host:6379/0"
+    """
+    if url == "memory":
+        return InMemoryBackplane()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        import redis.asyncio as aioredis
+        return RedisBackplane(aioredis.from_url(url))
+    raise ValueError(f"Unsupported BACKPLANE_URL: {url}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: authentication overhead per request.
+
+Compares verifying the bearer JWT with jwt.decode on every request (old path)
+against decode_token, which serves repeat tokens from the verification cache.
+Both are measured directly and through a full GET /api/user/profile round-trip
+over the ASGI test client (database stubbed out, so only auth and routing differ).
+
+Usage: python benchmarks/bench_auth.py [--requests 2000] [--tokens 50]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import jwt  # noqa: E402
+import server  # noqa: E402
+from auth import TokenCache  # noqa: E402
+
+
+def uncached_decode(token: str):
+    return jwt.decode(token, server.JWT_SECRET, algorithms=["HS256"])
+
+
+class NoProfileCollection:
+    async def find_one(self, *args, **kwargs):
+        return None
+
+
+class NoProfileDatabase:
+    user_profiles = NoProfileCollection()
+
+
+def time_calls(decode, tokens, requests):
+    start = time.perf_counter()
+    for i in range(requests):
+        decode(tokens[i % len(tokens)])
+    return (time.perf_counter() - start) / requests
+
+
+def time_requests(client, tokens, requests):
+    start = time.perf_counter()
+    for i in range(requests):
+        client.get("/api/user/profile", headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per measurement")
+    parser.add_argument("--tokens", type=int, default=50, help="Distinct users polling")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    from fastapi.testclient import TestClient
+
+    tokens = [server.create_access_token("0x" + "0" * 40, i) for i in range(args.tokens)]
+    server.db = NoProfileDatabase()
+
+    print(f"{args.requests} requests from {args.tokens} tokens")
+    print(f"{'':>22} {'jwt.decode us':>14} {'cached us':>10} {'saved':>7}")
+
+    server.token_cache = TokenCache()
+    old = time_calls(uncached_decode, tokens, args.requests)
+    new = time_calls(server.decode_token, tokens, args.requests)
+    print(f"{'verification only':>22} {old * 1e6:>14.1f} {new * 1e6:>10.1f} {(old - new) * 1e6:>6.1f}")
+
+    # No lifespan: startup would try to reach MongoDB
+    client = TestClient(server.app)
+    decode_token = server.decode_token
+    server.decode_token = uncached_decode
+    old = time_requests(client, tokens, args.requests)
+    server.decode_token = decode_token
+    server.token_cache = TokenCache()
+    new = time_requests(client, tokens, args.requests)
+    print(f"{'GET /api/user/profile':>22} {old * 1e6:>14.1f} {new * 1e6:>10.1f} {(old - new) * 1e6:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: CPU time per broadcast at 10/100/1000 listeners.
+
+Compares the old path (message dict + json.dumps per recipient) against
+the current path (encode once, enqueue the shared frame per recipient).
+
+Usage: python benchmarks/bench_broadcast_encode.py [--audio-kb 300] [--rounds 20]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from messages import RelayMessage  # noqa: E402
+from server import ConnectionManager  # noqa: E402
+
+
+class NullWebSocket:
+    """Accepts frames without doing any I/O"""
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        pass
+
+    async def close(self, code=None):
+        pass
+
+
+def legacy_broadcast(message: RelayMessage, listeners: int):
+    message_data = {
+        "type": "audio_message",
+        "data": message.to_dict()
+    }
+    for _ in range(listeners):
+        json.dumps(message_data, default=str)
+
+
+async def run(listeners: int, message: RelayMessage, rounds: int):
+    manager = ConnectionManager()
+    sessions = [await manager.connect(NullWebSocket(), str(i), i) for i in range(listeners)]
+
+    start = time.process_time()
+    for _ in range(rounds):
+        legacy_broadcast(message, listeners)
+    legacy = (time.process_time() - start) / rounds
+
+    start = time.process_time()
+    for _ in range(rounds):
+        await manager.broadcast_audio(message, "sender")
+        # Let the writer tasks drain so queues never overflow
+        await asyncio.sleep(0)
+    current = (time.process_time() - start) / rounds
+
+    for session_id in sessions:
+        manager.disconnect(session_id)
+    return legacy, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio-kb", type=int, default=300, help="Size of the raw audio clip in KB")
+    parser.add_argument("--rounds", type=int, default=20, help="Broadcasts per listener count")
+    args = parser.parse_args()
+
+    # Keep the benchmark output readable
+    logging.disable(logging.INFO)
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    audio = base64.b64encode(os.urandom(args.audio_kb * 1024)).decode()
+    message = RelayMessage(nft_token_id=1, wallet_address="0x" + "0" * 40, audio_data=audio, duration=12.5)
+
+    print(f"audio payload: {len(audio) / 1024:.0f} KB base64, {args.rounds} rounds")
+    print(f"{'listeners':>10} {'per-recipient ms':>18} {'encode-once ms':>16} {'speedup':>9}")
+    for listeners in (10, 100, 1000):
+        legacy, current = asyncio.run(run(listeners, message, args.rounds))
+        print(f"{listeners:>10} {legacy * 1000:>18.2f} {current * 1000:>16.2f} {legacy / current:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: memory per connection and per broadcast, measured with tracemalloc
+at 10k simulated connections.
+
+Compares the old representations (ClientChannel with an instance __dict__ and
+an asyncio.Queue, pydantic AudioMessage through fan-out, backplane and the
+recent ring) against the current ones (slotted ClientChannel over a bare deque,
+slotted RelayMessage dataclass).
+
+- per connection: bytes still allocated after connect(), per session
+- per broadcast: peak bytes allocated while one clip fans out to every session
+- per recent message: bytes the ring keeps per message (audio string excluded)
+
+Usage: python benchmarks/bench_memory.py [--connections 10000] [--broadcasts 20]
+"""
+import argparse
+import asyncio
+import base64
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import server  # noqa: E402
+from fanout import ClientChannel  # noqa: E402
+from messages import RelayMessage  # noqa: E402
+from recent import RecentBroadcasts  # noqa: E402
+from server import AudioMessage, ConnectionManager  # noqa: E402
+
+
+class NullWebSocket:
+    """Accepts frames without doing any I/O"""
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        pass
+
+    async def send_bytes(self, data):
+        pass
+
+    async def close(self, code=None):
+        pass
+
+
+class LegacyAudioMessage(AudioMessage):
+    """The pydantic model the relay used to carry, behind the RelayMessage interface"""
+
+    def to_dict(self, include_audio: bool = True):
+        return self.dict() if include_audio else self.dict(exclude={"audio_data"})
+
+
+def without_slots(cls):
+    """The same class minus __slots__, so instances get a __dict__ again"""
+    namespace = {name: value for name, value in vars(cls).items() if name not in cls.__slots__ and name != "__slots__"}
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+class _LegacyQueue(asyncio.Queue):
+    """asyncio.Queue under the deque names ClientChannel uses"""
+
+    __len__ = asyncio.Queue.qsize
+    append = asyncio.Queue.put_nowait
+    popleft = asyncio.Queue.get_nowait
+
+
+class LegacyClientChannel(without_slots(ClientChannel)):
+    """ClientChannel as it was: an instance __dict__ and an asyncio.Queue per session"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._queue = _LegacyQueue(maxsize=self.max_queue)
+
+    def _push(self, frame):
+        self._queue.put_nowait(frame)
+
+    async def _next_frame(self):
+        return await self._queue.get()
+
+
+async def drain(manager: ConnectionManager):
+    while manager.outbound_queue_depth():
+        await asyncio.sleep(0)
+
+
+async def measure_relay(message_class, connections: int, broadcasts: int, audio: str):
+    manager = ConnectionManager()
+    await manager.start()
+    websockets = [NullWebSocket() for _ in range(connections)]
+
+    # Collect leftovers of the previous run first so they are not freed mid-measurement
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [await manager.connect(websocket, str(i), i) for i, websocket in enumerate(websockets)]
+    gc.collect()
+    per_connection = (tracemalloc.get_traced_memory()[0] - before) / connections
+
+    peaks = []
+    for _ in range(broadcasts):
+        await drain(manager)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await manager.broadcast_audio(
+            message_class(nft_token_id=1, wallet_address="0x" + "0" * 40, audio_data=audio, duration=1.0),
+            "sender"
+        )
+        await drain(manager)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+
+    for session_id in sessions:
+        manager.disconnect(session_id)
+    await manager.stop()
+    return per_connection, sorted(peaks)[len(peaks) // 2]
+
+
+def measure_ring(message_class, messages: int, audio: str) -> float:
+    ring = RecentBroadcasts(max_messages=messages, max_bytes=len(audio) * messages)
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(messages):
+        ring.add(message_class(nft_token_id=1, wallet_address="0x" + "0" * 40, audio_data=audio, duration=1.0))
+    return (tracemalloc.get_traced_memory()[0] - before) / messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=10000, help="Simulated websocket sessions")
+    parser.add_argument("--broadcasts", type=int, default=20, help="Broadcasts measured (median reported)")
+    parser.add_argument("--audio-kb", type=int, default=1, help="Size of the raw audio clip in KB")
+    args = parser.parse_args()
+
+    # Keep the benchmark output readable
+    logging.disable(logging.INFO)
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    audio = base64.b64encode(os.urandom(args.audio_kb * 1024)).decode()
+    tracemalloc.start()
+
+    results = {}
+    for label, channel_class, message_class in (
+        ("legacy", LegacyClientChannel, LegacyAudioMessage),
+        ("current", ClientChannel, RelayMessage),
+    ):
+        server.ClientChannel = channel_class
+        try:
+            per_connection, per_broadcast = asyncio.run(measure_relay(message_class, args.connections, args.broadcasts, audio))
+        finally:
+            server.ClientChannel = ClientChannel
+        results[label] = (per_connection, per_broadcast, measure_ring(message_class, 1000, audio))
+    tracemalloc.stop()
+
+    print(f"{args.connections} connections, {args.audio_kb} KB clips")
+    print(f"{'bytes':>20} {'legacy':>10} {'current':>10} {'saved':>8}")
+    for i, name in enumerate(("per connection", "per broadcast", "per recent message")):
+        legacy, current = results["legacy"][i], results["current"][i]
+        print(f"{name:>20} {legacy:>10.0f} {current:>10.0f} {1 - current / legacy:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: voice activity detection over a corpus of synthetic push-to-talk clips.
+
+Each clip is a few bursts of harmonic "speech" surrounded by random amounts of
+dead air over background noise, so the true speech bounds are known. Reports
+analysis speed (vectorized NumPy vs a per-frame Python loop), how much audio
+trimming removes, and how far the detected bounds land from the truth.
+
+Usage: python benchmarks/bench_vad.py [--clips 200] [--sample-rate 48000]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from vad import FRAME_MS, PAD_MS, frame_energy_db, speech_segments  # noqa: E402
+
+
+def synthetic_clip(rng: np.random.Generator, sample_rate: int):
+    """Return (pcm, speech_start, speech_end) with bounds in seconds"""
+    lead = rng.uniform(0.2, 3.0)
+    tail = rng.uniform(0.2, 3.0)
+    parts = [np.zeros(int(lead * sample_rate))]
+    for burst in range(rng.integers(1, 5)):
+        if burst:
+            parts.append(np.zeros(int(rng.uniform(0.05, 0.6) * sample_rate)))
+        seconds = rng.uniform(0.3, 2.5)
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        pitch = rng.uniform(90, 250)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        # Syllable-rate amplitude modulation
+        voice *= 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * rng.uniform(3, 6) * t))
+        parts.append(rng.uniform(0.05, 0.3) * voice)
+    parts.append(np.zeros(int(tail * sample_rate)))
+    pcm = np.concatenate(parts)
+    noise_level = 10 ** (rng.uniform(-70, -55) / 20)
+    pcm = (pcm + rng.normal(0, noise_level, pcm.size)).astype(np.float32)
+    return pcm, lead, len(pcm) / sample_rate - tail
+
+
+def python_frame_energy_db(pcm: np.ndarray, sample_rate: int):
+    """Per-frame loop equivalent of frame_energy_db, as a baseline"""
+    frame = sample_rate * FRAME_MS // 1000
+    samples = pcm.tolist()
+    levels = []
+    for i in range(len(samples) // frame):
+        block = samples[i * frame:(i + 1) * frame]
+        rms = math.sqrt(sum(x * x for x in block) / frame)
+        levels.append(20 * math.log10(rms + 1e-10))
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=200, help="Clips in the corpus")
+    parser.add_argument("--sample-rate", type=int, default=48000)
+    parser.add_argument("--baseline-clips", type=int, default=20, help="Clips measured with the Python loop baseline")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    corpus = [synthetic_clip(rng, args.sample_rate) for _ in range(args.clips)]
+    audio_seconds = sum(len(pcm) for pcm, _, _ in corpus) / args.sample_rate
+
+    start = time.perf_counter()
+    detected = [speech_segments(pcm, args.sample_rate) for pcm, _, _ in corpus]
+    vectorized = time.perf_counter() - start
+
+    baseline_corpus = corpus[:args.baseline_clips]
+    baseline_seconds = sum(len(pcm) for pcm, _, _ in baseline_corpus) / args.sample_rate
+    start = time.perf_counter()
+    for pcm, _, _ in baseline_corpus:
+        python_frame_energy_db(pcm, args.sample_rate)
+    loop = time.perf_counter() - start
+    start = time.perf_counter()
+    for pcm, _, _ in baseline_corpus:
+        frame_energy_db(pcm, args.sample_rate)
+    numpy_energy = time.perf_counter() - start
+
+    kept = 0.0
+    start_errors, end_errors, missed = [], [], 0
+    pad = PAD_MS / 1000
+    for (pcm, true_start, true_end), segments in zip(corpus, detected):
+        if not segments:
+            missed += 1
+            continue
+        kept += segments[-1][1] - segments[0][0]
+        start_errors.append(abs(segments[0][0] + pad - true_start))
+        end_errors.append(abs(segments[-1][1] - pad - true_end))
+
+    print(f"corpus: {args.clips} clips, {audio_seconds:.0f} s of audio at {args.sample_rate} Hz")
+    print(f"speech_segments: {vectorized * 1000 / args.clips:.2f} ms/clip, {audio_seconds / vectorized:.0f}x realtime")
+    print(f"frame energy, numpy vs python loop: {numpy_energy * 1000 / len(baseline_corpus):.2f} vs "
+          f"{loop * 1000 / len(baseline_corpus):.2f} ms/clip ({loop / numpy_energy:.0f}x, {baseline_seconds:.0f} s of audio)")
+    print(f"audio kept after trimming: {kept / audio_seconds:.1%} ({audio_seconds - kept:.0f} s of dead air removed)")
+    if start_errors:
+        print(f"bound error: start p50 {np.median(start_errors) * 1000:.0f} ms / max {max(start_errors) * 1000:.0f} ms, "
+              f"end p50 {np.median(end_errors) * 1000:.0f} ms / max {max(end_errors) * 1000:.0f} ms")
+    print(f"clips with no speech found: {missed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+The Yeti Talki app wired for load testing: an in-memory Mongo stand-in
+(mongomock-motor), audio blobs in a temp directory and the mocked chain path
+(zero contract address), served by uvicorn. Adds GET /_bench/usage so the
+load generator can sample this process's CPU time and memory.
+
+Started by load_test.py; can also be run by hand:
+    python benchmarks/load_server.py --port 8100
+"""
+import argparse
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Must be set before server is imported
+os.environ["AUDIO_STORE_URL"] = "file://" + tempfile.mkdtemp(prefix="yeti-load-audio-")
+os.environ["FROSTY_APE_YETI_CONTRACT_ADDRESS"] = "0x0000000000000000000000000000000000000000"
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "yeti_load")
+os.environ.setdefault("JWT_SECRET_KEY", "load-test-secret")
+os.environ["MONGO_ENSURE_INDEXES"] = "false"
+# One sender drives every broadcast, per-NFT limits would throttle the run
+os.environ.setdefault("RATE_LIMIT_BROADCASTS_PER_MINUTE", "0")
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    # Thousands of sockets need more than the default 1024 descriptors
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    logging.disable(logging.INFO)
+
+    import uvicorn
+    from mongomock_motor import AsyncMongoMockClient
+
+    import server
+    from persistence import MessageWriter
+
+    server.db = AsyncMongoMockClient()[os.environ["DB_NAME"]]
+    server.message_writer = MessageWriter(
+        server.db.audio_messages,
+        server.db.user_profiles,
+        batch_size=100,
+        flush_interval=0.05,
+        max_pending=10000
+    )
+
+    @server.app.get("/_bench/usage")
+    async def usage():
+        rusage = resource.getrusage(resource.RUSAGE_SELF)
+        return {
+            "cpu_seconds": rusage.ru_utime + rusage.ru_stime,
+            "rss_bytes": rss_bytes(),
+            "max_rss_bytes": rusage.ru_maxrss * 1024,
+            "connections": len(server.manager.channels),
+            "wall_time": time.time()
+        }
+
+    uvicorn.run(
+        server.app, host=args.host, port=args.port, log_level="warning", ws_max_size=64 * 1024 * 1024,
+        ws_ping_interval=server.WS_PING_INTERVAL_SECONDS, ws_ping_timeout=server.WS_PING_TIMEOUT_SECONDS
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Load and latency benchmark for the websocket relay.
+
+Starts benchmarks/load_server.py (the real app over an in-memory Mongo
+stand-in and the mocked chain), opens thousands of /ws/{token} listeners,
+drives HTTP broadcasts at a fixed rate and clip size, and reports:
+
+  - p50/p95/p99/max send-to-receive latency (each clip carries its send time)
+  - delivered frames per second and the share of expected deliveries received
+  - server CPU (cores busy while broadcasting) and RSS per connection
+
+The generator is a single asyncio process; if client_cpu_cores sits near 1.0
+the latencies measure the client, so lower --listeners or use --format binary.
+
+Results are written to benchmarks/results/ as JSON tagged with the git commit;
+pass --compare with an earlier file to see the regression table.
+
+Usage:
+    python benchmarks/load_test.py --listeners 2000 --rate 5 --duration 20 --clip-bytes 32768
+    python benchmarks/load_test.py --compare benchmarks/results/load-<commit>-<time>.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import resource
+import struct
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import aiohttp
+import jwt
+import websockets
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from framing import FORMAT_BINARY, FORMAT_JSON, decode_audio_frame  # noqa: E402
+
+RESULTS_DIR = BENCH_DIR / "results"
+JWT_SECRET = "load-test-secret"
+SENDER_TOKEN_ID = 0
+
+# Handshakes in flight while ramping up listeners
+CONNECT_CONCURRENCY = 200
+
+# Metrics compared by --compare, and whether higher is better
+COMPARED_METRICS = {
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "latency_p99_ms": False,
+    "deliveries_per_second": True,
+    "delivery_ratio": True,
+    "server_cpu_cores": False,
+    "rss_per_connection_kb": False,
+}
+
+
+def make_token(token_id: int) -> str:
+    payload = {
+        "wallet_address": "0x" + f"{token_id:040x}",
+        "token_id": token_id,
+        "exp": datetime.utcnow() + timedelta(hours=1),
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
+
+
+def make_clip(size: int) -> bytes:
+    """Clip whose first 8 bytes are the send time in ns"""
+    return struct.pack(">q", time.time_ns()) + os.urandom(max(size - 8, 0))
+
+
+def sent_at_ns(frame, wire_format: str):
+    if wire_format == FORMAT_BINARY:
+        if not isinstance(frame, bytes):
+            return None
+        audio = decode_audio_frame(frame).audio
+    else:
+        message = json.loads(frame)
+        if message.get("type") != "audio_message":
+            return None
+        audio = base64.b64decode(message["data"]["audio_data"][:12])
+    return struct.unpack(">q", audio[:8])[0]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class Listener:
+    def __init__(self, url: str, wire_format: str, latencies: list):
+        self.url = url
+        self.wire_format = wire_format
+        self.latencies = latencies
+        self.received = 0
+        self.connected = asyncio.Event()
+        self.failed = False
+
+    async def run(self, gate: asyncio.Semaphore, stop: asyncio.Event):
+        try:
+            async with gate:
+                websocket = await websockets.connect(self.url, max_size=None, ping_interval=None, open_timeout=30)
+            self.connected.set()
+            async with websocket:
+                receiver = asyncio.ensure_future(self._receive(websocket))
+                await stop.wait()
+                receiver.cancel()
+        except Exception:
+            self.failed = True
+            self.connected.set()
+
+    async def _receive(self, websocket):
+        async for frame in websocket:
+            if isinstance(frame, str) and frame.startswith('{"type":"ping"'):
+                # Answer heartbeats so long runs are not reaped as dead clients
+                await websocket.send('{"type":"pong"}')
+                continue
+            sent = sent_at_ns(frame, self.wire_format)
+            if sent is not None:
+                self.latencies.append((time.time_ns() - sent) / 1e6)
+                self.received += 1
+
+
+async def usage(session: aiohttp.ClientSession, base_url: str) -> dict:
+    async with session.get(f"{base_url}/_bench/usage") as response:
+        return await response.json()
+
+
+async def wait_for_server(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                await usage(session, base_url)
+                return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("Load server did not come up")
+
+
+async def drive(args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    ws_url = f"ws://127.0.0.1:{args.port}"
+    await wait_for_server(base_url)
+
+    latencies = []
+    stop = asyncio.Event()
+    gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    listeners = [
+        Listener(f"{ws_url}/ws/{make_token(i)}?format={args.format}", args.format, latencies)
+        for i in range(1, args.listeners + 1)
+    ]
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.sender_connections)) as session:
+        idle = await usage(session, base_url)
+
+        connect_started = time.perf_counter()
+        tasks = [asyncio.ensure_future(listener.run(gate, stop)) for listener in listeners]
+        await asyncio.gather(*(listener.connected.wait() for listener in listeners))
+        connect_seconds = time.perf_counter() - connect_started
+        connected = sum(not listener.failed for listener in listeners)
+        # Let the server settle before sampling memory
+        await asyncio.sleep(1)
+        loaded = await usage(session, base_url)
+
+        headers = {"Authorization": f"Bearer {make_token(SENDER_TOKEN_ID)}", "Content-Type": "audio/webm"}
+        send_errors = 0
+        sent = 0
+
+        async def broadcast():
+            nonlocal send_errors, sent
+            try:
+                async with session.post(
+                    f"{base_url}/api/audio/upload", params={"duration": "1"}, data=make_clip(args.clip_bytes), headers=headers
+                ) as response:
+                    await response.read()
+                    if response.status == 200:
+                        sent += 1
+                    else:
+                        send_errors += 1
+            except aiohttp.ClientError:
+                send_errors += 1
+
+        total = int(args.rate * args.duration)
+        started = time.perf_counter()
+        client_cpu_started = time.process_time()
+        sends = []
+        for i in range(total):
+            delay = started + i / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sends.append(asyncio.ensure_future(broadcast()))
+        await asyncio.gather(*sends)
+
+        # Wait for in-flight deliveries, up to the drain timeout
+        expected = sent * connected
+        drain_deadline = time.perf_counter() + args.drain
+        while len(latencies) < expected and time.perf_counter() < drain_deadline:
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - started
+        client_cpu = time.process_time() - client_cpu_started
+        busy = await usage(session, base_url)
+
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies.sort()
+    return {
+        "listeners_connected": connected,
+        "connect_seconds": round(connect_seconds, 2),
+        "broadcasts_sent": sent,
+        "broadcast_errors": send_errors,
+        "deliveries": len(latencies),
+        "delivery_ratio": round(len(latencies) / expected, 4) if expected else 0.0,
+        "deliveries_per_second": round(len(latencies) / elapsed, 1),
+        "latency_p50_ms": round(percentile(latencies, 0.50), 2),
+        "latency_p95_ms": round(percentile(latencies, 0.95), 2),
+        "latency_p99_ms": round(percentile(latencies, 0.99), 2),
+        "latency_max_ms": round(latencies[-1], 2) if latencies else None,
+        "server_cpu_cores": round((busy["cpu_seconds"] - loaded["cpu_seconds"]) / (busy["wall_time"] - loaded["wall_time"]), 3),
+        # Near 1.0 means the generator, not the server, is the bottleneck
+        "client_cpu_cores": round(client_cpu / elapsed, 3),
+        "server_rss_mb": round(loaded["rss_bytes"] / 2 ** 20, 1),
+        "rss_per_connection_kb": round((loaded["rss_bytes"] - idle["rss_bytes"]) / max(connected, 1) / 1024, 2),
+    }
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=BENCH_DIR
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, cwd=BENCH_DIR).stdout
+        return revision + ("-dirty" if dirty.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: dict):
+    for key, value in results["metrics"].items():
+        print(f"{key:>24}: {value}")
+
+
+def print_comparison(baseline: dict, current: dict):
+    if baseline["params"] != current["params"]:
+        print(f"\nWarning: parameters differ from the baseline run: {baseline['params']}")
+    print(f"\n{'metric':>24} {baseline['commit']:>14} {current['commit']:>14} {'change':>9}")
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        old, new = baseline["metrics"].get(metric), current["metrics"].get(metric)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        flag = "  <- worse" if worse and abs(change) >= 10 else ""
+        print(f"{metric:>24} {old:>14} {new:>14} {change:>+8.1f}%{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listeners", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=5, help="Broadcasts per second")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of broadcasting")
+    parser.add_argument("--clip-bytes", type=int, default=4096, help="Raw audio bytes per broadcast")
+    parser.add_argument("--format", choices=(FORMAT_JSON, FORMAT_BINARY), default=FORMAT_BINARY)
+    parser.add_argument("--drain", type=float, default=10, help="Max seconds to wait for deliveries after the last send")
+    parser.add_argument("--sender-connections", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--no-server", action="store_true", help="Use an already running load_server.py")
+    parser.add_argument("--output", type=Path, help="Results file (default benchmarks/results/load-<commit>-<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    server = None
+    if not args.no_server:
+        server = subprocess.Popen(
+            [sys.executable, str(BENCH_DIR / "load_server.py"), "--port", str(args.port)],
+            env={**os.environ, "JWT_SECRET_KEY": JWT_SECRET}
+        )
+    try:
+        metrics = asyncio.run(drive(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    results = {
+        "commit": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "params": {
+            "listeners": args.listeners,
+            "rate": args.rate,
+            "duration": args.duration,
+            "clip_bytes": args.clip_bytes,
+            "format": args.format,
+        },
+        "metrics": metrics,
+    }
+    print_results(results)
+
+    output = args.output or RESULTS_DIR / f"load-{results['commit']}-{results['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        print_comparison(json.loads(args.compare.read_text()), results)
+
+
+if __name__ == "__main__":
+    main()
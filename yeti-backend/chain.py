@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+
+from metrics import RPC_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# ERC-721 ABI for balanceOf and tokenOfOwnerByIndex
+ERC721_ABI = [
+    {
+        "inputs": [{"name": "owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "", "type": "uint256"}],
+        "type": "function"
+    },
+    {
+        "inputs": [{"name": "owner", "type": "address"}, {"name": "index", "type": "uint256"}],
+        "name": "tokenOfOwnerByIndex",
+        "outputs": [{"name": "", "type": "uint256"}],
+        "type": "function"
+    }
+]
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+# Upper bound on blocks scanned per Transfer poll so a long outage can't trigger one huge getLogs
+MAX_LOG_BLOCK_RANGE = 2000
+
+
+# Failures worth retrying; anything else (reverts, bad input) is raised immediately
+TRANSIENT_RPC_ERRORS = (asyncio.TimeoutError, aiohttp.ClientError, OSError)
+
+
+class ChainClient:
+    """
+    Non-blocking access to Ape Chain.
+    Uses web3's async provider (pooled aiohttp session) with a per-call timeout,
+    retries with exponential backoff and a cap on concurrent RPC calls, so a slow
+    RPC node never stalls the event loop or the websocket relay.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        contract_address: str,
+        timeout: float,
+        retries: int,
+        backoff: float,
+        max_concurrency: int,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(rpc_url, request_kwargs={"timeout": aiohttp.ClientTimeout(total=timeout)}))
+        self.contract_address = Web3.to_checksum_address(contract_address)
+        self.contract = self.w3.eth.contract(address=self.contract_address, abi=ERC721_ABI)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def call(self, make_call: Callable[[], Awaitable[Any]], method: str = "call") -> Any:
+        """Run one RPC call with timeout, bounded concurrency and retry/backoff"""
+        with RPC_SECONDS.labels(method).time():
+            return await self._call_with_retries(make_call)
+
+    async def _call_with_retries(self, make_call: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    return await asyncio.wait_for(make_call(), timeout=self.timeout)
+            except TRANSIENT_RPC_ERRORS as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * (2 ** attempt) * (1 + random.random())
+                logger.warning(f"RPC call failed ({e!r}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def owned_token(self, wallet_address: str) -> Optional[int]:
+        """First token of the collection owned by a wallet, or None"""
+        owner = Web3.to_checksum_address(wallet_address)
+        balance = await self.call(lambda: self.contract.functions.balanceOf(owner).call(), "balanceOf")
+        if balance == 0:
+            return None
+        token_id = await self.call(lambda: self.contract.functions.tokenOfOwnerByIndex(owner, 0).call(), "tokenOfOwnerByIndex")
+        return int(token_id)
+
+    async def block_number(self) -> int:
+        return await self.call(lambda: self.w3.eth.block_number, "eth_blockNumber")
+
+    async def transfer_logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        return await self.call(lambda: self.w3.eth.get_logs({
+            "address": self.contract_address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [TRANSFER_TOPIC]
+        }), "eth_getLogs")
+
+    async def is_connected(self) -> bool:
+        """Single quick probe without retries, for health checks"""
+        try:
+            return await asyncio.wait_for(self.w3.is_connected(), timeout=self.timeout)
+        except Exception:
+            return False
+
+    async def close(self):
+        disconnect = getattr(self.w3.provider, "disconnect", None)
+        if disconnect:
+            await disconnect()
+
+
+class OwnershipCache:
+    """
+    Wallet -> owned token id cache in front of the chain.
+    Positive and negative results expire separately, and concurrent lookups
+    for the same wallet share one in-flight RPC call (single-flight).
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float, max_entries: int = 50000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[Optional[int], float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get(self, wallet_address: str, loader: Callable[[str], Awaitable[Optional[int]]]) -> Optional[int]:
+        """Return the cached token id for a wallet, calling loader on a miss"""
+        key = wallet_address.lower()
+        entry = self._entries.get(key)
+        if entry is not None:
+            token_id, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                if token_id is None:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+                return token_id
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.ensure_future(loader(wallet_address))
+        self._inflight[key] = future
+        try:
+            token_id = await asyncio.shield(future)
+        finally:
+            self._inflight.pop(key, None)
+
+        # Errors propagate above and are never cached
+        ttl = self.ttl if token_id is not None else self.negative_ttl
+        self._entries[key] = (token_id, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return token_id
+
+    def invalidate(self, wallet_address: str):
+        if self._entries.pop(wallet_address.lower(), None) is not None:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations
+        }
+
+
+def _topic_to_address(topic) -> str:
+    # Indexed address topics are left-padded to 32 bytes
+    return "0x" + bytes(topic)[-20:].hex()
+
+
+class TransferWatcher:
+    """Polls the collection's Transfer events and evicts both parties from the ownership cache"""
+
+    def __init__(self, chain: ChainClient, cache: OwnershipCache, poll_interval: float):
+        self.chain = chain
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        last_block = None
+        while True:
+            behind = False
+            try:
+                head = await self.chain.block_number()
+                if last_block is None:
+                    last_block = head
+                elif head > last_block:
+                    to_block = min(head, last_block + MAX_LOG_BLOCK_RANGE)
+                    logs = await self.chain.transfer_logs(last_block + 1, to_block)
+                    for log in logs:
+                        self.cache.invalidate(_topic_to_address(log["topics"][1]))
+                        self.cache.invalidate(_topic_to_address(log["topics"][2]))
+                    last_block = to_block
+                    behind = to_block < head
+            except Exception as e:
+                logger.error(f"Error polling Transfer events: {e}")
+            if not behind:
+                await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,99 @@
+from typing import Dict, Set, Tuple
+
+# Channel names:
+#   global                     everyone (the original single broadcast domain)
+#   trait:<trait>:<value>      holders interested in a trait, e.g. trait:background:glacier
+#   group:<group id>           private group, members only (see channel_groups)
+#   nft:<token id>             direct messages to one NFT, only its holder listens
+GLOBAL_CHANNEL = "global"
+TRAIT_PREFIX = "trait:"
+GROUP_PREFIX = "group:"
+DIRECT_PREFIX = "nft:"
+
+# AudioMessage.message_type for each kind of channel
+MESSAGE_TYPES = {
+    "global": "broadcast",
+    "trait": "trait",
+    "group": "group",
+    "nft": "direct",
+}
+
+MAX_CHANNEL_NAME_LENGTH = 128
+
+
+class TooManySubscriptions(ValueError):
+    """Raised when a session tries to join more channels than it is allowed"""
+
+
+def direct_channel(token_id: int) -> str:
+    return f"{DIRECT_PREFIX}{token_id}"
+
+
+def group_channel(group_id: str) -> str:
+    return f"{GROUP_PREFIX}{group_id}"
+
+
+def parse_channel(name: str) -> Tuple[str, str]:
+    """Split a channel name into (kind, key); raises ValueError for malformed names"""
+    if name == GLOBAL_CHANNEL:
+        return "global", ""
+    if len(name) > MAX_CHANNEL_NAME_LENGTH:
+        raise ValueError("Channel name too long")
+    kind, _, key = name.partition(":")
+    if kind not in MESSAGE_TYPES or not key:
+        raise ValueError(f"Unknown channel: {name}")
+    if kind == "nft" and not key.isdigit():
+        raise ValueError(f"Unknown channel: {name}")
+    if kind == "trait" and key.count(":") != 1:
+        raise ValueError("Trait channels look like trait:<trait>:<value>")
+    return kind, key
+
+
+def message_type_for(name: str) -> str:
+    return MESSAGE_TYPES[parse_channel(name)[0]]
+
+
+class SubscriptionIndex:
+    """
+    Two-way index of local websocket subscriptions: channel -> sessions and
+    session -> channels. A broadcast looks up its channel's subscribers directly,
+    so its cost is O(subscribers) instead of O(everyone online), and a session
+    is a set member, so it gets each broadcast once however it subscribed.
+
+    max_per_session caps how many channels one session can join (0 for no cap),
+    so a client cannot sign up for every open trait channel at once.
+    """
+
+    def __init__(self, max_per_session: int = 0):
+        self.max_per_session = max_per_session
+        self._subscribers: Dict[str, Set[str]] = {}
+        self._subscriptions: Dict[str, Set[str]] = {}
+
+    def subscribe(self, session_id: str, channel: str):
+        channels = self._subscriptions.get(session_id, ())
+        if self.max_per_session and channel not in channels and len(channels) >= self.max_per_session:
+            raise TooManySubscriptions(f"Subscribed to too many channels (max {self.max_per_session})")
+        self._subscribers.setdefault(channel, set()).add(session_id)
+        self._subscriptions.setdefault(session_id, set()).add(channel)
+
+    def unsubscribe(self, session_id: str, channel: str):
+        subscribers = self._subscribers.get(channel)
+        if subscribers is not None:
+            subscribers.discard(session_id)
+            if not subscribers:
+                del self._subscribers[channel]
+        channels = self._subscriptions.get(session_id)
+        if channels is not None:
+            channels.discard(channel)
+            if not channels:
+                del self._subscriptions[session_id]
+
+    def remove_session(self, session_id: str):
+        for channel in list(self._subscriptions.get(session_id, ())):
+            self.unsubscribe(session_id, channel)
+
+    def subscribers(self, channel: str) -> Set[str]:
+        return self._subscribers.get(channel, set())
+
+    def subscriptions(self, session_id: str) -> Set[str]:
+        return self._subscriptions.get(session_id, set())
@@ -0,0 +1,253 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+from metrics import WS_SEND_SECONDS
+
+try:
+    import orjson
+except ImportError:  # Optional speedup, fall back to the stdlib encoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Slow client policies
+SLOW_CLIENT_DROP = "drop"  # Close the socket once its queue overflows
+SLOW_CLIENT_LAG = "lag"    # Keep the socket, discard its oldest queued frame and mark it lagging
+SLOW_CLIENT_POLICIES = (SLOW_CLIENT_DROP, SLOW_CLIENT_LAG)
+
+# Close code sent to clients dropped for falling behind (queue overflow or send timeout)
+CLOSE_CODE_TOO_SLOW = 4010
+
+# Close code sent when writing to the socket failed ("internal error")
+CLOSE_CODE_SEND_FAILED = 1011
+
+# Close code for a session closed by the server without a more specific reason
+CLOSE_CODE_NORMAL = 1000
+
+# Close code sent to clients that stopped answering heartbeat pings
+CLOSE_CODE_HEARTBEAT_TIMEOUT = 4008
+
+# Close code sent to a session evicted by a newer session of the same NFT
+CLOSE_CODE_SUPERSEDED = 4009
+
+# Close codes for refused connections: too many connects from one NFT, or the relay is shedding load ("try again later")
+CLOSE_CODE_RATE_LIMITED = 4029
+CLOSE_CODE_OVERLOADED = 1013
+
+# Socket closes in flight; the loop only keeps weak references to tasks, and the
+# channel that started one may already be gone
+_closing_sockets: Set[asyncio.Task] = set()
+
+
+def _json_default(obj: Any) -> str:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def encode_frame(payload: Dict[str, Any]) -> str:
+    """
+    Serialize an outbound payload once so the same immutable string can be
+    handed to every recipient's queue
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_json_default).decode()
+    return json.dumps(payload, default=_json_default, separators=(",", ":"))
+
+
+class OutboundFrame:
+    """
+    One broadcast rendered lazily per wire format.
+    Each format is encoded at most once and shared by every recipient using it.
+    """
+
+    __slots__ = ("_encode_text", "_encode_binary", "_text", "_binary")
+
+    def __init__(self, encode_text: Callable[[], str], encode_binary: Optional[Callable[[], bytes]] = None):
+        self._encode_text = encode_text
+        self._encode_binary = encode_binary
+        self._text: Optional[str] = None
+        self._binary: Optional[bytes] = None
+
+    @property
+    def has_binary(self) -> bool:
+        return self._encode_binary is not None
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._encode_text()
+        return self._text
+
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = self._encode_binary()
+        return self._binary
+
+
+def _wake(waiter: Optional[asyncio.Future]) -> None:
+    """Resolve a pending future (if any); always returns None to clear the slot holding it"""
+    if waiter is not None and not waiter.done():
+        waiter.set_result(None)
+    return None
+
+
+class ClientChannel:
+    """
+    Bounded outbound queue plus a dedicated writer task for one websocket.
+    Broadcasts only enqueue; the writer drains the queue at the client's own pace,
+    so a stalled listener never delays anybody else.
+
+    There is one per connected session, so it is kept compact: slotted, and the
+    queue is a bare deque with at most two pending futures instead of an
+    asyncio.Queue (which allocates four deques per instance).
+    """
+
+    __slots__ = (
+        "websocket", "user_id", "session_id", "policy", "send_timeout", "binary",
+        "lagging", "frames_dropped", "closed", "last_seen", "heartbeat", "max_queue",
+        "_on_dead", "_queue", "_frame_ready", "_room_ready", "_writer",
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: str,
+        max_queue: int,
+        policy: str,
+        send_timeout: float,
+        on_dead: Callable[[str, int], None],
+        binary: bool = False,
+        session_id: Optional[str] = None,
+    ):
+        if policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"Unknown slow client policy: {policy}")
+        self.websocket = websocket
+        self.user_id = user_id
+        self.session_id = session_id or user_id
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.binary = binary
+        self.lagging = False
+        self.frames_dropped = 0
+        self.closed = False
+        # Monotonic time the client last sent anything (see touch)
+        self.last_seen = time.monotonic()
+        # Set once the client pings or answers a ping; only such clients are reaped for silence
+        self.heartbeat = False
+        self.max_queue = max_queue
+        self._on_dead = on_dead
+        self._queue: Deque[Any] = deque()
+        # Set while the writer waits for a frame / while send() callers wait for room
+        self._frame_ready: Optional[asyncio.Future] = None
+        self._room_ready: Optional[asyncio.Future] = None
+        self._writer = asyncio.create_task(self._run())
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def touch(self, heartbeat: bool = False):
+        """Record that the client is alive (any inbound frame counts, not only pongs)"""
+        self.last_seen = time.monotonic()
+        if heartbeat:
+            self.heartbeat = True
+
+    def offer(self, frame: Any) -> bool:
+        """
+        Enqueue a frame without waiting.
+        Returns False when the client should be dropped.
+        """
+        if self.closed:
+            return False
+        if len(self._queue) < self.max_queue:
+            self._push(frame)
+            return True
+
+        if self.policy == SLOW_CLIENT_DROP:
+            logger.warning(f"Outbound queue full for {self.user_id}, dropping client")
+            return False
+
+        # Lag policy: make room by discarding the oldest frame so the client catches up on fresh audio
+        if not self.lagging:
+            logger.warning(f"Outbound queue full for {self.user_id}, marking client as lagging")
+        self.lagging = True
+        self._queue.popleft()
+        self.frames_dropped += 1
+        self._push(frame)
+        return True
+
+    async def send(self, frame: Any):
+        """Enqueue a frame, waiting for room instead of applying the slow client policy"""
+        while not self.closed and len(self._queue) >= self.max_queue:
+            if self._room_ready is None:
+                self._room_ready = asyncio.get_running_loop().create_future()
+            await self._room_ready
+        if not self.closed:
+            self._push(frame)
+
+    def _push(self, frame: Any):
+        self._queue.append(frame)
+        self._frame_ready = _wake(self._frame_ready)
+
+    async def _next_frame(self) -> Any:
+        while not self._queue:
+            self._frame_ready = asyncio.get_running_loop().create_future()
+            await self._frame_ready
+        frame = self._queue.popleft()
+        self._room_ready = _wake(self._room_ready)
+        return frame
+
+    async def _run(self):
+        try:
+            while True:
+                frame = await self._next_frame()
+                started = time.perf_counter()
+                await asyncio.wait_for(self._send(frame), timeout=self.send_timeout)
+                WS_SEND_SECONDS.observe(time.perf_counter() - started)
+                if self.lagging and not self._queue:
+                    self.lagging = False
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"Send to {self.user_id} timed out after {self.send_timeout:g}s, dropping client")
+            self._on_dead(self.session_id, CLOSE_CODE_TOO_SLOW)
+        except Exception as e:
+            logger.error(f"Error sending to {self.user_id}: {e}")
+            self._on_dead(self.session_id, CLOSE_CODE_SEND_FAILED)
+
+    async def _send(self, frame: Any):
+        if isinstance(frame, OutboundFrame):
+            if self.binary and frame.has_binary:
+                await self.websocket.send_bytes(frame.binary())
+            else:
+                await self.websocket.send_text(frame.text())
+        else:
+            await self.websocket.send_text(frame)
+
+    def close(self, code: Optional[int] = None):
+        """Stop the writer and optionally close the underlying socket"""
+        if self.closed:
+            return
+        self.closed = True
+        # Release send() callers still waiting for room
+        self._room_ready = _wake(self._room_ready)
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if code is not None:
+            task = asyncio.create_task(self._close_socket(code))
+            _closing_sockets.add(task)
+            task.add_done_callback(_closing_sockets.discard)
+
+    async def _close_socket(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            # Socket already gone
+            pass
@@ -0,0 +1,106 @@
+import base64
+import struct
+import uuid
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+# Wire formats negotiated at websocket connect time (?format=json|binary)
+FORMAT_JSON = "json"
+FORMAT_BINARY = "binary"
+WIRE_FORMATS = (FORMAT_JSON, FORMAT_BINARY)
+
+FRAME_VERSION = 1
+
+# Frame types
+FRAME_AUDIO_MESSAGE = 1
+FRAME_AUDIO_CHUNK = 2
+
+# Big-endian header followed by the raw audio bytes:
+#   version (u8), frame type (u8), message id (16 byte UUID),
+#   nft_token_id (u32), duration in seconds (f32), timestamp in unix seconds (f64)
+AUDIO_HEADER = struct.Struct(">BB16sIfd")
+
+# Live push-to-talk chunk, followed by the raw chunk bytes:
+#   version (u8), frame type (u8), message id (16 byte UUID), nft_token_id (u32), sequence number (u32)
+CHUNK_HEADER = struct.Struct(">BB16sII")
+
+
+class ChunkFrame(NamedTuple):
+    message_id: str
+    nft_token_id: int
+    seq: int
+    audio: bytes
+
+
+class AudioFrame(NamedTuple):
+    message_id: str
+    nft_token_id: int
+    duration: float
+    timestamp: datetime
+    audio: bytes
+
+
+def _unix_seconds(timestamp: datetime) -> float:
+    # Naive datetimes in this app are always UTC (datetime.utcnow)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def encode_audio_frame(message_id: str, nft_token_id: int, duration: float, timestamp: datetime, audio_data: Optional[str]) -> bytes:
+    """Pack an audio message into a binary frame, decoding the base64 payload once"""
+    if audio_data is None:
+        # Callers skip messages whose audio could not be loaded, there is nothing to frame
+        raise ValueError(f"Audio message {message_id} has no audio")
+    header = AUDIO_HEADER.pack(
+        FRAME_VERSION,
+        FRAME_AUDIO_MESSAGE,
+        uuid.UUID(message_id).bytes,
+        nft_token_id,
+        duration,
+        _unix_seconds(timestamp),
+    )
+    return header + base64.b64decode(audio_data)
+
+
+def decode_audio_frame(frame: bytes) -> AudioFrame:
+    """Unpack a binary audio frame (used by tests and Python clients)"""
+    if len(frame) < AUDIO_HEADER.size:
+        raise ValueError("Frame shorter than audio header")
+    version, frame_type, message_id, nft_token_id, duration, timestamp = AUDIO_HEADER.unpack_from(frame)
+    if version != FRAME_VERSION or frame_type != FRAME_AUDIO_MESSAGE:
+        raise ValueError(f"Unsupported frame version {version} / type {frame_type}")
+    return AudioFrame(
+        message_id=str(uuid.UUID(bytes=message_id)),
+        nft_token_id=nft_token_id,
+        duration=duration,
+        timestamp=datetime.fromtimestamp(timestamp, tz=timezone.utc).replace(tzinfo=None),
+        audio=frame[AUDIO_HEADER.size:],
+    )
+
+
+def encode_chunk_frame(message_id: str, nft_token_id: int, seq: int, chunk: bytes) -> bytes:
+    """Pack one live push-to-talk chunk into a binary frame"""
+    header = CHUNK_HEADER.pack(
+        FRAME_VERSION,
+        FRAME_AUDIO_CHUNK,
+        uuid.UUID(message_id).bytes,
+        nft_token_id,
+        seq,
+    )
+    return header + chunk
+
+
+def decode_chunk_frame(frame: bytes) -> ChunkFrame:
+    """Unpack a binary push-to-talk chunk frame"""
+    if len(frame) < CHUNK_HEADER.size:
+        raise ValueError("Frame shorter than chunk header")
+    version, frame_type, message_id, nft_token_id, seq = CHUNK_HEADER.unpack_from(frame)
+    if version != FRAME_VERSION or frame_type != FRAME_AUDIO_CHUNK:
+        raise ValueError(f"Unsupported frame version {version} / type {frame_type}")
+    return ChunkFrame(
+        message_id=str(uuid.UUID(bytes=message_id)),
+        nft_token_id=nft_token_id,
+        seq=seq,
+        audio=frame[CHUNK_HEADER.size:],
+    )
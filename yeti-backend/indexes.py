@@ -0,0 +1,52 @@
+import logging
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Every query the API issues must be covered by one of these
+REQUIRED_INDEXES: Dict[str, List[IndexModel]] = {
+    "user_profiles": [
+        # Login, profile and counter updates
+        IndexModel([("nft_token_id", ASCENDING)], name="nft_token_id_unique", unique=True),
+    ],
+    "audio_messages": [
+        # Latest message, history pages and replay per channel, id breaks timestamp ties for keyset pagination
+        IndexModel(
+            [("channel", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+            name="channel_timestamp_id"
+        ),
+        # Lookups by message id (audio download, recordings)
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Per-NFT recordings, id breaks timestamp ties for keyset pagination
+        IndexModel(
+            [("nft_token_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+            name="nft_token_id_timestamp_id"
+        ),
+    ],
+    "channel_groups": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Membership checks and "my groups" (multikey)
+        IndexModel([("members", ASCENDING)], name="members"),
+    ],
+}
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> bool:
+    """
+    Create any missing indexes. Idempotent, safe to run on every startup.
+    Returns False if an index could not be built (e.g. duplicate data
+    blocking a unique index) so the caller can surface it without crashing.
+    """
+    ok = True
+    for collection, indexes in REQUIRED_INDEXES.items():
+        try:
+            created = await db[collection].create_indexes(indexes)
+            logger.info(f"Ensured indexes on {collection}: {', '.join(created)}")
+        except OperationFailure as e:
+            ok = False
+            logger.error(f"Could not ensure indexes on {collection}: {e}")
+    return ok
@@ -0,0 +1,73 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+
+from channels import GLOBAL_CHANNEL
+
+
+def _new_message_id() -> str:
+    return str(uuid.uuid4())
+
+
+@dataclass(slots=True)
+class RelayMessage:
+    """
+    An audio message as the relay carries it: from upload or live stream through
+    fan-out, the backplane, the recent ring and the write-behind queue.
+
+    Slotted and unvalidated, so the hot path builds and serializes messages
+    without pydantic. The AudioMessage model in server.py describes the same
+    fields at the API boundary.
+    """
+
+    nft_token_id: int
+    wallet_address: str
+    duration: float
+    id: str = field(default_factory=_new_message_id)
+    audio_data: Optional[str] = None  # Base64 encoded audio, only carried in flight (stored in audio_store)
+    audio_size: Optional[int] = None  # Raw audio bytes in the blob store
+    content_type: Optional[str] = None
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    message_type: str = "broadcast"  # broadcast, trait, group or direct, follows the channel
+    channel: str = GLOBAL_CHANNEL  # see channels.py
+
+    def to_dict(self, include_audio: bool = True) -> Dict[str, Any]:
+        """Plain dict in AudioMessage field order, for frames, backplane events and documents"""
+        data = {
+            "id": self.id,
+            "nft_token_id": self.nft_token_id,
+            "wallet_address": self.wallet_address,
+            "audio_data": self.audio_data,
+            "audio_size": self.audio_size,
+            "content_type": self.content_type,
+            "duration": self.duration,
+            "timestamp": self.timestamp,
+            "message_type": self.message_type,
+            "channel": self.channel,
+        }
+        if not include_audio:
+            del data["audio_data"]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "RelayMessage":
+        """
+        Rebuild a message from to_dict() output, a decoded backplane event (ISO
+        timestamp) or a stored document (extra keys such as _id are ignored)
+        """
+        timestamp = data["timestamp"]
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        return cls(
+            id=data["id"],
+            nft_token_id=int(data["nft_token_id"]),
+            wallet_address=data["wallet_address"],
+            audio_data=data.get("audio_data"),
+            audio_size=data.get("audio_size"),
+            content_type=data.get("content_type"),
+            duration=float(data["duration"]),
+            timestamp=timestamp,
+            message_type=data.get("message_type", "broadcast"),
+            channel=data.get("channel", GLOBAL_CHANNEL),
+        )
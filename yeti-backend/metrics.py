@@ -0,0 +1,84 @@
+import asyncio
+import time
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Latency buckets in seconds. Fan-out and sends sit in the microsecond to
+# millisecond range; database and RPC calls in the millisecond to second range.
+FAST_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+IO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Hot path histograms. Each observation is a lock and a bucket scan, well
+# under the cost of the send or query it measures.
+BROADCAST_FANOUT_SECONDS = Histogram(
+    "yeti_broadcast_fanout_seconds",
+    "Time to queue one broadcast for every local subscriber of its channel",
+    buckets=FAST_BUCKETS,
+)
+WS_SEND_SECONDS = Histogram(
+    "yeti_ws_send_seconds",
+    "Time to write one frame to one websocket",
+    buckets=FAST_BUCKETS,
+)
+DB_WRITE_SECONDS = Histogram(
+    "yeti_db_write_seconds",
+    "Database and blob store write latency",
+    ["operation"],
+    buckets=IO_BUCKETS,
+)
+RPC_SECONDS = Histogram(
+    "yeti_rpc_seconds",
+    "Ape Chain RPC latency including retries",
+    ["method"],
+    buckets=IO_BUCKETS,
+)
+JWT_VERIFY_SECONDS = Histogram(
+    "yeti_jwt_verify_seconds",
+    "JWT verification time, cached tokens skip signature checks",
+    ["cache"],
+    buckets=FAST_BUCKETS,
+)
+
+HEARTBEAT_REAPED = Counter("yeti_heartbeat_reaped_total", "Websockets closed for missing heartbeats")
+RATE_LIMITED = Counter("yeti_rate_limited_total", "Requests refused by per-NFT rate limits", ["scope"])
+REQUESTS_SHED = Counter("yeti_requests_shed_total", "Requests refused by admission control", ["reason"])
+
+# Gauges read their value at scrape time (see server.py), nothing is updated per message
+ACTIVE_CONNECTIONS = Gauge("yeti_active_connections", "Websocket connections on this worker")
+OUTBOUND_QUEUE_DEPTH = Gauge("yeti_outbound_queue_depth", "Frames waiting in all outbound websocket queues")
+OUTBOUND_QUEUE_MAX_DEPTH = Gauge("yeti_outbound_queue_max_depth", "Frames waiting in the fullest outbound websocket queue")
+PERSIST_QUEUE_DEPTH = Gauge("yeti_persist_queue_depth", "Messages waiting for the write-behind flush")
+EVENT_LOOP_LAG_SECONDS = Gauge("yeti_event_loop_lag_seconds", "How late the last event loop lag probe woke up")
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag: a task sleeps for interval seconds and records how
+    much later than requested it actually woke up. Anything blocking the loop
+    (CPU-bound work, sync I/O) shows up here before it shows up as latency.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lag = max(time.perf_counter() - started - self.interval, 0.0)
+            EVENT_LOOP_LAG_SECONDS.set(self.lag)
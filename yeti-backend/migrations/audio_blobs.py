@@ -0,0 +1,98 @@
+"""
+Move inline base64 audio out of audio_messages documents into the blob store.
+
+Idempotent and resumable: only documents that still carry audio_data are
+touched, the blob is written before the field is unset, and a blob that is
+already stored (a run interrupted between the two) is not written again.
+
+Usage (from yeti-backend/): python -m migrations.audio_blobs [--batch-size 100] [--dry-run]
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from audio_store import AudioBlobStore, BlobNotFound, create_audio_store  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def store_blob(store: AudioBlobStore, blob_id: str, data: bytes, content_type: Optional[str]) -> bool:
+    """
+    Write a blob unless an identical-sized one is already stored (GridFS refuses
+    to reuse an id). A blob of a different size is replaced. Returns whether it wrote.
+    """
+    try:
+        stored_size = await store.size(blob_id)
+    except BlobNotFound:
+        stored_size = None
+    if stored_size == len(data):
+        return False
+    if stored_size is not None:
+        await store.delete(blob_id)
+    await store.put(blob_id, data, content_type)
+    return True
+
+
+async def migrate(batch_size: int, dry_run: bool):
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    store = create_audio_store(db, os.environ.get('AUDIO_STORE_URL', 'gridfs'))
+
+    query = {"audio_data": {"$exists": True, "$ne": None}}
+    pending = await db.audio_messages.count_documents(query)
+    logger.info(f"{pending} audio messages to migrate into the {store.name} store")
+
+    migrated = 0
+    moved_bytes = 0
+    # Only fetch ids up front, audio is loaded one document at a time
+    cursor = db.audio_messages.find(query, {"id": 1}).batch_size(batch_size)
+    async for ref in cursor:
+        doc = await db.audio_messages.find_one({"_id": ref["_id"]}, {"id": 1, "audio_data": 1, "content_type": 1})
+        if not doc or doc.get("audio_data") is None:
+            continue
+        try:
+            audio_bytes = base64.b64decode(doc["audio_data"])
+        except ValueError as e:
+            logger.error(f"Skipping message {doc['id']}: invalid base64 ({e})")
+            continue
+
+        if not dry_run:
+            if not await store_blob(store, doc["id"], audio_bytes, doc.get("content_type")):
+                logger.info(f"Blob for message {doc['id']} already stored, only unsetting audio_data")
+            await db.audio_messages.update_one(
+                {"_id": doc["_id"]},
+                {"$set": {"audio_size": len(audio_bytes)}, "$unset": {"audio_data": ""}}
+            )
+        migrated += 1
+        moved_bytes += len(audio_bytes)
+        if migrated % batch_size == 0:
+            logger.info(f"Migrated {migrated}/{pending} messages")
+
+    action = "Would migrate" if dry_run else "Migrated"
+    logger.info(f"{action} {migrated} messages ({moved_bytes / 1024 / 1024:.1f} MB of audio)")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be migrated without writing")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Put every audio message that predates channels on the global channel.
+
+History, latest and replay now filter on audio_messages.channel (served by
+the channel_timestamp_id index), so older documents without the field would
+otherwise disappear from them. Also drops the timestamp_id_desc index, which
+nothing queries any more.
+
+Usage (from yeti-backend/): python -m migrations.backfill_channels [--dry-run]
+"""
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
+
+ROOT_DIR = Path(__file__).parent.parent
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def migrate(dry_run: bool):
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    query = {"channel": {"$exists": False}}
+    pending = await db.audio_messages.count_documents(query)
+    if dry_run:
+        logger.info(f"Would move {pending} messages to the global channel and drop timestamp_id_desc")
+    else:
+        result = await db.audio_messages.update_many(query, {"$set": {"channel": "global"}})
+        logger.info(f"Moved {result.modified_count} messages to the global channel")
+        try:
+            await db.audio_messages.drop_index("timestamp_id_desc")
+            logger.info("Dropped index timestamp_id_desc")
+        except OperationFailure:
+            logger.info("Index timestamp_id_desc already gone")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Drop the unbounded user_profiles.lifetime_recordings array.
+
+Recordings are now resolved with an indexed nft_token_id query on
+audio_messages, so the array is dead weight that only makes every profile
+write rewrite a larger document.
+
+Usage (from yeti-backend/): python -m migrations.drop_lifetime_recordings [--dry-run]
+"""
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent.parent
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def migrate(dry_run: bool):
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    query = {"lifetime_recordings": {"$exists": True}}
+    pending = await db.user_profiles.count_documents(query)
+    if dry_run:
+        logger.info(f"Would drop lifetime_recordings from {pending} profiles")
+    else:
+        result = await db.user_profiles.update_many(query, {"$unset": {"lifetime_recordings": ""}})
+        logger.info(f"Dropped lifetime_recordings from {result.modified_count} profiles")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Page size bounds for keyset-paginated listings
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(timestamp: datetime, message_id: str) -> str:
+    """Opaque cursor pointing just past (timestamp, id)"""
+    raw = json.dumps({"ts": timestamp.isoformat(), "id": message_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor, raises ValueError on anything malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["ts"]), str(data["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def keyset_filter(cursor: Optional[str], ascending: bool) -> Dict[str, Any]:
+    """
+    Mongo filter selecting documents after the cursor in (timestamp, id) order.
+    Pair with sort [("timestamp", d), ("id", d)] and an index ending in the same keys.
+    """
+    if not cursor:
+        return {}
+    timestamp, message_id = decode_cursor(cursor)
+    return after_filter(timestamp, message_id, ascending)
+
+
+def after_filter(timestamp: datetime, message_id: str, ascending: bool) -> Dict[str, Any]:
+    """Mongo filter for documents strictly after (timestamp, id) in the given direction"""
+    op = "$gt" if ascending else "$lt"
+    return {
+        "$or": [
+            {"timestamp": {op: timestamp}},
+            {"timestamp": timestamp, "id": {op: message_id}}
+        ]
+    }
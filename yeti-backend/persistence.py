@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from metrics import DB_WRITE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Mongo error code for a unique index violation
+DUPLICATE_KEY = 11000
+
+# Cap on the delay between retries of a failing flush
+MAX_RETRY_BACKOFF_SECONDS = 5.0
+
+
+class MessageWriter:
+    """
+    Write-behind persistence for broadcast messages.
+
+    Broadcasts are relayed first and handed to this queue afterwards. A single
+    background task batches the message documents into one insert_many and
+    coalesces the per-sender profile counters into one bulk_write per flush.
+
+    - Backpressure: enqueue() waits while max_pending messages are unflushed.
+    - At-least-once: a failed flush is retried (with backoff) until it
+      succeeds; replays of an already inserted message are absorbed by the
+      unique index on audio_messages.id. Counter updates are only sent once
+      their batch's inserts succeeded.
+    - stop() flushes everything still queued before returning (bounded by
+      shutdown_timeout so a dead database cannot hang shutdown forever).
+    - pending() looks up a queued document by message id, for reads that
+      must not wait for the flush.
+    """
+
+    def __init__(
+        self,
+        messages,
+        profiles,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+        retry_backoff: float = 0.5,
+        shutdown_timeout: float = 30.0,
+    ):
+        self.messages = messages
+        self.profiles = profiles
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_backoff = retry_backoff
+        self.shutdown_timeout = shutdown_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        # message id -> document, from enqueue until its batch is written
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_now = asyncio.Event()
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self._total_flush_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def enqueue(self, document: Dict[str, Any]):
+        """Queue one audio_messages document; waits when the queue is full"""
+        if self._task is None or self._task.done():
+            # Not running (e.g. outside the app lifespan), write through
+            await self._flush([document])
+            return
+        self._pending[document["id"]] = document
+        await self._queue.put(document)
+        if self._queue.qsize() >= self.batch_size - 1:
+            self._flush_now.set()
+
+    def pending(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """A queued document not written to the database yet, None otherwise"""
+        return self._pending.get(message_id)
+
+    async def flush(self):
+        """Wait until everything queued so far has been written"""
+        if self._task is not None and not self._task.done():
+            self._flush_now.set()
+            await self._queue.join()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout=self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Shutting down with {self.queue_depth} unflushed messages")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        batch = [await self._queue.get()]
+        # Linger for more messages unless a full batch is waiting or a flush was requested
+        try:
+            await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._flush_now.clear()
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            attempt = 0
+            while True:
+                try:
+                    await self._flush(batch)
+                    break
+                except Exception as e:
+                    self.failures += 1
+                    delay = min(self.retry_backoff * (2 ** attempt), MAX_RETRY_BACKOFF_SECONDS)
+                    attempt += 1
+                    logger.error(f"Flushing {len(batch)} messages failed ({e!r}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+            for document in batch:
+                self._pending.pop(document["id"], None)
+                self._queue.task_done()
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        try:
+            await self.messages.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Already written by an earlier attempt that failed after the insert
+            errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY]
+            if errors or e.details.get("writeConcernErrors"):
+                raise
+        DB_WRITE_SECONDS.labels("insert_messages").observe(time.perf_counter() - started)
+
+        # One update per sender, however many messages they sent in this batch
+        counters_started = time.perf_counter()
+        counters: Dict[int, Tuple[int, datetime]] = {}
+        for document in batch:
+            count, last_active = counters.get(document["nft_token_id"], (0, document["timestamp"]))
+            counters[document["nft_token_id"]] = (count + 1, max(last_active, document["timestamp"]))
+        await self.profiles.bulk_write(
+            [
+                UpdateOne(
+                    {"nft_token_id": nft_token_id},
+                    {"$inc": {"total_messages_sent": count}, "$max": {"last_active": last_active}}
+                )
+                for nft_token_id, (count, last_active) in counters.items()
+            ],
+            ordered=False
+        )
+        DB_WRITE_SECONDS.labels("update_profiles").observe(time.perf_counter() - counters_started)
+
+        elapsed = time.perf_counter() - started
+        self.flushed += len(batch)
+        self.batches += 1
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        self._total_flush_seconds += elapsed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 2),
+            "max_flush_ms": round(self.max_flush_seconds * 1000, 2),
+            "avg_flush_ms": round(self._total_flush_seconds / self.batches * 1000, 2) if self.batches else 0.0
+        }
@@ -0,0 +1,80 @@
+import math
+import time
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional
+
+from channels import GLOBAL_CHANNEL
+
+
+class PTTStreamError(Exception):
+    """Raised when a streamed transmission breaks its limits"""
+
+
+def parse_duration(value: Any) -> Optional[float]:
+    """A client-reported duration as a positive finite float (None when not given)"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise PTTStreamError("Invalid duration")
+    try:
+        duration = float(value)
+    except (TypeError, ValueError):
+        raise PTTStreamError("Invalid duration")
+    if not math.isfinite(duration) or duration <= 0:
+        raise PTTStreamError("Invalid duration")
+    return duration
+
+
+class PTTStream:
+    """
+    Push-to-talk transmission that is relayed chunk by chunk while the sender
+    is still talking, then assembled into a single clip for persistence.
+    """
+
+    def __init__(
+        self,
+        nft_token_id: int,
+        wallet_address: str,
+        mime_type: Optional[str],
+        max_bytes: int,
+        max_duration: float,
+        channel: str = GLOBAL_CHANNEL,
+    ):
+        # The stream id becomes the id of the persisted AudioMessage
+        self.message_id = str(uuid.uuid4())
+        self.nft_token_id = nft_token_id
+        self.wallet_address = wallet_address
+        self.mime_type = mime_type
+        self.channel = channel
+        self.started_at = datetime.utcnow()
+        self.max_bytes = max_bytes
+        self.max_duration = max_duration
+        self.size = 0
+        self._chunks: List[bytes] = []
+        self._started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started
+
+    def add_chunk(self, chunk: bytes) -> int:
+        """Buffer a chunk for the final clip and return its sequence number"""
+        if self.size + len(chunk) > self.max_bytes:
+            raise PTTStreamError(f"Transmission too large (max {self.max_bytes} bytes)")
+        # Allow a little slack for network jitter on the last chunk
+        if self.elapsed > self.max_duration + 1:
+            raise PTTStreamError(f"Transmission too long (max {self.max_duration:g} seconds)")
+        self._chunks.append(chunk)
+        self.size += len(chunk)
+        return len(self._chunks) - 1
+
+    def assemble(self) -> bytes:
+        return b"".join(self._chunks)
+
+    def duration(self, reported: Optional[float] = None) -> float:
+        """Clip length, trusting the client's value only when it is plausible"""
+        elapsed = min(self.elapsed, self.max_duration)
+        if reported is not None and math.isfinite(reported) and 0 < reported <= elapsed + 1:
+            return min(reported, self.max_duration)
+        return elapsed
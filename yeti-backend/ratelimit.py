@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimit(NamedTuple):
+    """Token bucket: refills per_minute tokens a minute, holds at most burst"""
+    per_minute: float
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by scope and key (e.g. "broadcast", "42").
+    hit() takes one token and returns 0.0 when allowed, otherwise the seconds
+    until a token is available (for Retry-After).
+    """
+
+    name = "base"
+
+    async def hit(self, scope: str, key: str, limit: RateLimit) -> float:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """Per-worker buckets; with N workers a client effectively gets N times the limit"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        # (scope, key) -> [tokens, last refill time], least recently used first
+        self._buckets: "OrderedDict[tuple, list[float]]" = OrderedDict()
+
+    async def hit(self, scope: str, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get((scope, key))
+        if bucket is None:
+            bucket = [float(limit.burst), now]
+            self._buckets[(scope, key)] = bucket
+            if len(self._buckets) > self.max_entries:
+                # Idle buckets are full anyway, forgetting them changes nothing
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end((scope, key))
+            bucket[0] = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / limit.rate
+
+
+# Refill and take atomically on the Redis server, timed by the Redis clock so
+# workers never disagree. Returns the retry delay as a string (Lua numbers
+# would be truncated to integers).
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(now - ts, 0) * rate)
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry)
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Buckets shared by every worker. Accepts any redis.asyncio compatible client.
+    If Redis is unreachable requests are allowed (fail open) rather than
+    taking the API down with it.
+    """
+
+    name = "redis"
+
+    def __init__(self, redis_client, prefix: str = "yeti:ratelimit"):
+        self.redis = redis_client
+        self.prefix = prefix
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def hit(self, scope: str, key: str, limit: RateLimit) -> float:
+        try:
+            retry = await self._script(keys=[f"{self.prefix}:{scope}:{key}"], args=[limit.rate, limit.burst])
+        except Exception as e:
+            logger.error(f"Rate limiter unavailable, allowing request: {e}")
+            return 0.0
+        return float(retry)
+
+    async def close(self) -> None:
+        close = getattr(self.redis, "aclose", None) or self.redis.close
+        await close()
+
+
+def create_rate_limiter(url: str) -> RateLimiter:
+    """
+    Build the configured limiter from RATE_LIMIT_URL:
+    "memory" (default, per worker) or "redis://host:6379/0" (shared)
+    """
+    if url == "memory":
+        return InMemoryRateLimiter()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        import redis.asyncio as aioredis
+        return RedisRateLimiter(aioredis.from_url(url))
+    raise ValueError(f"Unsupported RATE_LIMIT_URL: {url}")
+
+
+class AdmissionControl:
+    """
+    Global load shedding. A background task samples the total outbound queue
+    depth and event loop lag every interval; while either is over its
+    threshold, overload_reason is set and new broadcasts, logins and websocket
+    connections are refused. Checking it costs the request path nothing.
+    """
+
+    def __init__(
+        self,
+        queue_depth: Callable[[], int],
+        loop_lag: Callable[[], float],
+        max_queue_depth: int,
+        max_loop_lag: float,
+        interval: float,
+    ):
+        self.queue_depth = queue_depth
+        self.loop_lag = loop_lag
+        self.max_queue_depth = max_queue_depth
+        self.max_loop_lag = max_loop_lag
+        self.interval = interval
+        self.overload_reason: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self):
+        reason = None
+        if self.max_queue_depth and self.queue_depth() > self.max_queue_depth:
+            reason = "outbound_queue"
+        elif self.max_loop_lag and self.loop_lag() > self.max_loop_lag:
+            reason = "loop_lag"
+        if reason != self.overload_reason:
+            if reason:
+                logger.warning(f"Overloaded ({reason}), shedding new work")
+            else:
+                logger.info("Load back to normal, admitting new work")
+        self.overload_reason = reason
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error sampling load for admission control: {e}")
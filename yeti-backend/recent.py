@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from typing import Any, Collection, List, Optional
+
+
+class RecentBroadcasts:
+    """
+    Bounded in-process ring of the most recent broadcasts, capped by both
+    message count and total audio bytes. Serves "latest" and reconnect
+    replay without touching the database; callers fall back to Mongo on a miss.
+    """
+
+    def __init__(self, max_messages: int, max_bytes: int):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._messages: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @staticmethod
+    def _size(message: Any) -> int:
+        return len(message.audio_data or "")
+
+    def add(self, message: Any):
+        """Remember a broadcast (a RelayMessage carrying its audio)"""
+        if message.id in self._messages:
+            return
+        size = self._size(message)
+        if size > self.max_bytes:
+            # Cannot be kept, but skipping it would make latest() and since() silently
+            # pass over it; forget everything so callers fall back to the database
+            self._messages.clear()
+            self.size_bytes = 0
+            return
+        self._messages[message.id] = message
+        self.size_bytes += size
+        while len(self._messages) > self.max_messages or self.size_bytes > self.max_bytes:
+            _, evicted = self._messages.popitem(last=False)
+            self.size_bytes -= self._size(evicted)
+
+    def get(self, message_id: str) -> Optional[Any]:
+        """A broadcast by id, None if it is not in the ring"""
+        return self._messages.get(message_id)
+
+    def latest(self, channel: str) -> Optional[Any]:
+        """Newest broadcast on a channel, None if the ring holds none"""
+        for message in reversed(self._messages.values()):
+            if message.channel == channel:
+                self.hits += 1
+                return message
+        self.misses += 1
+        return None
+
+    def since(self, message_id: str, channels: Collection[str]) -> Optional[List[Any]]:
+        """
+        Broadcasts on any of channels newer than message_id, oldest first.
+        None when message_id has already left the ring (caller must fall back).
+        """
+        if message_id not in self._messages:
+            self.misses += 1
+            return None
+        self.hits += 1
+        ids = list(self._messages)
+        return [
+            self._messages[i] for i in ids[ids.index(message_id) + 1:]
+            if self._messages[i].channel in channels
+        ]
@@ -1,21 +1,69 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends, Request, Query
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 import os
 import logging
 import uuid
 import json
 import asyncio
+import time
+import math
 from datetime import datetime, timedelta
-from web3 import Web3
+from eth_account import Account
 from eth_account.messages import encode_defunct
 import jwt
+import base64
+import binascii
 from pathlib import Path
 
+from fanout import (
+    ClientChannel,
+    OutboundFrame,
+    CLOSE_CODE_HEARTBEAT_TIMEOUT,
+    CLOSE_CODE_NORMAL,
+    CLOSE_CODE_OVERLOADED,
+    CLOSE_CODE_RATE_LIMITED,
+    CLOSE_CODE_SUPERSEDED,
+    CLOSE_CODE_TOO_SLOW,
+    SLOW_CLIENT_POLICIES,
+    encode_frame,
+)
+from framing import FORMAT_BINARY, FORMAT_JSON, WIRE_FORMATS, encode_audio_frame, encode_chunk_frame
+from ptt import PTTStream, PTTStreamError, parse_duration
+from audio_store import AudioBlobStore, BlobNotFound, create_audio_store, parse_range_header
+from chain import ChainClient, OwnershipCache, TransferWatcher
+from backplane import Backplane, InMemoryBackplane, create_backplane
+from indexes import ensure_indexes
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, after_filter, encode_cursor, keyset_filter
+from recent import RecentBroadcasts
+from messages import RelayMessage
+from persistence import MessageWriter
+from stats import CommunityCounters
+from auth import TicketError, TokenCache, WebSocketTickets
+from audio_processing import AudioProcessingError, AudioProcessor, NoSpeechError
+from channels import GLOBAL_CHANNEL, SubscriptionIndex, TooManySubscriptions, direct_channel, group_channel, message_type_for, parse_channel
+from metrics import (
+    ACTIVE_CONNECTIONS,
+    BROADCAST_FANOUT_SECONDS,
+    DB_WRITE_SECONDS,
+    HEARTBEAT_REAPED,
+    JWT_VERIFY_SECONDS,
+    OUTBOUND_QUEUE_DEPTH,
+    OUTBOUND_QUEUE_MAX_DEPTH,
+    PERSIST_QUEUE_DEPTH,
+    RATE_LIMITED,
+    REQUESTS_SHED,
+    LoopLagMonitor,
+)
+from ratelimit import AdmissionControl, RateLimit, create_rate_limiter
+from uploads import AudioUpload, UploadError
+
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -25,16 +73,160 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Audio blob storage (message documents only hold metadata), opened at startup:
+# the GridFS bucket binds to the running event loop
+AUDIO_STORE_URL = os.environ.get('AUDIO_STORE_URL', 'gridfs')  # gridfs or file:///path/to/dir
+audio_store: Optional[AudioBlobStore] = None
+MONGO_ENSURE_INDEXES = os.environ.get('MONGO_ENSURE_INDEXES', 'true').lower() == 'true'
+
 # Web3 setup for Ape Chain
 ape_chain_rpc = os.environ.get('APE_CHAIN_RPC_URL', 'https://ape.calderachain.xyz/http')
-w3 = Web3(Web3.HTTPProvider(ape_chain_rpc))
 
 # Contract address (placeholder - will be updated when collection launches)
 FROSTY_APE_YETI_CONTRACT = os.environ.get('FROSTY_APE_YETI_CONTRACT_ADDRESS', '0x0000000000000000000000000000000000000000')
 
+# Async chain client, RPC calls never block the event loop
+chain = ChainClient(
+    ape_chain_rpc,
+    FROSTY_APE_YETI_CONTRACT,
+    timeout=float(os.environ.get('APE_CHAIN_RPC_TIMEOUT_SECONDS', '5')),
+    retries=int(os.environ.get('APE_CHAIN_RPC_RETRIES', '2')),
+    backoff=float(os.environ.get('APE_CHAIN_RPC_BACKOFF_SECONDS', '0.25')),
+    max_concurrency=int(os.environ.get('APE_CHAIN_RPC_MAX_CONCURRENCY', '20'))
+)
+
+# NFT ownership cache
+ownership_cache = OwnershipCache(
+    ttl=float(os.environ.get('NFT_OWNERSHIP_CACHE_TTL_SECONDS', '300')),
+    negative_ttl=float(os.environ.get('NFT_OWNERSHIP_NEGATIVE_TTL_SECONDS', '30'))
+)
+NFT_TRANSFER_WATCH = os.environ.get('NFT_TRANSFER_WATCH', 'false').lower() == 'true'
+NFT_TRANSFER_POLL_SECONDS = float(os.environ.get('NFT_TRANSFER_POLL_SECONDS', '15'))
+transfer_watcher: Optional[TransferWatcher] = None
+
 # JWT Secret
 JWT_SECRET = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-here')
 
+# Verified JWTs are cached until they expire; websocket tickets replace JWTs in URLs
+token_cache = TokenCache(max_entries=int(os.environ.get('JWT_CACHE_MAX_ENTRIES', '10000')))
+ws_tickets = WebSocketTickets(JWT_SECRET, ttl=float(os.environ.get('WS_TICKET_TTL_SECONDS', '30')))
+
+# WebSocket fan-out settings
+WS_SEND_QUEUE_SIZE = int(os.environ.get('WS_SEND_QUEUE_SIZE', '32'))
+WS_SEND_TIMEOUT_SECONDS = float(os.environ.get('WS_SEND_TIMEOUT_SECONDS', '10'))
+WS_SLOW_CLIENT_POLICY = os.environ.get('WS_SLOW_CLIENT_POLICY', 'drop')  # drop or lag
+if WS_SLOW_CLIENT_POLICY not in SLOW_CLIENT_POLICIES:
+    raise ValueError(f"WS_SLOW_CLIENT_POLICY must be one of {SLOW_CLIENT_POLICIES}")
+
+# Dead peers are detected with protocol-level pings: uvicorn pings every websocket and closes
+# the ones whose pong does not arrive within the timeout. Browsers answer these on their own.
+# Only applied when launched through start.sh (or python server.py); a bare `uvicorn server:app`
+# uses uvicorn's --ws-ping-interval/--ws-ping-timeout instead
+WS_PING_INTERVAL_SECONDS = float(os.environ.get('WS_PING_INTERVAL_SECONDS', '20'))
+WS_PING_TIMEOUT_SECONDS = float(os.environ.get('WS_PING_TIMEOUT_SECONDS', '20'))
+
+# Application-level heartbeat, for proxies that do not pass protocol pings through: every interval
+# each client gets {"type": "ping"}, and clients that speak the heartbeat (have pinged or answered
+# a ping) are disconnected once silent for longer than the timeout. Clients that predate it never
+# answer, so they are left to the protocol pings rather than reaped (0 disables)
+WS_HEARTBEAT_INTERVAL_SECONDS = float(os.environ.get('WS_HEARTBEAT_INTERVAL_SECONDS', '20'))
+WS_HEARTBEAT_TIMEOUT_SECONDS = float(os.environ.get('WS_HEARTBEAT_TIMEOUT_SECONDS', '60'))
+if WS_HEARTBEAT_INTERVAL_SECONDS and WS_HEARTBEAT_TIMEOUT_SECONDS <= WS_HEARTBEAT_INTERVAL_SECONDS:
+    raise ValueError("WS_HEARTBEAT_TIMEOUT_SECONDS must be longer than WS_HEARTBEAT_INTERVAL_SECONDS")
+
+# Concurrent websocket sessions (tabs, devices) per NFT; connecting past the cap closes the oldest
+WS_MAX_SESSIONS_PER_NFT = int(os.environ.get('WS_MAX_SESSIONS_PER_NFT', '3'))
+
+# Channels one websocket session may join, including the automatic global and nft:<id> (0 disables)
+WS_MAX_SUBSCRIPTIONS_PER_SESSION = int(os.environ.get('WS_MAX_SUBSCRIPTIONS_PER_SESSION', '32'))
+if WS_MAX_SESSIONS_PER_NFT < 1:
+    raise ValueError("WS_MAX_SESSIONS_PER_NFT must be at least 1")
+
+# Cross-worker backplane for broadcasts and presence
+BACKPLANE_URL = os.environ.get('BACKPLANE_URL', 'memory')  # memory or redis://host:6379/0
+PRESENCE_HEARTBEAT_SECONDS = float(os.environ.get('PRESENCE_HEARTBEAT_SECONDS', '10'))
+
+# Write-behind persistence of broadcast messages
+message_writer = MessageWriter(
+    db.audio_messages,
+    db.user_profiles,
+    batch_size=int(os.environ.get('PERSIST_BATCH_SIZE', '100')),
+    flush_interval=float(os.environ.get('PERSIST_FLUSH_INTERVAL_SECONDS', '0.05')),
+    max_pending=int(os.environ.get('PERSIST_MAX_PENDING', '10000')),
+    shutdown_timeout=float(os.environ.get('PERSIST_SHUTDOWN_TIMEOUT_SECONDS', '30'))
+)
+
+# Hot ring buffer of the most recent broadcasts
+recent_broadcasts = RecentBroadcasts(
+    max_messages=int(os.environ.get('RECENT_BROADCASTS_MAX', '20')),
+    max_bytes=int(os.environ.get('RECENT_BROADCASTS_MAX_BYTES', str(16 * 1024 * 1024)))
+)
+
+# Community stats served from maintained counters
+community_counters = CommunityCounters(
+    reconcile_interval=float(os.environ.get('COMMUNITY_STATS_RECONCILE_SECONDS', '60')),
+    cache_ttl=float(os.environ.get('COMMUNITY_STATS_CACHE_SECONDS', '2'))
+)
+
+# Optional processing stage (needs ffmpeg): VAD silence trim, loudness normalization, mono Opus.
+# Everything that needs the decoded audio depends on this flag: VAD trimming, rejecting clips
+# with no speech and measuring the duration on the server. Off (the default, the image ships
+# without ffmpeg) clips are stored as uploaded and the validated client-reported duration is kept.
+AUDIO_TRANSCODE = os.environ.get('AUDIO_TRANSCODE', 'false').lower() == 'true'
+audio_processor = AudioProcessor(
+    workers=int(os.environ.get('AUDIO_TRANSCODE_WORKERS', '2')),
+    bitrate=os.environ.get('AUDIO_OPUS_BITRATE', '24k'),
+    loudness_lufs=float(os.environ.get('AUDIO_LOUDNESS_TARGET_LUFS', '-16')),
+    silence_db=float(os.environ.get('AUDIO_SILENCE_THRESHOLD_DB', '-50'))
+)
+
+# Prometheus metrics: how often the event loop lag probe runs
+loop_lag_monitor = LoopLagMonitor(interval=float(os.environ.get('EVENT_LOOP_LAG_PROBE_SECONDS', '0.5')))
+
+# Per-NFT token bucket rate limits (0 per minute disables a limit)
+RATE_LIMIT_URL = os.environ.get('RATE_LIMIT_URL', 'memory')  # memory (per worker) or redis://host:6379/0 (shared)
+rate_limiter = create_rate_limiter(RATE_LIMIT_URL)
+RATE_LIMITS = {
+    "broadcast": RateLimit(
+        per_minute=float(os.environ.get('RATE_LIMIT_BROADCASTS_PER_MINUTE', '30')),
+        burst=int(os.environ.get('RATE_LIMIT_BROADCAST_BURST', '10'))
+    ),
+    "login": RateLimit(
+        per_minute=float(os.environ.get('RATE_LIMIT_LOGINS_PER_MINUTE', '10')),
+        burst=int(os.environ.get('RATE_LIMIT_LOGIN_BURST', '5'))
+    ),
+    # Unsigned attempts are counted per client IP (behind NAT many wallets share one, so it is looser).
+    # Behind a reverse proxy the IP comes from its X-Forwarded-For, trusted only from FORWARDED_ALLOW_IPS
+    # (see start.sh); otherwise every login would share the proxy's address
+    "login_ip": RateLimit(
+        per_minute=float(os.environ.get('RATE_LIMIT_LOGINS_PER_IP_PER_MINUTE', '30')),
+        burst=int(os.environ.get('RATE_LIMIT_LOGIN_IP_BURST', '15'))
+    ),
+    "connect": RateLimit(
+        per_minute=float(os.environ.get('RATE_LIMIT_CONNECTS_PER_MINUTE', '30')),
+        burst=int(os.environ.get('RATE_LIMIT_CONNECT_BURST', '10'))
+    ),
+}
+
+# Admission control: shed new broadcasts, logins and connections while overloaded (0 disables a check)
+admission_control = AdmissionControl(
+    queue_depth=lambda: manager.outbound_queue_depth(),
+    loop_lag=lambda: loop_lag_monitor.lag,
+    max_queue_depth=int(os.environ.get('ADMISSION_MAX_OUTBOUND_QUEUE', '100000')),
+    max_loop_lag=float(os.environ.get('ADMISSION_MAX_LOOP_LAG_SECONDS', '0.5')),
+    interval=float(os.environ.get('ADMISSION_SAMPLE_SECONDS', '0.5'))
+)
+
+# Private channel groups
+MAX_GROUP_MEMBERS = int(os.environ.get('MAX_GROUP_MEMBERS', '100'))
+# Groups returned by GET /api/groups
+MAX_GROUPS_LISTED = int(os.environ.get('MAX_GROUPS_LISTED', '200'))
+
+# Audio limits
+MAX_AUDIO_DURATION_SECONDS = 30
+PTT_MAX_STREAM_BYTES = int(os.environ.get('PTT_MAX_STREAM_BYTES', str(2 * 1024 * 1024)))
+MAX_AUDIO_UPLOAD_BYTES = int(os.environ.get('MAX_AUDIO_UPLOAD_BYTES', str(2 * 1024 * 1024)))
+
 # FastAPI app
 app = FastAPI(title="Yeti Talki API", description="Web3 NFT-Gated Walkie-Talkie")
 
@@ -68,13 +260,34 @@ class NFTVerificationResponse(BaseModel):
     message: str
 
 class AudioMessage(BaseModel):
+    """API shape of an audio message, the relay itself carries RelayMessage (messages.py)"""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     nft_token_id: int
     wallet_address: str
-    audio_data: str  # Base64 encoded audio
+    audio_data: Optional[str] = None  # Base64 encoded audio, only carried in flight (stored in audio_store)
+    audio_size: Optional[int] = None  # Raw audio bytes in the blob store
+    content_type: Optional[str] = None
     duration: float
     timestamp: datetime = Field(default_factory=datetime.utcnow)
-    message_type: str = "broadcast"  # broadcast, direct, etc.
+    message_type: str = "broadcast"  # broadcast, trait, group or direct, follows the channel
+    channel: str = GLOBAL_CHANNEL  # see channels.py
+
+class AudioMessageSummary(BaseModel):
+    """Lightweight history entry, audio is fetched separately from audio_url"""
+    id: str
+    nft_token_id: int
+    duration: float
+    timestamp: datetime
+    message_type: str = "broadcast"
+    channel: str = GLOBAL_CHANNEL
+    audio_size: Optional[int] = None
+    content_type: Optional[str] = None
+    audio_url: str
+
+class AudioHistoryPage(BaseModel):
+    success: bool = True
+    messages: List[AudioMessageSummary]
+    next_cursor: Optional[str] = None
 
 class UserProfile(BaseModel):
     wallet_address: str
@@ -83,55 +296,357 @@ class UserProfile(BaseModel):
     total_messages_received: int = 0
     first_login: datetime = Field(default_factory=datetime.utcnow)
     last_active: datetime = Field(default_factory=datetime.utcnow)
-    lifetime_recordings: List[str] = Field(default_factory=list)  # Audio message IDs
+
+class ChannelGroup(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str
+    owner_token_id: int
+    members: List[int]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class CreateGroupRequest(BaseModel):
+    name: str = Field(min_length=1, max_length=64)
+    members: List[int] = Field(default_factory=list, max_length=MAX_GROUP_MEMBERS)
+
+class GroupMemberRequest(BaseModel):
+    token_id: int
 
 # WebSocket connection manager
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.user_sessions: Dict[str, Dict] = {}
+    """
+    Local websocket connections plus a backplane to the other workers.
+    Broadcasts are delivered to local listeners and published once for
+    every other worker to deliver to theirs. Every broadcast targets one
+    channel and only touches that channel's local subscribers.
+    
+    Each websocket is a session with its own id, outbound queue and channel
+    subscriptions. An NFT (user id) may hold up to WS_MAX_SESSIONS_PER_NFT
+    sessions; a new one past the cap evicts and closes the oldest, so
+    reconnect storms cannot pile up sockets. Presence counts users, not sessions.
+    """
+    
+    def __init__(self, backplane: Optional[Backplane] = None):
+        # session id -> outbound channel, and user id -> its session ids (oldest first)
+        self.channels: Dict[str, ClientChannel] = {}
+        self.user_sessions: Dict[str, Dict[str, ClientChannel]] = {}
+        self.subscriptions = SubscriptionIndex(WS_MAX_SUBSCRIPTIONS_PER_SESSION)
+        self.backplane = backplane or InMemoryBackplane()
+        self.worker_id = uuid.uuid4().hex
+        # worker_id -> (online user ids, last heard from)
+        self.remote_presence: Dict[str, Tuple[Set[str], float]] = {}
+        self._presence_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        # publish_soon() tasks in flight; the loop only keeps weak references to tasks
+        self._publishing: Set[asyncio.Task] = set()
+    
+    async def start(self):
+        await self.backplane.start(self.handle_backplane_event)
+        self._presence_task = asyncio.create_task(self._presence_heartbeat())
+        if WS_HEARTBEAT_INTERVAL_SECONDS:
+            self._heartbeat_task = asyncio.create_task(self._client_heartbeat())
+        logger.info(f"Worker {self.worker_id} joined the {self.backplane.name} backplane")
+    
+    async def stop(self):
+        if self._presence_task:
+            self._presence_task.cancel()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+        await self.publish({"type": "presence", "left_worker": True})
+        await self.backplane.stop()
+    
+    async def publish(self, event: Dict[str, Any]):
+        event["origin"] = self.worker_id
+        try:
+            await self.backplane.publish(event)
+        except Exception as e:
+            logger.error(f"Error publishing {event['type']} to backplane: {e}")
+    
+    def publish_soon(self, event: Dict[str, Any]):
+        """Publish from synchronous code paths"""
+        task = asyncio.create_task(self.publish(event))
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+    
+    async def _presence_heartbeat(self):
+        while True:
+            await asyncio.sleep(PRESENCE_HEARTBEAT_SECONDS)
+            await self.publish({"type": "presence", "online": list(self.user_sessions)})
+    
+    async def _client_heartbeat(self):
+        while True:
+            await asyncio.sleep(WS_HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                self.check_heartbeats()
+            except Exception as e:
+                logger.error(f"Error checking websocket heartbeats: {e}")
     
-    async def connect(self, websocket: WebSocket, user_id: str, token_id: int):
+    def check_heartbeats(self) -> int:
+        """
+        Reap heartbeat-speaking clients that have been silent past the timeout
+        and ping the rest. Half-open sockets are removed here instead of failing
+        a send on every broadcast. Returns the number of clients reaped.
+        """
+        silent_before = time.monotonic() - WS_HEARTBEAT_TIMEOUT_SECONDS
+        ping = encode_frame({"type": "ping", "ts": time.time()})
+        reaped = 0
+        for session_id, client in list(self.channels.items()):
+            if client.heartbeat and client.last_seen < silent_before:
+                logger.info(f"No heartbeat from {client.user_id} in {WS_HEARTBEAT_TIMEOUT_SECONDS:g}s, disconnecting")
+                self.disconnect(session_id, close_code=CLOSE_CODE_HEARTBEAT_TIMEOUT)
+                reaped += 1
+            elif not client.offer(ping):
+                self.disconnect(session_id, close_code=CLOSE_CODE_TOO_SLOW)
+        HEARTBEAT_REAPED.inc(reaped)
+        return reaped
+    
+    def outbound_queue_depth(self) -> int:
+        return sum(client.queue_depth for client in list(self.channels.values()))
+    
+    def touch(self, session_id: str, heartbeat: bool = False):
+        client = self.channels.get(session_id)
+        if client:
+            client.touch(heartbeat)
+    
+    def online_user_ids(self) -> Set[str]:
+        """Users online on any worker, ignoring workers that stopped heartbeating"""
+        online = set(self.user_sessions)
+        stale_before = time.monotonic() - PRESENCE_HEARTBEAT_SECONDS * 3
+        for worker_id, (users, seen_at) in list(self.remote_presence.items()):
+            if seen_at < stale_before:
+                del self.remote_presence[worker_id]
+            else:
+                online |= users
+        return online
+    
+    async def connect(self, websocket: WebSocket, user_id: str, token_id: int, wire_format: str = FORMAT_JSON) -> str:
+        """Register a new session for a user and return its session id"""
         await websocket.accept()
-        self.active_connections[user_id] = websocket
-        self.user_sessions[user_id] = {
-            "token_id": token_id,
-            "connected_at": datetime.utcnow(),
-            "websocket": websocket
-        }
-        logger.info(f"User {user_id} (NFT #{token_id}) connected")
-    
-    def disconnect(self, user_id: str):
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
-        if user_id in self.user_sessions:
-            del self.user_sessions[user_id]
-        logger.info(f"User {user_id} disconnected")
-    
-    async def broadcast_audio(self, message: AudioMessage, sender_id: str):
-        """Broadcast audio message to all connected users except sender"""
-        if not self.active_connections:
+        sessions = self.user_sessions.setdefault(user_id, {})
+        first_session = not sessions
+        session_id = uuid.uuid4().hex
+        client = ClientChannel(
+            websocket,
+            user_id,
+            max_queue=WS_SEND_QUEUE_SIZE,
+            policy=WS_SLOW_CLIENT_POLICY,
+            send_timeout=WS_SEND_TIMEOUT_SECONDS,
+            on_dead=self.disconnect,
+            binary=wire_format == FORMAT_BINARY,
+            session_id=session_id
+        )
+        self.channels[session_id] = client
+        sessions[session_id] = client
+        # Over the cap, close the user's oldest sessions
+        while len(sessions) > WS_MAX_SESSIONS_PER_NFT:
+            logger.info(f"User {user_id} is over {WS_MAX_SESSIONS_PER_NFT} sessions, closing the oldest")
+            self.disconnect(next(iter(sessions)), close_code=CLOSE_CODE_SUPERSEDED)
+        # Every session hears the global channel and its NFT's direct messages
+        self.subscriptions.subscribe(session_id, GLOBAL_CHANNEL)
+        self.subscriptions.subscribe(session_id, direct_channel(token_id))
+        if first_session:
+            await self.publish({"type": "presence", "joined": user_id})
+        logger.info(f"User {user_id} (NFT #{token_id}) connected ({wire_format}), session {session_id}")
+        return session_id
+    
+    def disconnect(self, session_id: str, close_code: int = CLOSE_CODE_NORMAL):
+        """Forget a session and close its socket (a no-op if the client already hung up)"""
+        client = self.channels.pop(session_id, None)
+        if client is None:
+            # Already evicted or reaped
+            return
+        self.subscriptions.remove_session(session_id)
+        client.close(close_code)
+        sessions = self.user_sessions.get(client.user_id)
+        if sessions is not None:
+            sessions.pop(session_id, None)
+            if not sessions:
+                del self.user_sessions[client.user_id]
+                self.publish_soon({"type": "presence", "left": client.user_id})
+        logger.info(f"User {client.user_id} disconnected, session {session_id}")
+    
+    def broadcast(self, frame: Any, sender_id: str, channel: str = GLOBAL_CHANNEL):
+        """Queue a pre-encoded frame once for each of the channel's local subscriber sessions, except the sender's"""
+        started = time.perf_counter()
+        slow_sessions = []
+        for session_id in self.subscriptions.subscribers(channel):
+            client = self.channels.get(session_id)
+            # Don't send to sender (on any of their sessions)
+            if client and client.user_id != sender_id and not client.offer(frame):
+                slow_sessions.append(session_id)
+        BROADCAST_FANOUT_SECONDS.observe(time.perf_counter() - started)
+        
+        # Drop clients that could not keep up
+        for session_id in slow_sessions:
+            self.disconnect(session_id, close_code=CLOSE_CODE_TOO_SLOW)
+    
+    def send_personal(self, session_id: str, payload: Dict[str, Any]):
+        """Queue a JSON message for a single local session"""
+        channel = self.channels.get(session_id)
+        if channel and not channel.offer(encode_frame(payload)):
+            self.disconnect(session_id, close_code=CLOSE_CODE_TOO_SLOW)
+    
+    async def broadcast_event(self, payload: Dict[str, Any], sender_id: str, channel: str = GLOBAL_CHANNEL):
+        """Send a JSON message to the channel's subscribers except sender, on all workers"""
+        self.broadcast(encode_frame(payload), sender_id, channel)
+        await self.publish({"type": "event", "sender_id": sender_id, "channel": channel, "payload": payload})
+    
+    async def broadcast_audio(self, message: RelayMessage, sender_id: str):
+        """Queue audio message for the message channel's subscribers except sender, on all workers"""
+        recent_broadcasts.add(message)
+        community_counters.increment("messages_sent")
+        self.deliver_audio(message, sender_id)
+        await self.publish({"type": "audio_message", "sender_id": sender_id, "message": message.to_dict()})
+    
+    async def drop_subscription(self, user_id: str, channel: str):
+        """Unsubscribe all of a user's sessions from a channel on every worker (e.g. removed from a group)"""
+        self.unsubscribe_user(user_id, channel)
+        await self.publish({"type": "unsubscribe", "user_id": user_id, "channel": channel})
+    
+    def unsubscribe_user(self, user_id: str, channel: str):
+        for session_id in list(self.user_sessions.get(user_id, ())):
+            self.subscriptions.unsubscribe(session_id, channel)
+    
+    async def increment_counter(self, name: str):
+        """Bump a community counter on every worker"""
+        community_counters.increment(name)
+        await self.publish({"type": "counter", "name": name})
+    
+    async def share_recent(self, message: RelayMessage):
+        """Add a message that was not broadcast whole (e.g. a finished live stream) to every worker's ring"""
+        recent_broadcasts.add(message)
+        community_counters.increment("messages_sent")
+        await self.publish({"type": "recent", "message": message.to_dict()})
+    
+    def deliver_audio(self, message: RelayMessage, sender_id: str):
+        if message.audio_data is None or not self.subscriptions.subscribers(message.channel):
+            return
+        self.broadcast(self.audio_frame(message), sender_id, message.channel)
+    
+    async def send_audio_personal(self, session_id: str, message: RelayMessage):
+        """Send an audio message to one local session, waiting for room in its queue"""
+        channel = self.channels.get(session_id)
+        if channel and message.audio_data is not None:
+            await channel.send(self.audio_frame(message))
+    
+    @staticmethod
+    def audio_frame(message: RelayMessage) -> OutboundFrame:
+        # Serialize once per wire format, every recipient shares the same frame
+        return OutboundFrame(
+            lambda: encode_frame({
+                "type": "audio_message",
+                "data": message.to_dict()
+            }),
+            lambda: encode_audio_frame(
+                message.id,
+                message.nft_token_id,
+                message.duration,
+                message.timestamp,
+                message.audio_data
+            )
+        )
+    
+    async def broadcast_audio_chunk(
+        self,
+        message_id: str,
+        nft_token_id: int,
+        seq: int,
+        chunk: bytes,
+        sender_id: str,
+        channel: str = GLOBAL_CHANNEL
+    ):
+        """Relay one live push-to-talk chunk to the channel's subscribers except sender, on all workers"""
+        self.deliver_audio_chunk(message_id, nft_token_id, seq, chunk, sender_id, channel)
+        await self.publish({
+            "type": "audio_chunk",
+            "sender_id": sender_id,
+            "channel": channel,
+            "message_id": message_id,
+            "nft_token_id": nft_token_id,
+            "seq": seq,
+            "audio_data": base64.b64encode(chunk).decode()
+        })
+    
+    def deliver_audio_chunk(
+        self,
+        message_id: str,
+        nft_token_id: int,
+        seq: int,
+        chunk: bytes,
+        sender_id: str,
+        channel: str = GLOBAL_CHANNEL
+    ):
+        if not self.subscriptions.subscribers(channel):
             return
-            
-        message_data = {
-            "type": "audio_message",
-            "data": message.dict()
-        }
         
-        disconnected_users = []
-        for user_id, websocket in self.active_connections.items():
-            if user_id != sender_id:  # Don't send to sender
-                try:
-                    await websocket.send_text(json.dumps(message_data, default=str))
-                except Exception as e:
-                    logger.error(f"Error sending to {user_id}: {e}")
-                    disconnected_users.append(user_id)
+        frame = OutboundFrame(
+            lambda: encode_frame({
+                "type": "audio_chunk",
+                "data": {
+                    "message_id": message_id,
+                    "nft_token_id": nft_token_id,
+                    "seq": seq,
+                    "audio_data": base64.b64encode(chunk).decode()
+                }
+            }),
+            lambda: encode_chunk_frame(message_id, nft_token_id, seq, chunk)
+        )
+        self.broadcast(frame, sender_id, channel)
+    
+    async def handle_backplane_event(self, event: Dict[str, Any]):
+        """Deliver an event published by another worker to local listeners"""
+        origin = event.get("origin")
+        if origin == self.worker_id:
+            return
         
-        # Clean up disconnected users
-        for user_id in disconnected_users:
-            self.disconnect(user_id)
+        event_type = event.get("type")
+        if event_type == "audio_message":
+            message = RelayMessage.from_dict(event["message"])
+            recent_broadcasts.add(message)
+            community_counters.increment("messages_sent")
+            self.deliver_audio(message, event["sender_id"])
+        elif event_type == "recent":
+            recent_broadcasts.add(RelayMessage.from_dict(event["message"]))
+            community_counters.increment("messages_sent")
+        elif event_type == "counter":
+            community_counters.increment(event["name"])
+        elif event_type == "unsubscribe":
+            self.unsubscribe_user(event["user_id"], event["channel"])
+        elif event_type == "ticket_used":
+            ws_tickets.mark_used(event["nonce"], event["exp"])
+        elif event_type == "audio_chunk":
+            self.deliver_audio_chunk(
+                event["message_id"],
+                event["nft_token_id"],
+                event["seq"],
+                base64.b64decode(event["audio_data"]),
+                event["sender_id"],
+                event.get("channel", GLOBAL_CHANNEL)
+            )
+        elif event_type == "event":
+            self.broadcast(encode_frame(event["payload"]), event["sender_id"], event.get("channel", GLOBAL_CHANNEL))
+        elif event_type == "presence":
+            self._apply_presence(origin, event)
+    
+    def _apply_presence(self, origin: str, event: Dict[str, Any]):
+        if event.get("left_worker"):
+            self.remote_presence.pop(origin, None)
+            return
+        users, _ = self.remote_presence.get(origin, (set(), 0.0))
+        if "online" in event:
+            users = set(event["online"])
+        if "joined" in event:
+            users.add(event["joined"])
+        if "left" in event:
+            users.discard(event["left"])
+        self.remote_presence[origin] = (users, time.monotonic())
 
-manager = ConnectionManager()
+manager = ConnectionManager(create_backplane(BACKPLANE_URL))
+
+# Gauges are computed when /metrics is scraped, never on the message path
+ACTIVE_CONNECTIONS.set_function(lambda: len(manager.channels))
+OUTBOUND_QUEUE_DEPTH.set_function(manager.outbound_queue_depth)
+OUTBOUND_QUEUE_MAX_DEPTH.set_function(lambda: max((channel.queue_depth for channel in list(manager.channels.values())), default=0))
+PERSIST_QUEUE_DEPTH.set_function(lambda: message_writer.queue_depth)
 
 # Utility functions
 async def verify_nft_ownership(wallet_address: str) -> Optional[int]:
@@ -140,22 +655,6 @@ async def verify_nft_ownership(wallet_address: str) -> Optional[int]:
     Returns token_id if owned, None otherwise
     """
     try:
-        # ERC-721 ABI for balanceOf and tokenOfOwnerByIndex
-        erc721_abi = [
-            {
-                "inputs": [{"name": "owner", "type": "address"}],
-                "name": "balanceOf",
-                "outputs": [{"name": "", "type": "uint256"}],
-                "type": "function"
-            },
-            {
-                "inputs": [{"name": "owner", "type": "address"}, {"name": "index", "type": "uint256"}],
-                "name": "tokenOfOwnerByIndex",
-                "outputs": [{"name": "", "type": "uint256"}],
-                "type": "function"
-            }
-        ]
-        
         if FROSTY_APE_YETI_CONTRACT == '0x0000000000000000000000000000000000000000':
             # For development - mock NFT ownership
             # Generate a mock token ID based on wallet address
@@ -163,17 +662,7 @@ async def verify_nft_ownership(wallet_address: str) -> Optional[int]:
             logger.info(f"Mock NFT verification - Wallet {wallet_address} owns token #{mock_token_id}")
             return mock_token_id
         
-        contract = w3.eth.contract(address=FROSTY_APE_YETI_CONTRACT, abi=erc721_abi)
-        
-        # Check balance
-        balance = contract.functions.balanceOf(wallet_address).call()
-        
-        if balance == 0:
-            return None
-        
-        # Get the first token owned by this address
-        token_id = contract.functions.tokenOfOwnerByIndex(wallet_address, 0).call()
-        return int(token_id)
+        return await ownership_cache.get(wallet_address, chain.owned_token)
         
     except Exception as e:
         logger.error(f"Error verifying NFT ownership: {e}")
@@ -183,7 +672,7 @@ def verify_signature(message: str, signature: str, wallet_address: str) -> bool:
     """Verify MetaMask signature"""
     try:
         encoded_message = encode_defunct(text=message)
-        recovered_address = w3.eth.account.recover_message(encoded_message, signature=signature)
+        recovered_address = Account.recover_message(encoded_message, signature=signature)
         return recovered_address.lower() == wallet_address.lower()
     except Exception as e:
         logger.error(f"Error verifying signature: {e}")
@@ -199,21 +688,151 @@ def create_access_token(wallet_address: str, token_id: int) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
 
+def decode_token(token: str) -> Dict[str, Any]:
+    """jwt.decode with a cache in front, so hot polling endpoints skip HMAC and JSON parsing"""
+    started = time.perf_counter()
+    payload = token_cache.get(token)
+    if payload is not None:
+        JWT_VERIFY_SECONDS.labels("hit").observe(time.perf_counter() - started)
+        return payload
+    payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+    token_cache.put(token, payload)
+    JWT_VERIFY_SECONDS.labels("miss").observe(time.perf_counter() - started)
+    return payload
+
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token"""
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=["HS256"])
-        return payload
+        return decode_token(credentials.credentials)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+async def rate_limit_retry_after(scope: str, key: Any) -> float:
+    """Take a token from key's bucket; 0.0 when allowed, else seconds until the next token"""
+    limit = RATE_LIMITS[scope]
+    if not limit.per_minute:
+        return 0.0
+    retry_after = await rate_limiter.hit(scope, str(key), limit)
+    if retry_after:
+        RATE_LIMITED.labels(scope).inc()
+    return retry_after
+
+async def enforce_rate_limit(scope: str, key: Any):
+    retry_after = await rate_limit_retry_after(scope, key)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many {scope} requests, slow down",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+def overload_reason() -> Optional[str]:
+    """Why new work is being refused right now (counted as shed), None when admitted"""
+    reason = admission_control.overload_reason
+    if reason:
+        REQUESTS_SHED.labels(reason).inc()
+    return reason
+
+async def admit():
+    """Dependency for endpoints that create work: 429 while the relay is overloaded"""
+    if overload_reason():
+        raise HTTPException(status_code=429, detail="Server busy, try again shortly", headers={"Retry-After": "1"})
+
+async def is_group_member(group_id: str, token_id: int) -> bool:
+    return await db.channel_groups.find_one({"id": group_id, "members": token_id}, {"_id": 1}) is not None
+
+async def can_listen(token_id: int, channel: str) -> bool:
+    """Whether an NFT may subscribe to / read a channel (raises ValueError for bad names)"""
+    kind, key = parse_channel(channel)
+    if kind == "nft":
+        return key == str(token_id)
+    if kind == "group":
+        return await is_group_member(key, token_id)
+    return True
+
+async def can_read_message(token_id: int, doc: Dict[str, Any]) -> bool:
+    """Whether an NFT may fetch a stored message: its channel's listeners, plus whoever sent it"""
+    if doc.get("nft_token_id") == token_id:
+        return True
+    return await can_listen(token_id, doc.get("channel", GLOBAL_CHANNEL))
+
+async def can_send(token_id: int, channel: str) -> bool:
+    """Whether an NFT may broadcast to a channel; anyone may message an NFT directly"""
+    kind, key = parse_channel(channel)
+    if kind == "group":
+        return await is_group_member(key, token_id)
+    return True
+
+async def channel_access_error(token_id: int, channel: str, send: bool = False) -> Optional[str]:
+    """Why an NFT may not use a channel, None when it may (for websocket replies)"""
+    try:
+        allowed = await (can_send if send else can_listen)(token_id, channel)
+    except ValueError as e:
+        return str(e)
+    return None if allowed else "Not a member of this channel"
+
+async def require_channel_access(token_id: int, channel: str, send: bool = False):
+    try:
+        allowed = await (can_send if send else can_listen)(token_id, channel)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Not a member of this channel")
+
+def require_valid_duration(duration: float):
+    """400 unless a client-reported duration is a finite number of seconds within the clip limit"""
+    if not math.isfinite(duration) or duration <= 0:
+        raise HTTPException(status_code=400, detail="duration must be a positive number of seconds")
+    if duration > MAX_AUDIO_DURATION_SECONDS:
+        raise HTTPException(status_code=400, detail="Audio message too long (max 30 seconds)")
+
+def audio_url(message_id: str) -> str:
+    return f"/api/audio/{message_id}/data"
+
+async def process_audio(audio_message: RelayMessage, audio_bytes: bytes) -> bytes:
+    """
+    Run a clip through the processing stage when enabled, updating the message's
+    content type and duration (measured from the trimmed audio). Falls back to the
+    original clip if processing fails; raises NoSpeechError for clips with no speech.
+    With AUDIO_TRANSCODE off this is a no-op: no VAD, and the reported duration stands.
+    """
+    if not AUDIO_TRANSCODE:
+        return audio_bytes
+    try:
+        processed = await audio_processor.process(audio_bytes)
+    except NoSpeechError:
+        raise
+    except AudioProcessingError as e:
+        logger.warning(f"Keeping original audio for message {audio_message.id}: {e}")
+        return audio_bytes
+    logger.info(f"Transcoded message {audio_message.id}: {processed.original_size} -> {len(processed.data)} bytes ({processed.bytes_saved} saved)")
+    audio_message.content_type = processed.content_type
+    audio_message.duration = processed.duration
+    return processed.data
+
+async def save_audio_message(audio_message: RelayMessage, audio_bytes: bytes, blob_stored: bool = False):
+    """Persist an audio message and credit it to the sender's profile"""
+    
+    # Audio goes to the blob store (unless it was streamed there on upload), the document only keeps metadata
+    audio_message.audio_size = len(audio_bytes)
+    if not blob_stored:
+        with DB_WRITE_SECONDS.labels("audio_blob").time():
+            await audio_store.put(audio_message.id, audio_bytes, audio_message.content_type)
+    
+    # Document insert and profile counter are batched by the write-behind queue
+    await message_writer.enqueue(audio_message.to_dict(include_audio=False))
+
 # API Routes
-@app.post("/api/auth/verify-nft", response_model=NFTVerificationResponse)
-async def verify_nft_and_authenticate(request: WalletConnectRequest):
+@app.post("/api/auth/verify-nft", response_model=NFTVerificationResponse, dependencies=[Depends(admit)])
+async def verify_nft_and_authenticate(request: WalletConnectRequest, http_request: Request):
     """Verify NFT ownership and authenticate user"""
     
+    # Limited per client IP before the signature check, then per wallet before the RPC call and per NFT after.
+    # A wallet's bucket is only charged once its owner signed, so nobody can lock someone else out.
+    await enforce_rate_limit("login_ip", http_request.client.host if http_request.client else "unknown")
+    
     # Verify signature
     if not verify_signature(request.message, request.signature, request.wallet_address):
         return NFTVerificationResponse(
@@ -222,6 +841,8 @@ async def verify_nft_and_authenticate(request: WalletConnectRequest):
             message="Invalid signature"
         )
     
+    await enforce_rate_limit("login", request.wallet_address.lower())
+    
     # Check NFT ownership
     token_id = await verify_nft_ownership(request.wallet_address)
     
@@ -232,6 +853,8 @@ async def verify_nft_and_authenticate(request: WalletConnectRequest):
             message="No Frosty Ape Yeti NFT found in this wallet"
         )
     
+    await enforce_rate_limit("login", token_id)
+    
     # Create or update user profile
     user_profile = await db.user_profiles.find_one({"nft_token_id": token_id})
     
@@ -242,6 +865,7 @@ async def verify_nft_and_authenticate(request: WalletConnectRequest):
             nft_token_id=token_id
         )
         await db.user_profiles.insert_one(new_profile.dict())
+        await manager.increment_counter("registered_nfts")
     else:
         # Update last active
         await db.user_profiles.update_one(
@@ -260,60 +884,282 @@ async def verify_nft_and_authenticate(request: WalletConnectRequest):
         message=f"Access granted! Welcome, Frosty Ape Yeti #{token_id}"
     )
 
-@app.post("/api/audio/broadcast")
+@app.post("/api/auth/ws-ticket")
+async def issue_websocket_ticket(token_data: dict = Depends(verify_token)):
+    """One-time ticket for connecting to /ws?ticket=..., so the JWT never ends up in a URL"""
+    ticket = ws_tickets.issue(token_data["token_id"], token_data["wallet_address"], not_after=token_data.get("exp"))
+    return {"ticket": ticket, "expires_in": ws_tickets.ttl}
+
+@app.post("/api/audio/broadcast", dependencies=[Depends(admit)], deprecated=True)
 async def broadcast_audio_message(
     audio_data: str,
     duration: float,
+    channel: str = GLOBAL_CHANNEL,
     token_data: dict = Depends(verify_token)
 ):
-    """Broadcast audio message to all users"""
+    """Broadcast base64 audio from the query string to a channel (prefer /api/audio/upload)"""
     
-    if duration > 30:
-        raise HTTPException(status_code=400, detail="Audio message too long (max 30 seconds)")
+    await enforce_rate_limit("broadcast", token_data["token_id"])
+    await require_channel_access(token_data["token_id"], channel, send=True)
+    
+    require_valid_duration(duration)
+    if len(audio_data) > (MAX_AUDIO_UPLOAD_BYTES + 2) // 3 * 4:
+        raise HTTPException(status_code=413, detail=f"Audio upload larger than {MAX_AUDIO_UPLOAD_BYTES} bytes")
+    
+    try:
+        audio_bytes = base64.b64decode(audio_data, validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="audio_data must be base64 encoded")
     
     # Create audio message
-    audio_message = AudioMessage(
+    audio_message = RelayMessage(
         nft_token_id=token_data["token_id"],
         wallet_address=token_data["wallet_address"],
-        audio_data=audio_data,
-        duration=duration
+        duration=duration,
+        channel=channel,
+        message_type=message_type_for(channel)
     )
+    return await publish_audio_message(audio_message, audio_bytes, str(token_data["token_id"]), audio_data=audio_data)
+
+@app.post("/api/audio/upload", dependencies=[Depends(admit)])
+async def upload_audio_message(
+    request: Request,
+    duration: Optional[float] = None,
+    channel: Optional[str] = None,
+    token_data: dict = Depends(verify_token)
+):
+    """
+    Broadcast an audio clip sent as the request body, either:
+    - raw: Content-Type audio/webm (or any audio type), ?duration=4.2&channel=global
+    - multipart/form-data: an "audio" file part plus "duration" and optional "channel" fields
     
-    # Save to database
-    await db.audio_messages.insert_one(audio_message.dict())
+    The body is streamed into the blob store as it arrives (into a bounded buffer
+    when transcoding, since the processed clip is what gets stored) and refused
+    with 413 as soon as it passes MAX_AUDIO_UPLOAD_BYTES.
+    """
     
-    # Update user profile
-    await db.user_profiles.update_one(
-        {"nft_token_id": token_data["token_id"]},
-        {
-            "$inc": {"total_messages_sent": 1},
-            "$push": {"lifetime_recordings": audio_message.id},
-            "$set": {"last_active": datetime.utcnow()}
-        }
+    token_id = token_data["token_id"]
+    await enforce_rate_limit("broadcast", token_id)
+    if channel is not None:
+        # Known before the body is read, refuse before accepting any audio
+        await require_channel_access(token_id, channel, send=True)
+    
+    message_id = str(uuid.uuid4())
+    received = bytearray()
+    blob_stored = False
+    try:
+        upload = AudioUpload(request.headers, request.stream(), MAX_AUDIO_UPLOAD_BYTES)
+        
+        async def tee():
+            async for chunk in upload.chunks():
+                received.extend(chunk)
+                yield chunk
+        
+        if AUDIO_TRANSCODE:
+            async for _ in tee():
+                pass
+        else:
+            with DB_WRITE_SECONDS.labels("audio_blob").time():
+                await audio_store.put_stream(message_id, tee(), upload.content_type)
+            blob_stored = True
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    try:
+        if not received:
+            raise HTTPException(status_code=400, detail="Empty audio upload")
+        duration = duration if duration is not None else upload.fields.get("duration")
+        try:
+            duration = float(duration)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="duration is required")
+        require_valid_duration(duration)
+        if channel is None:
+            channel = upload.fields.get("channel") or GLOBAL_CHANNEL
+            await require_channel_access(token_id, channel, send=True)
+    except HTTPException:
+        if blob_stored:
+            await audio_store.delete(message_id)
+        raise
+    
+    audio_message = RelayMessage(
+        id=message_id,
+        nft_token_id=token_id,
+        wallet_address=token_data["wallet_address"],
+        content_type=upload.content_type,
+        duration=duration,
+        channel=channel,
+        message_type=message_type_for(channel)
     )
+    return await publish_audio_message(audio_message, bytes(received), str(token_id), blob_stored)
+
+async def publish_audio_message(
+    audio_message: RelayMessage,
+    audio_bytes: bytes,
+    sender_id: str,
+    blob_stored: bool = False,
+    audio_data: Optional[str] = None
+) -> Dict[str, Any]:
+    """Process (when enabled), relay and persist a complete clip; the broadcast endpoints' response"""
+    original_size = len(audio_bytes)
+    try:
+        processed_bytes = await process_audio(audio_message, audio_bytes)
+    except NoSpeechError:
+        raise HTTPException(status_code=400, detail="No speech detected in audio message")
+    if audio_message.duration > MAX_AUDIO_DURATION_SECONDS:
+        raise HTTPException(status_code=400, detail="Audio message too long (max 30 seconds)")
+    # Reuse the client's base64 when the clip went through unchanged
+    if audio_data is None or processed_bytes is not audio_bytes:
+        audio_data = base64.b64encode(processed_bytes).decode()
+    audio_message.audio_data = audio_data
+    audio_message.audio_size = len(processed_bytes)
     
-    # Broadcast to all connected users
-    await manager.broadcast_audio(audio_message, str(token_data["token_id"]))
+    # Relay first, persistence must not add to delivery latency
+    await manager.broadcast_audio(audio_message, sender_id)
     
-    return {"success": True, "message_id": audio_message.id}
+    await save_audio_message(audio_message, processed_bytes, blob_stored)
+    
+    return {"success": True, "message_id": audio_message.id, "bytes_saved": original_size - len(processed_bytes)}
 
 @app.get("/api/audio/latest")
-async def get_latest_audio_message(token_data: dict = Depends(verify_token)):
-    """Get the latest audio message in the community"""
+async def get_latest_audio_message(channel: str = GLOBAL_CHANNEL, token_data: dict = Depends(verify_token)):
+    """Get the latest audio message on a channel (the community channel by default)"""
     
-    latest_message = await db.audio_messages.find_one(
-        {},
-        sort=[("timestamp", -1)]
-    )
+    await require_channel_access(token_data["token_id"], channel)
     
-    if not latest_message:
-        return {"message": "No messages available"}
+    message = recent_broadcasts.latest(channel)
+    if message is None:
+        # Not in the ring (e.g. right after a restart), fall back to the database
+        latest_message = await db.audio_messages.find_one(
+            {"channel": channel},
+            sort=[("timestamp", -1), ("id", -1)]
+        )
+        
+        if not latest_message:
+            return {"message": "No messages available"}
+        
+        message = await load_audio_message(latest_message)
     
     return {
         "success": True,
-        "message": AudioMessage(**latest_message).dict()
+        "message": {**message.to_dict(), "audio_url": audio_url(message.id)}
     }
 
+async def load_audio_message(doc: Dict[str, Any]) -> RelayMessage:
+    """Build a RelayMessage from its document, pulling the audio from the blob store"""
+    message = RelayMessage.from_dict(doc)
+    if message.audio_data is None:
+        try:
+            message.audio_data = base64.b64encode(await audio_store.read(message.id)).decode()
+        except BlobNotFound:
+            logger.error(f"Audio blob missing for message {message.id}")
+    return message
+
+# Fields needed for AudioMessageSummary, audio never leaves the database here
+SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "nft_token_id": 1,
+    "duration": 1,
+    "timestamp": 1,
+    "message_type": 1,
+    "channel": 1,
+    "audio_size": 1,
+    "content_type": 1
+}
+
+@app.get("/api/audio/history", response_model=AudioHistoryPage)
+async def get_audio_history(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    nft_token_id: Optional[int] = None,
+    channel: str = GLOBAL_CHANNEL,
+    token_data: dict = Depends(verify_token)
+):
+    """
+    Message history of a channel, newest first, metadata only.
+    Pass next_cursor back as cursor to fetch older messages.
+    """
+    
+    await require_channel_access(token_data["token_id"], channel)
+    try:
+        query = keyset_filter(cursor, ascending=False)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    query["channel"] = channel
+    if nft_token_id is not None:
+        query["nft_token_id"] = nft_token_id
+    
+    docs = await db.audio_messages.find(query, SUMMARY_PROJECTION).sort(
+        [("timestamp", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["timestamp"], docs[-1]["id"])
+    
+    return AudioHistoryPage(
+        messages=[AudioMessageSummary(**doc, audio_url=audio_url(doc["id"])) for doc in docs],
+        next_cursor=next_cursor
+    )
+
+@app.get("/api/audio/{message_id}/data")
+async def download_audio_message(
+    message_id: str,
+    request: Request,
+    token_data: dict = Depends(verify_token)
+):
+    """Stream the raw audio of a message, honouring HTTP Range requests"""
+    
+    doc = await db.audio_messages.find_one({"id": message_id})
+    # Just broadcast: the write-behind queue may not have flushed it (or stored its blob) yet
+    recent = recent_broadcasts.get(message_id)
+    if not doc:
+        doc = recent.to_dict(include_audio=False) if recent else message_writer.pending(message_id)
+    if not doc or not await can_read_message(token_data["token_id"], doc):
+        raise HTTPException(status_code=404, detail="Audio message not found")
+    
+    media_type = doc.get("content_type") or "application/octet-stream"
+    inline_audio = None
+    if doc.get("audio_data") is not None:
+        # Document not migrated to the blob store yet
+        inline_audio = base64.b64decode(doc["audio_data"])
+        size = len(inline_audio)
+    else:
+        try:
+            size = await audio_store.size(message_id)
+        except BlobNotFound:
+            if recent is None or recent.audio_data is None:
+                raise HTTPException(status_code=404, detail="Audio data not found")
+            inline_audio = base64.b64decode(recent.audio_data)
+            size = len(inline_audio)
+    
+    headers = {"Accept-Ranges": "bytes"}
+    status_code = 200
+    start, end = 0, size - 1
+    range_header = request.headers.get("range")
+    if range_header and size > 0:
+        try:
+            byte_range = parse_range_header(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        # Unsupported ranges (e.g. multipart) are ignored, the whole body is sent
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1 if size else 0)
+    
+    if inline_audio is not None or size == 0:
+        return Response(content=(inline_audio or b"")[start:end + 1], status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        audio_store.stream(message_id, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type
+    )
+
 @app.get("/api/user/profile")
 async def get_user_profile(token_data: dict = Depends(verify_token)):
     """Get user profile information"""
@@ -328,70 +1174,411 @@ async def get_user_profile(token_data: dict = Depends(verify_token)):
 @app.get("/api/user/recordings/{token_id}")
 async def get_nft_lifetime_recordings(
     token_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     token_data: dict = Depends(verify_token)
 ):
-    """Get all lifetime recordings for a specific NFT (future feature)"""
-    
-    profile = await db.user_profiles.find_one({"nft_token_id": token_id})
+    """
+    Get lifetime recordings for a specific NFT, oldest first.
+    Pass next_cursor back as cursor to fetch the following page.
+    """
     
-    if not profile:
-        return {"recordings": []}
+    try:
+        after = keyset_filter(cursor, ascending=True)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    # Get all recordings for this NFT
-    recording_ids = profile.get("lifetime_recordings", [])
+    own = token_id == token_data["token_id"]
+    visible = {"nft_token_id": token_id}
+    if not own:
+        # Other holders only see what was said in public channels
+        visible["message_type"] = {"$in": ["broadcast", "trait"]}
+    query = {**visible, **after}
     
+    # Served by the (nft_token_id, timestamp, id) index, one page at a time
     recordings = await db.audio_messages.find(
-        {"id": {"$in": recording_ids}}
-    ).sort("timestamp", 1).to_list(1000)
+        query,
+        {"audio_data": 0}
+    ).sort([("timestamp", 1), ("id", 1)]).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(recordings) > limit:
+        recordings = recordings[:limit]
+        next_cursor = encode_cursor(recordings[-1]["timestamp"], recordings[-1]["id"])
     
+    if own:
+        profile = await db.user_profiles.find_one({"nft_token_id": token_id}, {"total_messages_sent": 1})
+        total_recordings = profile.get("total_messages_sent", 0) if profile else 0
+    else:
+        # The profile counter includes private messages, count only what the caller can list
+        total_recordings = await db.audio_messages.count_documents(visible)
+    
+    # Metadata only, clients fetch the audio they play from audio_url
     return {
         "success": True,
         "token_id": token_id,
-        "total_recordings": len(recordings),
-        "recordings": [AudioMessage(**recording).dict() for recording in recordings]
+        "total_recordings": total_recordings,
+        "recordings": [
+            {**AudioMessage(**recording).dict(exclude={"audio_data"}), "audio_url": audio_url(recording["id"])}
+            for recording in recordings
+        ],
+        "next_cursor": next_cursor
+    }
+
+@app.post("/api/groups")
+async def create_group(request: CreateGroupRequest, token_data: dict = Depends(verify_token)):
+    """Create a private group channel; the creator is always a member"""
+    members = sorted({token_data["token_id"], *request.members})
+    if len(members) > MAX_GROUP_MEMBERS:
+        raise HTTPException(status_code=400, detail=f"Groups are limited to {MAX_GROUP_MEMBERS} members")
+    group = ChannelGroup(name=request.name, owner_token_id=token_data["token_id"], members=members)
+    await db.channel_groups.insert_one(group.dict())
+    return {"success": True, "group": group.dict(), "channel": group_channel(group.id)}
+
+@app.get("/api/groups")
+async def list_groups(token_data: dict = Depends(verify_token)):
+    """Groups the caller belongs to"""
+    groups = await db.channel_groups.find(
+        {"members": token_data["token_id"]}, {"_id": 0}
+    ).limit(MAX_GROUPS_LISTED).to_list(MAX_GROUPS_LISTED)
+    return {
+        "success": True,
+        "groups": [{**group, "channel": group_channel(group["id"])} for group in groups]
     }
 
+@app.post("/api/groups/{group_id}/members")
+async def add_group_member(group_id: str, request: GroupMemberRequest, token_data: dict = Depends(verify_token)):
+    """Add an NFT to a group (owner only)"""
+    result = await db.channel_groups.update_one(
+        {
+            "id": group_id,
+            "owner_token_id": token_data["token_id"],
+            f"members.{MAX_GROUP_MEMBERS - 1}": {"$exists": False}
+        },
+        {"$addToSet": {"members": request.token_id}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Group not found, not yours, or full")
+    return {"success": True}
+
+@app.delete("/api/groups/{group_id}/members/{token_id}")
+async def remove_group_member(group_id: str, token_id: int, token_data: dict = Depends(verify_token)):
+    """Remove an NFT from a group (owner, or members removing themselves; the owner cannot leave)"""
+    group = await db.channel_groups.find_one({"id": group_id, "members": token_data["token_id"]}, {"owner_token_id": 1})
+    if not group or (group["owner_token_id"] != token_data["token_id"] and token_id != token_data["token_id"]):
+        raise HTTPException(status_code=404, detail="Group not found")
+    if token_id == group["owner_token_id"]:
+        # Nobody could add or remove members any more
+        raise HTTPException(status_code=400, detail="The group owner cannot leave the group")
+    await db.channel_groups.update_one({"id": group_id}, {"$pull": {"members": token_id}})
+    # Removed members stop hearing the group right away
+    await manager.drop_subscription(str(token_id), group_channel(group_id))
+    return {"success": True}
+
+async def finish_ptt_stream(stream: PTTStream, sender_id: str, session_id: str, reported_duration: Optional[float]):
+    """Assemble a finished live transmission, persist it and tell listeners it is complete"""
+    
+    if not stream.size:
+        await abort_ptt_stream(stream, sender_id, "no audio")
+        manager.send_personal(session_id, {"type": "error", "message": "Transmission contained no audio, discarded"})
+        return
+    
+    audio_message = RelayMessage(
+        id=stream.message_id,
+        nft_token_id=stream.nft_token_id,
+        wallet_address=stream.wallet_address,
+        content_type=stream.mime_type,
+        duration=stream.duration(reported_duration),
+        timestamp=stream.started_at,
+        channel=stream.channel,
+        message_type=message_type_for(stream.channel)
+    )
+    try:
+        audio_bytes = await process_audio(audio_message, stream.assemble())
+    except NoSpeechError:
+        await abort_ptt_stream(stream, sender_id, "no speech")
+        manager.send_personal(session_id, {"type": "error", "message": "No speech detected, transmission discarded"})
+        return
+    await save_audio_message(audio_message, audio_bytes)
+    audio_message.audio_data = base64.b64encode(audio_bytes).decode()
+    await manager.share_recent(audio_message)
+    
+    await manager.broadcast_event({
+        "type": "audio_stream_end",
+        "data": {
+            "message_id": audio_message.id,
+            "nft_token_id": audio_message.nft_token_id,
+            "duration": audio_message.duration
+        }
+    }, sender_id, stream.channel)
+    manager.send_personal(session_id, {"type": "ptt_saved", "message_id": audio_message.id})
+
+async def abort_ptt_stream(stream: PTTStream, sender_id: str, reason: str):
+    """Discard a live transmission and tell listeners to drop what they buffered"""
+    await manager.broadcast_event({
+        "type": "audio_stream_abort",
+        "data": {"message_id": stream.message_id, "reason": reason}
+    }, sender_id, stream.channel)
+
+async def replay_recent(session_id: str, since: str):
+    """Send a reconnecting client every broadcast on their channels after message `since`, oldest first"""
+    
+    channels = list(manager.subscriptions.subscriptions(session_id))
+    messages = recent_broadcasts.since(since, channels)
+    if messages is None:
+        # Older than the ring, fall back to the database
+        anchor = await db.audio_messages.find_one({"id": since}, {"timestamp": 1, "id": 1})
+        if not anchor:
+            manager.send_personal(session_id, {"type": "error", "message": "Unknown message id"})
+            return
+        docs = await db.audio_messages.find(
+            {"channel": {"$in": channels}, **after_filter(anchor["timestamp"], anchor["id"], ascending=True)}
+        ).sort([("timestamp", 1), ("id", 1)]).limit(recent_broadcasts.max_messages).to_list(recent_broadcasts.max_messages)
+        messages = [await load_audio_message(doc) for doc in docs]
+    
+    # A message whose blob went missing has nothing to play, leave it out
+    messages = [message for message in messages if message.audio_data is not None]
+    for message in messages:
+        await manager.send_audio_personal(session_id, message)
+    manager.send_personal(session_id, {"type": "replay_complete", "count": len(messages)})
+
+async def update_subscription(session_id: str, token_id: int, action: str, channel: str):
+    """Join or leave a channel on behalf of a connected client"""
+    if action == "unsubscribe":
+        manager.subscriptions.unsubscribe(session_id, channel)
+        manager.send_personal(session_id, {"type": "unsubscribed", "channel": channel})
+        return
+    error = await channel_access_error(token_id, channel)
+    if error:
+        manager.send_personal(session_id, {"type": "error", "message": error})
+        return
+    try:
+        manager.subscriptions.subscribe(session_id, channel)
+    except TooManySubscriptions as e:
+        manager.send_personal(session_id, {"type": "error", "message": str(e)})
+        return
+    manager.send_personal(session_id, {"type": "subscribed", "channel": channel})
+
+async def handle_client_message(
+    message: Dict[str, Any],
+    stream: Optional[PTTStream],
+    user_id: str,
+    session_id: str,
+    payload: Dict[str, Any]
+) -> Optional[PTTStream]:
+    """
+    Handle one message from a client. Returns the sender's active stream, if any.
+    
+    Heartbeat (any message counts as a sign of life, pongs just keep idle listeners alive);
+    clients that ping or pong are reaped after WS_HEARTBEAT_TIMEOUT_SECONDS of silence:
+    <- {"type": "ping", "ts": 1700000000.0}
+    -> {"type": "pong"}
+    
+    Catching up after a reconnect:
+    -> {"type": "replay", "since": "<last message id heard>"}
+    
+    Channels (global and the user's own nft:<id> are joined automatically):
+    -> {"type": "subscribe", "channel": "trait:background:glacier"}
+    -> {"type": "unsubscribe", "channel": "global"}
+    
+    Streaming push-to-talk:
+    -> {"type": "ptt_start", "mime_type": "audio/webm;codecs=opus", "channel": "global"}
+    -> binary frames with raw audio chunks (or {"type": "ptt_chunk", "audio_data": "<base64>"})
+    -> {"type": "ptt_end", "duration": 4.2}
+    """
+    
+    if message.get("bytes") is not None:
+        chunk = message["bytes"]
+    elif message.get("text") is not None:
+        try:
+            data = json.loads(message["text"])
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and data.get("type") in ("ping", "pong"):
+            # Speaking the heartbeat opts the client into being reaped when it goes silent
+            manager.touch(session_id, heartbeat=True)
+            if data["type"] == "ping":
+                manager.send_personal(session_id, {"type": "pong"})
+            return stream
+        if isinstance(data, dict) and data.get("type") == "replay" and data.get("since"):
+            await replay_recent(session_id, str(data["since"]))
+            return stream
+        if isinstance(data, dict) and data.get("type") in ("subscribe", "unsubscribe"):
+            await update_subscription(session_id, payload["token_id"], data["type"], str(data.get("channel", "")))
+            return stream
+        if not isinstance(data, dict) or not str(data.get("type", "")).startswith("ptt_"):
+            # Handle any other WebSocket messages if needed
+            logger.info(f"Received WebSocket message from {user_id}: {message['text']}")
+            return stream
+        
+        if data["type"] == "ptt_start":
+            if stream:
+                await abort_ptt_stream(stream, user_id, "restarted")
+            channel = str(data.get("channel", GLOBAL_CHANNEL))
+            error = await channel_access_error(payload["token_id"], channel, send=True)
+            if error:
+                manager.send_personal(session_id, {"type": "error", "message": error})
+                return None
+            if overload_reason():
+                manager.send_personal(session_id, {"type": "error", "message": "Server busy, try again shortly", "retry_after": 1})
+                return None
+            retry_after = await rate_limit_retry_after("broadcast", payload["token_id"])
+            if retry_after:
+                manager.send_personal(session_id, {
+                    "type": "error",
+                    "message": "Too many broadcast requests, slow down",
+                    "retry_after": math.ceil(retry_after)
+                })
+                return None
+            stream = PTTStream(
+                nft_token_id=payload["token_id"],
+                wallet_address=payload["wallet_address"],
+                mime_type=data.get("mime_type"),
+                max_bytes=PTT_MAX_STREAM_BYTES,
+                max_duration=MAX_AUDIO_DURATION_SECONDS,
+                channel=channel
+            )
+            await manager.broadcast_event({
+                "type": "audio_stream_start",
+                "data": {
+                    "message_id": stream.message_id,
+                    "nft_token_id": stream.nft_token_id,
+                    "mime_type": stream.mime_type,
+                    "channel": stream.channel,
+                    "timestamp": stream.started_at
+                }
+            }, user_id, stream.channel)
+            manager.send_personal(session_id, {"type": "ptt_started", "message_id": stream.message_id})
+            return stream
+        
+        if data["type"] == "ptt_end":
+            try:
+                duration = parse_duration(data.get("duration"))
+            except PTTStreamError as e:
+                # The stream stays open, the client may send a corrected ptt_end
+                manager.send_personal(session_id, {"type": "error", "message": str(e)})
+                return stream
+            if stream:
+                await finish_ptt_stream(stream, user_id, session_id, duration)
+            return None
+        
+        if data["type"] != "ptt_chunk":
+            manager.send_personal(session_id, {"type": "error", "message": f"Unknown message type {data['type']}"})
+            return stream
+        try:
+            chunk = base64.b64decode(data.get("audio_data", ""), validate=True)
+        except (binascii.Error, ValueError):
+            manager.send_personal(session_id, {"type": "error", "message": "Invalid audio chunk"})
+            return stream
+    else:
+        return stream
+    
+    if not stream:
+        manager.send_personal(session_id, {"type": "error", "message": "No transmission in progress"})
+        return None
+    
+    try:
+        seq = stream.add_chunk(chunk)
+    except PTTStreamError as e:
+        await abort_ptt_stream(stream, user_id, str(e))
+        manager.send_personal(session_id, {"type": "error", "message": str(e)})
+        return None
+    
+    await manager.broadcast_audio_chunk(stream.message_id, stream.nft_token_id, seq, chunk, user_id, stream.channel)
+    return stream
+
+@app.websocket("/ws")
+async def websocket_ticket_endpoint(websocket: WebSocket, ticket: str, format: str = FORMAT_JSON):
+    """WebSocket endpoint authenticated by a one-time ticket from /api/auth/ws-ticket"""
+    try:
+        payload = ws_tickets.redeem(ticket)
+    except TicketError as e:
+        await websocket.close(code=4001, reason=str(e))
+        return
+    # Tell the other workers so the ticket cannot be replayed against them
+    await manager.publish({"type": "ticket_used", "nonce": payload["nonce"], "exp": payload["exp"]})
+    await serve_websocket(websocket, payload, format)
+
 @app.websocket("/ws/{token}")
-async def websocket_endpoint(websocket: WebSocket, token: str):
-    """WebSocket endpoint for real-time communication"""
+async def websocket_endpoint(websocket: WebSocket, token: str, format: str = FORMAT_JSON):
+    """WebSocket endpoint authenticated by the JWT in the path (prefer /ws?ticket=...)"""
+    try:
+        payload = decode_token(token)
+    except Exception:
+        await websocket.close(code=4001, reason="Invalid token")
+        return
+    await serve_websocket(websocket, payload, format)
+
+async def serve_websocket(websocket: WebSocket, payload: Dict[str, Any], format: str):
+    """
+    Real-time communication for an authenticated user.
+    Clients pick the wire format at connect time: ?format=json (default, base64 audio
+    inside JSON text frames) or ?format=binary (see framing.py for the frame layout).
+    Clients can also replay missed broadcasts and stream push-to-talk audio, see handle_client_message.
+    """
     
+    if format not in WIRE_FORMATS:
+        await websocket.close(code=4002, reason="Unsupported format")
+        return
+    if overload_reason():
+        await websocket.close(code=CLOSE_CODE_OVERLOADED, reason="Server busy")
+        return
+    if await rate_limit_retry_after("connect", payload["token_id"]):
+        await websocket.close(code=CLOSE_CODE_RATE_LIMITED, reason="Too many connections")
+        return
+    
+    session_id: Optional[str] = None
+    stream: Optional[PTTStream] = None
+    user_id = str(payload["token_id"])
     try:
-        # Verify token
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        user_id = str(payload["token_id"])
         token_id = payload["token_id"]
         
-        await manager.connect(websocket, user_id, token_id)
+        session_id = await manager.connect(websocket, user_id, token_id, format)
         
         try:
             while True:
-                data = await websocket.receive_text()
-                # Handle any WebSocket messages if needed
-                logger.info(f"Received WebSocket message from {user_id}: {data}")
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if session_id not in manager.channels:
+                    # Evicted by a newer session, reaped or dropped as too slow
+                    raise WebSocketDisconnect(CLOSE_CODE_SUPERSEDED)
+                manager.touch(session_id)
+                stream = await handle_client_message(message, stream, user_id, session_id, payload)
                 
         except WebSocketDisconnect:
-            manager.disconnect(user_id)
+            if stream:
+                await abort_ptt_stream(stream, user_id, "sender disconnected")
+            manager.disconnect(session_id)
             
-    except jwt.JWTError:
-        await websocket.close(code=4001, reason="Invalid token")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        await websocket.close(code=4000, reason="Internal error")
+        if stream:
+            # Listeners are buffering the transmission, tell them it is not coming
+            try:
+                await abort_ptt_stream(stream, user_id, "sender error")
+            except Exception as abort_error:
+                logger.error(f"Error aborting push-to-talk stream {stream.message_id}: {abort_error}")
+        if session_id:
+            manager.disconnect(session_id, close_code=4000)
+        else:
+            await websocket.close(code=4000, reason="Internal error")
 
 @app.get("/api/community/stats")
 async def get_community_stats():
-    """Get community statistics"""
-    
-    total_users = await db.user_profiles.count_documents({})
-    total_messages = await db.audio_messages.count_documents({})
-    active_connections = len(manager.active_connections)
+    """Get community statistics (polled by the landing page, never touches the database)"""
     
-    return {
-        "total_registered_nfts": total_users,
-        "total_messages_sent": total_messages,
-        "currently_online": active_connections,
+    return community_counters.render(lambda counts: {
+        "total_registered_nfts": counts["registered_nfts"],
+        "total_messages_sent": counts["messages_sent"],
+        "currently_online": len(manager.online_user_ids()),
         "collection_size": 5000
-    }
+    })
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (per worker)"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/api/health")
 async def health_check():
@@ -399,10 +1586,96 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "Yeti Talki API",
-        "ape_chain_connected": w3.is_connected(),
-        "database_connected": True  # TODO: Add actual DB health check
+        "ape_chain_connected": await chain.is_connected(),
+        "database_connected": True,  # TODO: Add actual DB health check
+        "nft_ownership_cache": ownership_cache.stats(),
+        "message_writer": message_writer.stats(),
+        "jwt_cache": token_cache.stats(),
+        "event_loop_lag_ms": round(loop_lag_monitor.lag * 1000, 2),
+        "overloaded": admission_control.overload_reason,
+        "rate_limiter": rate_limiter.name,
+        "audio_processing": audio_processor.stats() if AUDIO_TRANSCODE else None
     }
 
+@app.on_event("startup")
+async def open_audio_store():
+    global audio_store
+    if audio_store is None:
+        audio_store = create_audio_store(db, AUDIO_STORE_URL)
+
+@app.on_event("startup")
+async def create_database_indexes():
+    if MONGO_ENSURE_INDEXES:
+        await ensure_indexes(db)
+
+@app.on_event("startup")
+async def start_connection_manager():
+    await manager.start()
+
+@app.on_event("shutdown")
+async def stop_connection_manager():
+    await manager.stop()
+
+@app.on_event("startup")
+async def start_message_writer():
+    message_writer.start()
+
+@app.on_event("shutdown")
+async def stop_message_writer():
+    await message_writer.stop()
+
+@app.on_event("startup")
+async def start_community_counters():
+    community_counters.start(db)
+
+@app.on_event("shutdown")
+async def stop_community_counters():
+    await community_counters.stop()
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    loop_lag_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_lag_monitor():
+    await loop_lag_monitor.stop()
+
+@app.on_event("startup")
+async def start_admission_control():
+    admission_control.start()
+
+@app.on_event("shutdown")
+async def stop_admission_control():
+    await admission_control.stop()
+    await rate_limiter.close()
+
+@app.on_event("startup")
+async def start_audio_processor():
+    if AUDIO_TRANSCODE:
+        audio_processor.start()
+    else:
+        logger.info("AUDIO_TRANSCODE is off: no VAD trimming, clip durations are client-reported")
+
+@app.on_event("shutdown")
+async def stop_audio_processor():
+    audio_processor.stop()
+
+@app.on_event("startup")
+async def start_transfer_watcher():
+    global transfer_watcher
+    if NFT_TRANSFER_WATCH and FROSTY_APE_YETI_CONTRACT != '0x0000000000000000000000000000000000000000':
+        transfer_watcher = TransferWatcher(chain, ownership_cache, NFT_TRANSFER_POLL_SECONDS)
+        transfer_watcher.start()
+
+@app.on_event("shutdown")
+async def stop_chain_access():
+    if transfer_watcher:
+        await transfer_watcher.stop()
+    await chain.close()
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    uvicorn.run(
+        app, host="0.0.0.0", port=8002,
+        ws_ping_interval=WS_PING_INTERVAL_SECONDS, ws_ping_timeout=WS_PING_TIMEOUT_SECONDS
+    )
@@ -0,0 +1,20 @@
+#!/bin/sh
+# Launch the relay with the websocket ping settings server.py documents. A bare
+# `uvicorn server:app` falls back to uvicorn's own ping defaults. Settings come
+# from the environment; extra arguments are passed through to uvicorn.
+#
+# Behind a reverse proxy, set FORWARDED_ALLOW_IPS to the proxy's address and have
+# it send X-Forwarded-For (nginx: proxy_set_header X-Forwarded-For
+# $proxy_add_x_forwarded_for). Client IPs, and with them the per-IP login limit,
+# then come from that header; it is ignored from any other peer.
+set -e
+cd "$(dirname "$0")"
+
+exec uvicorn server:app \
+    --host "${HOST:-0.0.0.0}" \
+    --port "${PORT:-8002}" \
+    --ws-ping-interval "${WS_PING_INTERVAL_SECONDS:-20}" \
+    --ws-ping-timeout "${WS_PING_TIMEOUT_SECONDS:-20}" \
+    --proxy-headers \
+    --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}" \
+    "$@"
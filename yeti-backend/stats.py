@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Counter name -> collection it mirrors
+COUNTED_COLLECTIONS = {
+    "registered_nfts": "user_profiles",
+    "messages_sent": "audio_messages",
+}
+
+
+class CommunityCounters:
+    """
+    O(1) community totals for /api/community/stats.
+
+    Each worker bumps its counters for its own writes and applies the
+    increments it sees from other workers over the backplane. A periodic
+    reconciliation resets them from estimated_document_count (collection
+    metadata, not a scan) so any drift between workers is bounded. Rendered
+    responses are cached for cache_ttl seconds on top of that.
+    """
+
+    def __init__(self, reconcile_interval: float, cache_ttl: float):
+        self.reconcile_interval = reconcile_interval
+        self.cache_ttl = cache_ttl
+        self.counts: Dict[str, int] = {name: 0 for name in COUNTED_COLLECTIONS}
+        self.reconciled_at: Optional[float] = None
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def increment(self, name: str, amount: int = 1):
+        self.counts[name] += amount
+
+    async def reconcile(self, db):
+        for name, collection in COUNTED_COLLECTIONS.items():
+            self.counts[name] = await db[collection].estimated_document_count()
+        self.reconciled_at = time.monotonic()
+
+    def start(self, db):
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self, db):
+        while True:
+            try:
+                await self.reconcile(db)
+            except Exception as e:
+                logger.error(f"Error reconciling community counters: {e}")
+            await asyncio.sleep(self.reconcile_interval)
+
+    def render(self, build: Callable[[Dict[str, int]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return build(counts), reusing the previous result for cache_ttl seconds"""
+        now = time.monotonic()
+        if self._cached is None or now - self._cached_at >= self.cache_ttl:
+            self._cached = build(dict(self.counts))
+            self._cached_at = now
+        return self._cached
@@ -0,0 +1,142 @@
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13 only ships the old module name
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Multipart framing (boundaries, part headers, small fields) allowed on top of the audio itself
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+# Cap on each non-file form field (duration, channel)
+MAX_FIELD_BYTES = 256
+
+
+class UploadError(Exception):
+    """Raised for malformed upload bodies"""
+
+    status_code = 400
+
+
+class UploadTooLarge(UploadError):
+    """Raised as soon as an upload is known to exceed its size limit"""
+
+    status_code = 413
+
+
+async def limit_size(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    """Pass chunks through, raising UploadTooLarge once more than max_bytes went by"""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge(f"Audio upload larger than {max_bytes} bytes")
+        yield chunk
+
+
+class AudioUpload:
+    """
+    Audio carried in a request body, read as a stream of chunks so it never has
+    to be held in memory before it can be rejected.
+
+    - Raw body: the Content-Type (audio/*, application/octet-stream) describes the clip.
+    - multipart/form-data: one file part (file_field) with the clip; other parts
+      are small text fields collected into .fields as the body streams past.
+
+    The size limit covers the clip bytes. A declared Content-Length that cannot
+    fit is refused before anything is read.
+    """
+
+    def __init__(self, headers: Mapping[str, str], body: AsyncIterator[bytes], max_bytes: int, file_field: str = "audio"):
+        self.file_field = file_field
+        self.fields: Dict[str, str] = {}
+        self.content_type: Optional[str] = None
+        self.size = 0
+
+        media_type, params = parse_options_header(headers.get("content-type", ""))
+        self.multipart = media_type == b"multipart/form-data"
+        allowed = max_bytes + (MULTIPART_OVERHEAD_BYTES if self.multipart else 0)
+        declared = headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > allowed:
+            raise UploadTooLarge(f"Audio upload larger than {max_bytes} bytes")
+
+        if self.multipart:
+            if not params.get(b"boundary"):
+                raise UploadError("Multipart body without a boundary")
+            body = limit_size(body, allowed)
+            self._chunks = limit_size(self._file_part(body, params[b"boundary"]), max_bytes)
+        else:
+            self.content_type = media_type.decode("latin-1") or None
+            self._chunks = limit_size(body, max_bytes)
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        async for chunk in self._chunks:
+            self.size += len(chunk)
+            yield chunk
+
+    async def _file_part(self, body: AsyncIterator[bytes], boundary: bytes) -> AsyncIterator[bytes]:
+        # The parser works through sync callbacks; collect what each write produced, then yield it
+        events: List[Tuple[str, Any]] = []
+        headers: Dict[bytes, bytes] = {}
+        header_field = bytearray()
+        header_value = bytearray()
+
+        def on_part_begin():
+            headers.clear()
+
+        def on_header_field(data, start, end):
+            header_field.extend(data[start:end])
+
+        def on_header_value(data, start, end):
+            header_value.extend(data[start:end])
+
+        def on_header_end():
+            headers[bytes(header_field).lower()] = bytes(header_value)
+            header_field.clear()
+            header_value.clear()
+
+        def on_headers_finished():
+            # Snapshot, later parts in the same write reuse the dict
+            events.append(("headers", dict(headers)))
+
+        def on_part_data(data, start, end):
+            events.append(("data", bytes(data[start:end])))
+
+        parser = MultipartParser(boundary, {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+        })
+
+        field: Optional[str] = None
+        in_file = False
+        seen_file = False
+        async for chunk in body:
+            try:
+                parser.write(chunk)
+            except Exception as e:
+                raise UploadError(f"Malformed multipart body: {e}")
+            for kind, data in events:
+                if kind == "headers":
+                    part_headers = data
+                    _, disposition = parse_options_header(part_headers.get(b"content-disposition", b""))
+                    field = disposition.get(b"name", b"").decode("latin-1")
+                    in_file = field == self.file_field and not seen_file
+                    if in_file:
+                        seen_file = True
+                        self.content_type = part_headers.get(b"content-type", b"").decode("latin-1") or None
+                    else:
+                        self.fields[field] = ""
+                elif kind == "data" and in_file:
+                    yield data
+                elif kind == "data" and field is not None:
+                    if len(self.fields[field]) + len(data) > MAX_FIELD_BYTES:
+                        raise UploadError(f"Form field {field} too long")
+                    self.fields[field] += data.decode("utf-8", errors="replace")
+            events.clear()
+        parser.finalize()
+        if not seen_file:
+            raise UploadError(f"Missing {self.file_field} file part")
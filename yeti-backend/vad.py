@@ -0,0 +1,90 @@
+from typing import List, Tuple
+
+import numpy as np
+
+# Analysis frame length; 20 ms is a common VAD granularity for speech
+FRAME_MS = 20
+
+# Speech must rise this far above the estimated noise floor
+NOISE_MARGIN_DB = 12.0
+
+# ...but never needs to come within this much of the loudest frame
+PEAK_MARGIN_DB = 30.0
+
+# Bursts shorter than this (clicks, button noise) are not speech
+MIN_SPEECH_MS = 60
+
+# Kept around each segment so word onsets and tails are not clipped
+PAD_MS = 120
+
+# Silence gaps shorter than this are bridged into one segment
+MIN_GAP_MS = 300
+
+_EPSILON = 1e-10
+
+
+def frame_energy_db(pcm: np.ndarray, sample_rate: int, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """RMS level of each frame in dBFS (float PCM in [-1, 1]), the trailing partial frame dropped"""
+    frame = sample_rate * frame_ms // 1000
+    frames = len(pcm) // frame
+    if frames == 0:
+        return np.empty(0, dtype=np.float32)
+    blocks = pcm[:frames * frame].reshape(frames, frame).astype(np.float32, copy=False)
+    rms = np.sqrt(np.mean(np.square(blocks), axis=1))
+    return 20 * np.log10(rms + _EPSILON)
+
+
+def speech_threshold_db(energy_db: np.ndarray, silence_db: float) -> float:
+    """Adaptive threshold: noise floor (10th percentile) plus a margin, bounded by the absolute silence level"""
+    noise_floor = np.percentile(energy_db, 10)
+    peak = energy_db.max()
+    return float(max(silence_db, min(noise_floor + NOISE_MARGIN_DB, peak - PEAK_MARGIN_DB)))
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start (inclusive) and end (exclusive) indexes of every run of True"""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def speech_segments(
+    pcm: np.ndarray,
+    sample_rate: int,
+    silence_db: float = -50.0,
+    frame_ms: int = FRAME_MS,
+) -> List[Tuple[float, float]]:
+    """Speech segments as (start, end) seconds, padded and with short gaps bridged"""
+    energy = frame_energy_db(pcm, sample_rate, frame_ms)
+    if energy.size == 0:
+        return []
+    voiced = energy > speech_threshold_db(energy, silence_db)
+
+    # Drop bursts too short to be speech
+    starts, ends = _runs(voiced)
+    keep = (ends - starts) * frame_ms >= MIN_SPEECH_MS
+    starts, ends = starts[keep], ends[keep]
+    if starts.size == 0:
+        return []
+
+    # Bridge short gaps, then pad
+    gaps = (starts[1:] - ends[:-1]) * frame_ms
+    split = np.flatnonzero(gaps >= MIN_GAP_MS)
+    starts = np.concatenate(([starts[0]], starts[split + 1]))
+    ends = np.concatenate((ends[split], [ends[-1]]))
+    pad = PAD_MS / 1000
+    duration = len(pcm) / sample_rate
+    frame_seconds = frame_ms / 1000
+    return [
+        (max(start * frame_seconds - pad, 0.0), min(end * frame_seconds + pad, duration))
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+
+
+def trim_silence(pcm: np.ndarray, sample_rate: int, silence_db: float = -50.0) -> np.ndarray:
+    """Cut leading and trailing non-speech; an empty array when the clip has no speech at all"""
+    segments = speech_segments(pcm, sample_rate, silence_db)
+    if not segments:
+        return pcm[:0]
+    start = int(segments[0][0] * sample_rate)
+    end = int(round(segments[-1][1] * sample_rate))
+    return pcm[start:end]